@@ -0,0 +1,373 @@
+# Excel Indent Benchmark
+
+import argparse
+import concurrent.futures
+import datetime
+import importlib.util
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+BENCHMARK_CASES = ('calculate_indents', 'indent_function', 'pipeline', 'pipeline_openpyxl', 'pipeline_numbering', 'projected', 'stream')
+
+def generate_outline_dataframe(rows, max_depth=4, numbered_ratio=0.3, bad_ratio=0.0, extra_columns=2, seed=0):
+    """
+    Builds a synthetic requirements export shaped like the real ones: a 'Heading' column with a
+    valid outline of numbered headings ('1', '1.1', '1.1.1', ...) interleaved with unnumbered
+    requirement rows, plus some attribute columns.
+
+    Args:
+        rows (int): The number of data rows.
+        max_depth (int, optional): The deepest heading level (1 = only '1', '2', ...). Defaults to 4.
+        numbered_ratio (float, optional): The share of rows that are numbered headings. Defaults to 0.3.
+        bad_ratio (float, optional): The share of rows given a blank or malformed heading (e.g. '1..2', '.3')
+                                     and an invalid 'Calculated Indents' value. Defaults to 0.0.
+        extra_columns (int, optional): The number of attribute columns to add. Defaults to 2.
+        seed (int, optional): The random seed, so the same arguments always give the same data. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: The columns 'Heading', 'Attribute 1'..'Attribute N' and 'Calculated Indents'
+                      (the expected level, for benchmarking indent_function on its own).
+    """
+    import pandas as pd
+
+    rng = random.Random(seed)
+    counters = []
+    headings = []
+    levels = []
+    last_numbered_level = -1
+    for row in range(rows):
+        roll = rng.random()
+        if roll < bad_ratio:
+            headings.append(rng.choice([None, "", "1..2 Malformed", ".3 Malformed", "n/a"]))
+            levels.append(rng.choice([None, "n/a", "x"]))
+            continue
+        if roll < bad_ratio + numbered_ratio or not counters:
+            # Go one level deeper, stay, or climb back up, keeping the outline valid
+            depth = min(max_depth, max(1, len(counters) + rng.choice((-2, -1, 0, 1, 1))))
+            if depth > len(counters):
+                counters.append(1)
+            else:
+                del counters[depth:]
+                counters[-1] += 1
+            headings.append(f"{'.'.join(map(str, counters))} Heading {row}")
+            last_numbered_level = len(counters) - 1
+            levels.append(last_numbered_level)
+        else:
+            headings.append(f"Requirement text for row {row}")
+            levels.append(last_numbered_level + 1)
+
+    data = {'Heading': headings}
+    for column in range(1, extra_columns + 1):
+        data[f"Attribute {column}"] = [f"REQ-{row}-{column}" for row in range(rows)]
+    data['Calculated Indents'] = levels
+    return pd.DataFrame(data)
+
+def generate_outline_workbook(excel_file, rows, **options):
+    """
+    Writes generate_outline_dataframe(rows, **options) to an Excel file.
+    """
+    generate_outline_dataframe(rows, **options).to_excel(excel_file, index=False)
+    return excel_file
+
+def _memory_method():
+    """
+    Picks how peak memory is measured on this platform:
+        'ru_maxrss': the process's peak resident memory, from the resource module (Linux, macOS).
+        'peak_wset': the process's peak working set, from psutil (Windows, where resource is missing).
+        'tracemalloc': the peak of Python's own allocations only, when neither is available. Tracing slows
+                       the run down, so timings measured this way are not comparable with the others.
+    """
+    if importlib.util.find_spec('resource') is not None:
+        return 'ru_maxrss'
+    try:
+        import psutil
+        if hasattr(psutil.Process().memory_info(), 'peak_wset'):
+            return 'peak_wset'
+    except ImportError:
+        pass
+    return 'tracemalloc'
+
+def _peak_memory_mb(method):
+    """
+    Returns this process's peak memory in MB so far, measured with the given _memory_method.
+    """
+    if method == 'ru_maxrss':
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    if method == 'peak_wset':
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    return tracemalloc.get_traced_memory()[1] / (1024 * 1024) if tracemalloc.is_tracing() else 0.0
+
+def _run_case(case, excel_file, workdir):
+    """
+    Runs one benchmark case in a fresh worker process and measures it there, so each measurement
+    starts from the same memory baseline.
+    """
+    import Excel_Indent_Functions as functions
+
+    memory_method = _memory_method()
+    if memory_method == 'tracemalloc':
+        tracemalloc.start()
+    rss_before = _peak_memory_mb(memory_method)
+    start = time.perf_counter()
+    if case == 'calculate_indents':
+        output_file, _, _, output = functions.calculate_indents_and_save_new_excel(excel_file, 'Heading')
+    elif case == 'indent_function':
+        output_file, output = functions.indent_function(excel_file, 'Calculated Indents', 'Heading')
+    elif case == 'pipeline':
+        output_file, output = functions.indent_excel(excel_file, 'Heading', destination=os.path.join(workdir, 'pipeline_out.xlsx'))
+    elif case == 'pipeline_openpyxl':
+        output_file, output = functions.indent_excel(excel_file, 'Heading', destination=os.path.join(workdir, 'pipeline_openpyxl_out.xlsx'),
+                                                     reader='openpyxl', writer='openpyxl')
+    elif case == 'pipeline_numbering':
+        # Every built-in grammar at once; should cost about the same as 'pipeline'
+        from Excel_Indent_Numbering import BUILTIN_GRAMMARS, HeadingNumbering
+        output_file, output = functions.indent_excel(excel_file, 'Heading', destination=os.path.join(workdir, 'pipeline_numbering_out.xlsx'),
+                                                     numbering=HeadingNumbering(BUILTIN_GRAMMARS))
+    elif case == 'projected':
+        output_file, output = functions.projected_indent_excel(excel_file, 'Heading', destination=os.path.join(workdir, 'projected_out.xlsx'))
+    elif case == 'stream':
+        output_file, output = functions.stream_indent_excel(excel_file, 'Heading', destination=os.path.join(workdir, 'stream_out.xlsx'))
+    else:
+        raise ValueError(f"Unknown benchmark case '{case}'.")
+    seconds = time.perf_counter() - start
+    rss_after = _peak_memory_mb(memory_method)
+    if memory_method == 'tracemalloc':
+        tracemalloc.stop()
+
+    return {
+        'seconds': seconds,
+        'peak_rss_mb': rss_after,
+        'peak_rss_increase_mb': rss_after - rss_before,
+        'memory_method': memory_method, # See _memory_method; 'tracemalloc' counts Python allocations only
+        'output_bytes': os.path.getsize(output_file) if output_file else None,
+        'success': bool(output_file),
+        'error': None if output_file else output[-1],
+    }
+
+def generate_parity_dataframe(rows, seed=0):
+    """
+    Extends generate_outline_dataframe with the value types the readers and writers could disagree on:
+    floats with gaps and infinities, integers, dates with gaps, booleans, numeric headings, and
+    object columns mixing dates, formula-like strings and URLs.
+    """
+    import numpy as np
+    import pandas as pd
+
+    df = generate_outline_dataframe(rows, bad_ratio=0.05, seed=seed).drop(columns=['Calculated Indents'])
+    rng = np.random.default_rng(seed)
+    df['Float'] = rng.normal(size=rows)
+    df.loc[::7, 'Float'] = np.nan
+    df.loc[5::97, 'Float'] = np.inf
+    df['Integer'] = np.arange(rows)
+    df['Date'] = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.arange(rows), 'D')
+    df.loc[::11, 'Date'] = pd.NaT
+    df['Flag'] = np.arange(rows) % 2 == 0
+    df['Mixed'] = [datetime.date(2024, 1, 1) if row % 5 == 0 else ('=1+1' if row % 7 == 0 else 'https://example.com') for row in range(rows)]
+    df.loc[1::50, 'Heading'] = 1.1 # Numbered headings stored as numbers
+    df.loc[2::50, 'Heading'] = 2
+    return df
+
+def _installed(resolve, engine):
+    try:
+        resolve(engine)
+        return True
+    except ValueError:
+        return False
+
+def check_io_parity(rows=2000, workdir=None, log=print):
+    """
+    Runs indent_excel with every installed reader and writer, in both modes, and checks that each
+    combination writes the same values, heading indents and number formats as openpyxl/openpyxl.
+    The 'patch' writer keeps the source's cells, so its number formats are checked against the source's.
+
+    Returns:
+        bool: True if every combination matched.
+    """
+    import itertools
+    import pandas as pd
+    from openpyxl import load_workbook
+    import Excel_Indent_Functions as functions
+
+    workdir = workdir or tempfile.mkdtemp(prefix='excel_indent_parity_')
+    os.makedirs(workdir, exist_ok=True)
+    source = os.path.join(workdir, f"parity_{rows}.xlsx")
+    generate_parity_dataframe(rows).to_excel(source, index=False)
+    source_formats = [[cell.number_format.lower() for cell in row] for row in load_workbook(source).worksheets[0].iter_rows()]
+
+    # openpyxl/openpyxl comes first and is the baseline
+    readers = sorted((reader for reader in functions.READERS if reader != 'auto' and _installed(functions.resolve_reader, reader)), key=lambda reader: reader != 'openpyxl')
+    writers = sorted((writer for writer in functions.WRITERS if writer != 'auto' and _installed(functions.resolve_writer, writer)), key=lambda writer: writer != 'openpyxl')
+    all_match = True
+    for mode in functions.INDENT_MODES:
+        baseline = None
+        for reader, writer in itertools.product(readers, writers):
+            destination = os.path.join(workdir, f"parity_{mode}_{reader}_{writer}.xlsx")
+            result = functions.indent_excel(source, 'Heading', destination=destination, mode=mode, reader=reader, writer=writer)
+            if not result.success:
+                log(f"{mode:>9} {reader:>8} -> {writer:<10} FAILED: {result.messages[-1]}")
+                all_match = False
+                continue
+
+            sheet = load_workbook(destination).worksheets[0]
+            written = (
+                pd.read_excel(destination, engine='openpyxl').astype(str),
+                [cell.alignment.indent for cell in sheet['A']],
+                [[cell.number_format.lower() for cell in row] for row in sheet.iter_rows()],
+            )
+            if baseline is None:
+                baseline = written
+                log(f"{mode:>9} {reader:>8} -> {writer:<10} baseline")
+                continue
+            differences = [name for name, matches in (
+                ('values', written[0].equals(baseline[0])),
+                ('indents', written[1] == baseline[1]),
+                ('number formats', [row[:len(source_row)] for row, source_row in zip(written[2], source_formats)] == source_formats
+                                   if writer == 'patch' else written[2] == baseline[2]),
+            ) if not matches]
+            all_match &= not differences
+            log(f"{mode:>9} {reader:>8} -> {writer:<10} {'MISMATCH in ' + ', '.join(differences) if differences else 'match'}")
+    return all_match
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(sizes=DEFAULT_SIZES, cases=BENCHMARK_CASES, workdir=None, repeat=1, log=print, **generator_options):
+    """
+    Times each case at each size and returns the machine-readable results.
+
+    Workbooks are generated once per size (and reused from workdir on later runs with the same
+    options). Every measurement runs in its own spawned process.
+
+    Args:
+        sizes (iterable, optional): The row counts to benchmark. Defaults to 1k, 10k, 100k and 1M.
+        cases (iterable, optional): The cases from BENCHMARK_CASES to run. Defaults to all of them.
+        workdir (str, optional): Where to keep the generated workbooks. Defaults to a temporary directory.
+        repeat (int, optional): Runs per measurement; the fastest is kept. Defaults to 1.
+        log (callable, optional): Receives progress lines. Defaults to print.
+        **generator_options: Passed to generate_outline_dataframe.
+
+    Returns:
+        dict: {'meta': {...environment...}, 'results': [{'case', 'rows', 'seconds', 'rows_per_second', ...}]}
+    """
+    import numpy
+    import openpyxl
+    import pandas
+
+    workdir = workdir or tempfile.mkdtemp(prefix='excel_indent_bench_')
+    os.makedirs(workdir, exist_ok=True)
+    options_key = "_".join(f"{key}-{value}" for key, value in sorted(generator_options.items()))
+
+    results = []
+    spawn = multiprocessing.get_context('spawn')
+    for rows in sizes:
+        excel_file = os.path.join(workdir, f"outline_{rows}{'_' + options_key if options_key else ''}.xlsx")
+        if not os.path.exists(excel_file):
+            log(f"Generating {rows:,} rows -> {excel_file}")
+            generate_outline_workbook(excel_file, rows, **generator_options)
+
+        for case in cases:
+            best = None
+            for _ in range(repeat):
+                with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+                    measurement = executor.submit(_run_case, case, excel_file, workdir).result()
+                if best is None or measurement['seconds'] < best['seconds']:
+                    best = measurement
+            best.update(case=case, rows=rows, rows_per_second=rows / best['seconds'] if best['seconds'] else None)
+            results.append(best)
+            log(f"{case:>18} {rows:>10,} rows  {best['seconds']:8.3f}s  {best['rows_per_second'] or 0:12,.0f} rows/s"
+                + f"  peak {best['peak_rss_mb']:8.1f} MB" + (" (Python heap)" if best['memory_method'] == 'tracemalloc' else "")
+                + ("" if best['success'] else f"  FAILED: {best['error']}"))
+
+    meta = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'openpyxl': openpyxl.__version__,
+        'repeat': repeat,
+        'generator_options': generator_options,
+        'memory_method': _memory_method(),
+    }
+    return {'meta': meta, 'results': results}
+
+def compare_benchmarks(baseline, current, threshold=1.2):
+    """
+    Compares two run_benchmarks results case by case.
+
+    Returns:
+        tuple: A tuple containing:
+            - list: One line per (case, rows) present in both, with both times and the ratio.
+            - bool: True if any case got slower than baseline by more than the threshold ratio.
+    """
+    baseline_seconds = {(result['case'], result['rows']): result['seconds'] for result in baseline['results']}
+    lines = []
+    regressed = False
+    for result in current['results']:
+        key = (result['case'], result['rows'])
+        if key not in baseline_seconds:
+            continue
+        ratio = result['seconds'] / baseline_seconds[key] if baseline_seconds[key] else float('inf')
+        flag = ""
+        if ratio > threshold:
+            regressed = True
+            flag = "  REGRESSION"
+        lines.append(f"{result['case']:>18} {result['rows']:>10,} rows  {baseline_seconds[key]:8.3f}s -> {result['seconds']:8.3f}s  x{ratio:5.2f}{flag}")
+    return lines, regressed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="Excel_Indent_Benchmark", description="Benchmark the Excel indent functions on synthetic outline workbooks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Row counts to benchmark (default: 1000 10000 100000 1000000).")
+    parser.add_argument("--cases", nargs="+", choices=BENCHMARK_CASES, default=list(BENCHMARK_CASES), help="Cases to run (default: all).")
+    parser.add_argument("--depth", type=int, default=4, help="Deepest heading level (default: 4).")
+    parser.add_argument("--numbered-ratio", type=float, default=0.3, help="Share of numbered heading rows (default: 0.3).")
+    parser.add_argument("--bad-ratio", type=float, default=0.0, help="Share of blank/malformed rows (default: 0.0).")
+    parser.add_argument("--extra-columns", type=int, default=2, help="Attribute columns per row (default: 2).")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per measurement, keeping the fastest (default: 1).")
+    parser.add_argument("--workdir", help="Directory for generated workbooks, reused between runs (default: a new temporary directory).")
+    parser.add_argument("--json", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="A previous --json file to compare against; exits 1 on a regression.")
+    parser.add_argument("--parity", action="store_true", help="Only check that every installed reader/writer writes the same output; exits 1 on a mismatch.")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio counted as a regression (default: 1.2).")
+    args = parser.parse_args(argv)
+
+    if args.parity:
+        return 0 if check_io_parity(workdir=args.workdir) else 1
+
+    benchmark = run_benchmarks(args.sizes, args.cases, args.workdir, args.repeat, max_depth=args.depth, numbered_ratio=args.numbered_ratio,
+                               bad_ratio=args.bad_ratio, extra_columns=args.extra_columns)
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(benchmark, json_file, indent=2)
+        print(f"Results written to '{args.json}'.")
+
+    if args.compare:
+        with open(args.compare) as json_file:
+            baseline = json.load(json_file)
+        lines, regressed = compare_benchmarks(baseline, benchmark, args.threshold)
+        print(f"\nCompared with {baseline['meta'].get('git_commit') or args.compare}:")
+        for line in lines:
+            print(line)
+        return 1 if regressed else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# Excel Indent CLI
+
+import argparse
+import json
+import os
+import sys
+
+# Excel_Indent_Functions (and with it pandas and openpyxl) is only imported once the arguments
+# have been parsed, so --help and usage errors return immediately. Nothing here imports Qt.
+
+def build_parser():
+    #
+    # Command line options, mirroring the GUI's inputs
+    #
+    parser = argparse.ArgumentParser(
+        prog="Excel_Indent_CLI",
+        description="Indent the heading column of an Excel export based on its outline numbering.")
+    parser.add_argument("input", help="The .xlsx (or .csv, .parquet, .arrow) file to indent, or a folder / glob pattern of files to indent in one batch.")
+    parser.add_argument("-c", "--heading-column", default="Heading", help="The name of the column containing the headings (default: Heading).")
+    parser.add_argument("-o", "--output", help="Where to write the indented file (default: <name>_indented.xlsx next to the input). Not allowed for batches.")
+    parser.add_argument("-m", "--mode", choices=("spaces", "alignment"), default="spaces",
+                        help="'spaces' pads the headings with four spaces per level; 'alignment' keeps the values and sets Excel's cell indent (default: spaces).")
+    parser.add_argument("--numbering", metavar="GRAMMARS",
+                        help="The heading numbering grammars to recognise: a comma-separated list of decimal, alpha ('A.1'), roman ('IV.2') "
+                             "and prefixed ('SYS-REQ-3.1.4'), or a .json file declaring them (default: decimal).")
+    parser.add_argument("--engine", choices=("vectorized", "loop"), default="vectorized", help="The indent calculation engine: 'vectorized' matches each heading once and forward-fills the unnumbered rows "
+                             "column-wide, 'loop' is the original row-by-row loop; both give the same result (default: vectorized).")
+    parser.add_argument("--reader", choices=("auto", "calamine", "openpyxl"), default="auto",
+                        help="The workbook reader; 'auto' uses calamine when installed (default: auto). Not used with --stream.")
+    parser.add_argument("--writer", choices=("auto", "xlsxwriter", "openpyxl", "patch"), default="auto",
+                        help="The workbook writer; 'auto' uses xlsxwriter when installed, 'patch' rewrites only the changed cells of a copy of the source, "
+                             "keeping its formatting (default: auto; with --all-sheets/--sheet, 'patch' when some sheets are not indented). Not used with --stream.")
+    parser.add_argument("--input-format", choices=("excel", "csv", "parquet", "arrow"),
+                        help="The input format (default: from the file extension). For a folder, also selects which files to process. Not used with --stream.")
+    parser.add_argument("--output-format", choices=("excel", "csv", "parquet", "arrow"),
+                        help="The output format (default: from --output's extension, otherwise the input's format). Not used with --stream.")
+    parser.add_argument("--stream", action="store_true", help="Stream rows with bounded memory, for very large files.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Patch only the rows that changed since the last run into the existing output, using its sidecar index (<output>.index.npz).")
+    parser.add_argument("--projected", action="store_true",
+                        help="Parse only the heading column and carry the other columns through unparsed, keeping the source's formatting (fastest on wide files).")
+    parser.add_argument("--group-rows", action="store_true",
+                        help="Group the rows with Excel's row outline, so each heading's section can be collapsed. Not used with --stream, --incremental or --projected.")
+    parser.add_argument("--all-sheets", action="store_true", help="Indent every sheet that has the heading column, not just the first.")
+    parser.add_argument("--sheet", action="append", dest="sheets", metavar="NAME", help="Indent only this sheet (repeatable); other sheets are copied unchanged.")
+    parser.add_argument("--intermediate", action="store_true", help="Also write the intermediate <name>_new.xlsx with the 'Calculated Indents' column.")
+    parser.add_argument("-j", "--workers", type=int, help="Worker processes for a batch, or for --all-sheets on large workbooks (default: number of CPUs).")
+    parser.add_argument("--json-log", metavar="FILE", help="Append a structured JSON record of the run (messages, per-phase timings) to this JSON Lines file.")
+    parser.add_argument("--trace-memory", action="store_true", help="Measure each phase's peak Python memory with tracemalloc (slow).")
+    parser.add_argument("--profile", nargs="?", const=True, metavar="FILE", help="Profile the run with cProfile and print the top functions, or dump the stats to FILE.")
+    parser.add_argument("--cache", action="store_true", help="Reuse earlier results for workbooks whose content has not changed, and store new ones.")
+    parser.add_argument("--cache-dir", metavar="DIR", help="The result cache directory (implies --cache; default: the per-user cache directory).")
+    parser.add_argument("--cache-max-mb", type=int, default=512, metavar="MB", help="Evict the least recently used cached results beyond this size (default: 512).")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print errors.")
+    return parser
+
+def _print_messages(output, quiet):
+    for message in output:
+        if message.lstrip().startswith(("Error", "FAILED")):
+            print(message, file=sys.stderr)
+        elif not quiet:
+            print(message)
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    is_batch = os.path.isdir(args.input) or any(char in args.input for char in "*?[")
+
+    if is_batch and args.output:
+        print("Error: --output can only be used with a single input file.", file=sys.stderr)
+        return 2
+    if args.stream and (args.engine != "vectorized" or args.intermediate or args.reader != "auto" or args.writer != "auto" or args.input_format or args.output_format):
+        print("Error: --engine, --intermediate, --reader, --writer and --input-format/--output-format do not apply to --stream.", file=sys.stderr)
+        return 2
+    multi_sheet = args.all_sheets or bool(args.sheets)
+    if multi_sheet and (is_batch or args.stream or args.intermediate or args.input_format or args.output_format):
+        print("Error: --all-sheets/--sheet cannot be combined with a batch, --stream, --intermediate or --input-format/--output-format.", file=sys.stderr)
+        return 2
+    if (is_batch or multi_sheet) and (args.trace_memory or args.profile):
+        print("Error: --trace-memory and --profile only apply to a single sheet of a single file.", file=sys.stderr)
+        return 2
+    if args.incremental and (is_batch or args.stream or multi_sheet or args.intermediate or args.output_format not in (None, "excel")):
+        print("Error: --incremental only applies to a single file with Excel output, without --stream, --all-sheets/--sheet or --intermediate.", file=sys.stderr)
+        return 2
+    if args.projected and (is_batch or args.stream or args.incremental or multi_sheet or args.intermediate or args.engine != "vectorized"):
+        print("Error: --projected only applies to a single file without --stream, --incremental, --all-sheets/--sheet, --intermediate or --engine.", file=sys.stderr)
+        return 2
+    if args.group_rows and (args.stream or args.incremental or args.projected or args.output_format not in (None, "excel")):
+        print("Error: --group-rows needs Excel output and cannot be combined with --stream, --incremental or --projected.", file=sys.stderr)
+        return 2
+    use_cache = args.cache or bool(args.cache_dir)
+    if use_cache and (multi_sheet or args.intermediate):
+        print("Error: --cache cannot be combined with --all-sheets/--sheet or --intermediate.", file=sys.stderr)
+        return 2
+
+    numbering = None
+    if args.numbering:
+        from Excel_Indent_Numbering import HeadingNumbering
+        try:
+            numbering = HeadingNumbering.from_config(args.numbering)
+        except (OSError, ValueError) as e:
+            print(f"Error: Invalid --numbering: {e}", file=sys.stderr)
+            return 2
+
+    import Excel_Indent_Functions as functions
+
+    cache = None
+    if use_cache:
+        from Excel_Indent_Cache import ResultCache
+        cache = ResultCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+
+    if is_batch:
+        report, output = functions.batch_indent_excel(args.input, args.heading_column, mode=args.mode, max_workers=args.workers, streaming=args.stream, cache=cache,
+                                                    reader=args.reader, writer=args.writer, input_format=args.input_format, output_format=args.output_format,
+                                                    group_rows=args.group_rows, numbering=numbering)
+        _print_messages(output, args.quiet)
+        if args.json_log:
+            with open(args.json_log, 'a', encoding='utf-8') as log:
+                for result in report:
+                    log.write(json.dumps(result, default=str) + "\n")
+        return 0 if report and all(result['status'] == 'success' for result in report) else 1
+
+    if multi_sheet:
+        output_file, output = functions.indent_excel_sheets(args.input, args.heading_column, destination=args.output, sheets=args.sheets,
+                                                            engine=args.engine, mode=args.mode, max_workers=args.workers, reader=args.reader, writer=args.writer,
+                                                            group_rows=args.group_rows, numbering=numbering)
+        _print_messages(output, args.quiet)
+        if args.json_log:
+            functions.write_json_log(functions.ProcessingResult(output_file, output), args.json_log)
+        return 0 if output_file else 1
+
+    if args.incremental:
+        result = functions.incremental_indent_excel(args.input, args.heading_column, destination=args.output, mode=args.mode,
+                                                    trace_memory=args.trace_memory, profile=args.profile, reader=args.reader, writer=args.writer,
+                                                    input_format=args.input_format, numbering=numbering)
+    elif args.projected:
+        result = functions.projected_indent_excel(args.input, args.heading_column, destination=args.output, mode=args.mode, trace_memory=args.trace_memory,
+                                                  profile=args.profile, cache=cache, reader=args.reader, writer=args.writer, input_format=args.input_format,
+                                                  numbering=numbering)
+    elif args.stream:
+        result = functions.stream_indent_excel(args.input, args.heading_column, destination=args.output, mode=args.mode,
+                                               trace_memory=args.trace_memory, profile=args.profile, cache=cache, numbering=numbering)
+    else:
+        result = functions.indent_excel(args.input, args.heading_column, destination=args.output, intermediate_file=args.intermediate or None,
+                                        engine=args.engine, mode=args.mode, trace_memory=args.trace_memory, profile=args.profile, cache=cache,
+                                        reader=args.reader, writer=args.writer, input_format=args.input_format, output_format=args.output_format,
+                                        group_rows=args.group_rows, numbering=numbering)
+    _print_messages(result.messages, args.quiet)
+    if result.profile_stats and args.profile is True:
+        print(result.profile_stats)
+    if args.json_log:
+        functions.write_json_log(result, args.json_log)
+    return 0 if result.success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
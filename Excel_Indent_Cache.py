@@ -0,0 +1,134 @@
+# Excel Indent Cache
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024 # 512 MB
+HASH_CHUNK_BYTES = 1024 * 1024
+
+def default_cache_dir():
+    """
+    Returns the per-user cache directory: %LOCALAPPDATA%\\ExcelIndent\\cache on Windows,
+    otherwise $XDG_CACHE_HOME/excel_indent (or ~/.cache/excel_indent).
+    """
+    if os.name == 'nt' and os.environ.get('LOCALAPPDATA'):
+        return os.path.join(os.environ['LOCALAPPDATA'], 'ExcelIndent', 'cache')
+    return os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'excel_indent')
+
+def hash_source(source):
+    """
+    Returns the SHA-256 hex digest of a file's content.
+
+    Args:
+        source (str or file-like): A file path, or a binary stream, which is read in chunks and
+                                   then returned to its starting position.
+    """
+    digest = hashlib.sha256()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as source_file:
+            for chunk in iter(lambda: source_file.read(HASH_CHUNK_BYTES), b''):
+                digest.update(chunk)
+    else:
+        start = source.tell()
+        for chunk in iter(lambda: source.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+        source.seek(start)
+    return digest.hexdigest()
+
+class ResultCache:
+    """
+    An on-disk cache of indented workbooks, keyed on the source file's content hash plus the options
+    that affect the output (heading column, mode, engine, tool version, ...).
+
+    Each entry is one file in the cache directory. A hit refreshes the entry's modification time and
+    the least recently used entries are evicted once the cache grows past max_bytes. Entries are
+    written to a temporary file and renamed into place, so concurrent batch workers can share a cache.
+
+    Args:
+        cache_dir (str, optional): The cache directory, created if needed. Defaults to default_cache_dir().
+        max_bytes (int, optional): The total size to evict down to. Defaults to 512 MB.
+    """
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, source, **parameters):
+        """
+        Builds the cache key for a source file and the options it is processed with.
+        """
+        parameter_text = json.dumps(parameters, sort_keys=True, default=str)
+        return hashlib.sha256(f"{hash_source(source)}\n{parameter_text}".encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.xlsx")
+
+    def fetch(self, key, destination):
+        """
+        Copies a cached result to the destination (a path or a writable binary stream).
+
+        Returns:
+            bool: True on a hit, False if the key is not cached.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'rb') as entry:
+                if isinstance(destination, (str, os.PathLike)):
+                    with open(destination, 'wb') as destination_file:
+                        shutil.copyfileobj(entry, destination_file)
+                else:
+                    shutil.copyfileobj(entry, destination)
+        except FileNotFoundError:
+            return False
+        try:
+            os.utime(entry_path) # Mark as recently used
+        except OSError:
+            pass
+        return True
+
+    def store(self, key, result):
+        """
+        Adds a result (a file path or an in-memory stream such as io.BytesIO) to the cache, then evicts
+        the least recently used entries beyond max_bytes.
+        """
+        handle, temporary_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as entry:
+                if isinstance(result, (str, os.PathLike)):
+                    with open(result, 'rb') as result_file:
+                        shutil.copyfileobj(result_file, entry)
+                else:
+                    entry.write(result.getvalue())
+            os.replace(temporary_path, self._entry_path(key))
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in max_bytes.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.xlsx'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue # Evicted by another worker
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
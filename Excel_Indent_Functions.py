@@ -1,15 +1,759 @@
 # Excel Indent Function
 
+import numpy as np
 import pandas as pd
+import bisect
+import cProfile
+import concurrent.futures
+import copy
+import csv
+import dataclasses
+import datetime
+import glob
+import importlib.util
+import io
+import json
 import os
+import pstats
 import re
 import sys
+import time
+import tracemalloc
+import zipfile
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment
+from openpyxl.styles.cell_style import StyleArray
+from Excel_Indent_Numbering import DEFAULT_NUMBERING
+from Excel_Indent_Outline import OutlineIndex, build_outline_index
+from Excel_Indent_Patch import patch_sheets, patch_workbook, read_sheet_column
 
-def indent_function(excel_file, heading_column, indent_column):
+TOOL_VERSION = '3.2' # Part of every cache key: bump it whenever the output for the same input changes
+
+CALCULATED_INDENTS_COLUMN = 'Calculated Indents'
+
+INDENT_MODES = ('spaces', 'alignment')
+MAX_INDENT_LEVEL = np.iinfo(np.int32).max # Larger levels in a level column are reported as invalid
+
+READERS = ('auto', 'calamine', 'openpyxl')
+WRITERS = ('auto', 'xlsxwriter', 'openpyxl', 'patch')
+
+TABLE_FORMATS = ('excel', 'csv', 'parquet', 'arrow')
+FORMAT_EXTENSIONS = {
+    '.xlsx': 'excel',
+    '.xlsm': 'excel',
+    '.xls': 'excel',
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+}
+FORMAT_DEFAULT_EXTENSIONS = {'excel': '.xlsx', 'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}
+
+STREAM_PROGRESS_INTERVAL = 1000 # Rows between progress reports and cancel checks while streaming
+
+SHEET_PROCESS_ROWS = 200000 # Selected rows from which indent_excel_sheets indents sheets in worker processes
+
+INCREMENTAL_INDEX_SUFFIX = '.index.npz'
+INCREMENTAL_INDEX_VERSION = 1 # Bump when the sidecar index layout changes
+# Patching a row in place costs a few times more than writing it to a new workbook, so beyond this share of rows to patch a full run is faster
+INCREMENTAL_MAX_PATCHED_FRACTION = 0.25
+
+class _MessageLog(list):
+    """
+    A message list that also passes every appended message on to a callback as it is produced.
+    """
+    def __init__(self, on_message):
+        super().__init__()
+        self._on_message = on_message
+
+    def append(self, message):
+        super().append(message)
+        self._on_message(message)
+
+class ProgressReporter:
+    """
+    Connects a long-running pipeline to its caller, e.g. a GUI worker thread.
+
+    Args:
+        on_message (callable, optional): Called with each output message as soon as it is appended.
+        on_progress (callable, optional): Called with (phase, rows_processed, total_rows) where phase is
+                                          'read', 'compute' or 'write' and total_rows is 0 when unknown.
+                                          Batch runs report phase 'batch' with files instead of rows.
+        is_cancelled (callable, optional): Returns True once the caller wants the pipeline to stop.
+    """
+    def __init__(self, on_message=None, on_progress=None, is_cancelled=None):
+        self.on_message = on_message
+        self.on_progress = on_progress
+        self.is_cancelled = is_cancelled
+
+    def message_log(self):
+        """
+        Returns a new output message list, streaming to on_message if one was given.
+        """
+        return _MessageLog(self.on_message) if self.on_message else []
+
+    def progress(self, phase, rows=0, total=0):
+        if self.on_progress:
+            self.on_progress(phase, rows, total)
+
+    def cancelled(self, output):
+        """
+        Checks for cancellation, noting it in the output messages. Nothing has been written when a
+        pipeline stops here, so it can simply return.
+        """
+        if self.is_cancelled and self.is_cancelled():
+            output.append("Processing cancelled.")
+            return True
+        return False
+
+@dataclasses.dataclass
+class PhaseMetrics:
+    """
+    The measurements of one pipeline phase ('read', 'compute' or 'write').
+    """
+    name: str
+    seconds: float = 0.0
+    rows: int = 0
+    peak_memory_mb: float = None # Peak Python heap during the phase; only measured with trace_memory
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else None
+
+    def to_dict(self):
+        return {**dataclasses.asdict(self), 'rows_per_second': self.rows_per_second}
+
+@dataclasses.dataclass
+class ProcessingResult:
+    """
+    The structured result of a pipeline run: the output file, the messages and the per-phase metrics.
+
+    It still unpacks like the older (output_file, output) tuples, so
+    'output_file, output = indent_excel(...)' keeps working.
+    """
+    output_file: object
+    messages: list
+    phases: list = dataclasses.field(default_factory=list)
+    total_seconds: float = 0.0
+    peak_memory_mb: float = None
+    profile_stats: str = None # The top of the cProfile report, when profiling was requested
+    cache_status: str = None # 'hit' or 'miss' when a ResultCache was used
+
+    @property
+    def success(self):
+        return bool(self.output_file)
+
+    def __iter__(self):
+        return iter((self.output_file, self.messages))
+
+    def timing_summary(self):
+        """
+        Returns a one-line summary of the phase timings, e.g. 'read 1.20s (8,000 rows, 6,667 rows/s), ...'.
+        """
+        parts = []
+        for phase in self.phases:
+            part = f"{phase.name} {phase.seconds:.2f}s"
+            if phase.rows:
+                part += f" ({phase.rows:,} rows, {phase.rows_per_second:,.0f} rows/s)"
+            if phase.peak_memory_mb is not None:
+                part += f" peak {phase.peak_memory_mb:.1f} MB"
+            parts.append(part)
+        return f"Timing: {', '.join(parts)}; total {self.total_seconds:.2f}s."
+
+    def to_dict(self):
+        return {
+            'output_file': self.output_file if isinstance(self.output_file, str) else ("<stream>" if self.output_file else ""),
+            'success': self.success,
+            'messages': list(self.messages),
+            'phases': [phase.to_dict() for phase in self.phases],
+            'total_seconds': self.total_seconds,
+            'peak_memory_mb': self.peak_memory_mb,
+            'cache_status': self.cache_status,
+        }
+
+def write_json_log(result, log_file):
+    """
+    Appends a ProcessingResult to a JSON Lines log file, one run per line, with a timestamp.
+    """
+    record = {'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(), **result.to_dict()}
+    with open(log_file, 'a', encoding='utf-8') as log:
+        log.write(json.dumps(record, default=str) + "\n")
+
+class _Instrumentation:
+    """
+    Times the phases of one pipeline run and optionally traces memory (tracemalloc) and profiles it (cProfile).
+
+    Phases are started with begin(); each one ends when the next begins or the run finishes, so an
+    early return from the pipeline still closes the phase it was in.
+    """
+    def __init__(self, trace_memory=False, profile=False):
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self.phases = []
+        self._current = None
+        self._phase_start = None
+        self._profiler = None
+        self._started_tracing = False
+        self.cache_status = None
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._run_start = time.perf_counter()
+        return self
+
+    def begin(self, name, rows=0):
+        if self._current is not None and self._current.name == name:
+            return # Already in this phase
+        self._end_phase()
+        self._current = PhaseMetrics(name, rows=rows)
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        self._phase_start = time.perf_counter()
+
+    def set_rows(self, rows):
+        if self._current is not None:
+            self._current.rows = rows
+
+    def _end_phase(self):
+        if self._current is None:
+            return
+        self._current.seconds = time.perf_counter() - self._phase_start
+        if self.trace_memory:
+            self._current.peak_memory_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        self.phases.append(self._current)
+        self._current = None
+
+    def __exit__(self, *exc_info):
+        self._end_phase()
+        self.total_seconds = time.perf_counter() - self._run_start
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._started_tracing:
+            tracemalloc.stop()
+        return False
+
+    def result(self, output_file, output):
+        """
+        Builds the ProcessingResult and adds the timing summary to the output messages.
+        """
+        peak_memory = [phase.peak_memory_mb for phase in self.phases if phase.peak_memory_mb is not None]
+        result = ProcessingResult(output_file, output, self.phases, self.total_seconds, max(peak_memory) if peak_memory else None,
+                                  cache_status=self.cache_status)
+        if self._profiler is not None:
+            if isinstance(self.profile, (str, os.PathLike)):
+                self._profiler.dump_stats(self.profile)
+            stats_text = io.StringIO()
+            pstats.Stats(self._profiler, stream=stats_text).sort_stats('cumulative').print_stats(25)
+            result.profile_stats = stats_text.getvalue()
+        if self.phases:
+            output.append(result.timing_summary())
+        return result
+
+def _next_indent_level(value, last_numbered_heading_indent, numbering=None):
+    """
+    Calculates the indent level of a single heading from the state carried over from the rows above it.
+
+    Args:
+        value: The heading cell value.
+        last_numbered_heading_indent (int): The level of the last numbered heading seen, or -1 if none yet.
+        numbering (HeadingNumbering, optional): The numbering grammars to recognise. Defaults to DEFAULT_NUMBERING.
+
+    Returns:
+        tuple: A tuple containing:
+            - int: The indent level of this heading.
+            - int: The updated last numbered heading level to pass on to the next row.
+    """
+    current_indent = (numbering or DEFAULT_NUMBERING).match_level(str(value).strip())
+
+    if current_indent is not None:
+        return current_indent, current_indent
+    if last_numbered_heading_indent == -1:
+        return 0, last_numbered_heading_indent
+    return last_numbered_heading_indent + 1, last_numbered_heading_indent
+
+def _calculate_indent_levels_loop(heading_series, numbering=None):
+    """
+    Calculates the indent level of every heading in a column, one row at a time.
+
+    Numbered headings (e.g. '1.1.2 Title') are indented by the number of separators in their
+    numbering. Non-numbered rows are indented one level deeper than the last
+    numbered heading above them, or 0 if no numbered heading has been seen yet.
+
+    Args:
+        heading_series (pd.Series): The heading column.
+        numbering (HeadingNumbering, optional): The numbering grammars to recognise. Defaults to DEFAULT_NUMBERING.
+
+    Returns:
+        np.ndarray: The indent level for each row, in order.
+    """
+    calculated_indents = []
+    last_numbered_heading_indent = -1
+
+    for value in heading_series:
+        current_indent, last_numbered_heading_indent = _next_indent_level(value, last_numbered_heading_indent, numbering)
+        calculated_indents.append(current_indent)
+
+    return np.array(calculated_indents, dtype=np.int64)
+
+def _calculate_indent_levels_vectorized(heading_series, numbering=None):
+    """
+    Calculates the same indent levels as _calculate_indent_levels_loop in two passes instead of one
+    stateful loop: HeadingNumbering.match_levels matches each heading once against the combined pattern
+    of all grammars (still a Python-level match per row), then the levels of the unnumbered rows are
+    filled in column-wide with a forward fill rather than carried from row to row.
+
+    Args:
+        heading_series (pd.Series): The heading column.
+        numbering (HeadingNumbering, optional): The numbering grammars to recognise. Defaults to DEFAULT_NUMBERING.
+
+    Returns:
+        np.ndarray: The indent level for each row, in order.
+    """
+    # One pass of the combined pattern, however many grammars it holds; NaN marks the unnumbered rows
+    levels = (numbering or DEFAULT_NUMBERING).match_levels(heading_series)
+
+    # Non-numbered rows inherit the last numbered heading's level + 1, or 0 before the first one
+    levels = pd.Series(levels)
+    levels = levels.fillna(levels.ffill() + 1).fillna(0)
+
+    return levels.to_numpy(dtype=np.int64)
+
+# 'vectorized': one combined-pattern match per row, then a vectorized forward fill; 'loop': the original stateful row loop
+INDENT_ENGINES = {
+    'vectorized': _calculate_indent_levels_vectorized,
+    'loop': _calculate_indent_levels_loop,
+}
+
+def _calculate_indent_levels(heading_series, engine='vectorized', numbering=None):
+    """
+    Calculates the indent level of every heading in a column with the selected engine.
+
+    Args:
+        heading_series (pd.Series): The heading column.
+        engine (str, optional): One of INDENT_ENGINES. Both engines give identical results; 'vectorized' matches each
+                                row once and fills in the unnumbered rows with a forward fill, 'loop' is the original
+                                row-by-row implementation. Defaults to 'vectorized'.
+        numbering (HeadingNumbering, optional): The numbering grammars to recognise. Defaults to DEFAULT_NUMBERING,
+                                                the decimal '1.2.3' numbering.
+
+    Returns:
+        np.ndarray: The indent level for each row, in order.
+    """
+    if engine not in INDENT_ENGINES:
+        raise ValueError(f"Unknown indent engine '{engine}'. Expected one of: {', '.join(INDENT_ENGINES)}.")
+    return INDENT_ENGINES[engine](heading_series, numbering)
+
+def _format_row_ranges(rows):
+    """
+    Collapses sorted row numbers into a compact string, e.g. [3, 4, 5, 9] -> '3-5, 9'.
+    """
+    ranges = []
+    start = previous = None
+    for row in rows:
+        if start is None:
+            start = previous = row
+        elif row == previous + 1:
+            previous = row
+        else:
+            ranges.append(f"{start}-{previous}" if previous != start else f"{start}")
+            start = previous = row
+    if start is not None:
+        ranges.append(f"{start}-{previous}" if previous != start else f"{start}")
+    return ", ".join(ranges)
+
+def _coerce_indent_levels(numbering_series, heading_column, output):
+    """
+    Converts a column of indent levels to integers, reporting every invalid or missing level
+    in a single warning.
+
+    Args:
+        numbering_series (pd.Series): The indent level of each row.
+        heading_column (str or int): The name or index of the level column, used in warnings.
+        output (list): The message list warnings are appended to.
+
+    Returns:
+        tuple: A tuple containing:
+            - np.ndarray: The integer indent level of each row (0 where invalid, negatives clipped to 0).
+                          Levels beyond MAX_INDENT_LEVEL in either direction are invalid.
+            - np.ndarray: A boolean mask of the rows with a valid level.
+    """
+    levels = pd.to_numeric(numbering_series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    # Whole numbers beyond int32 (e.g. 1e20) would wrap around when cast to int64, so they count as invalid too
+    with np.errstate(invalid='ignore'):
+        valid = np.isfinite(levels) & (levels == np.floor(levels)) & (np.abs(levels) <= MAX_INDENT_LEVEL)
+    # True/False coerce to 1/0 but were never accepted as indent levels
+    if numbering_series.dtype == bool:
+        valid[:] = False
+    elif numbering_series.dtype == object:
+        valid &= ~numbering_series.map(lambda value: isinstance(value, (bool, np.bool_))).to_numpy(dtype=bool)
+
+    if not valid.all():
+        invalid_rows = np.flatnonzero(~valid) + 1
+        output.append(f"Warning: {len(invalid_rows)} row(s) ({_format_row_ranges(invalid_rows.tolist())}): Invalid, missing or out-of-range numeric value in heading column ('{heading_column}'). Skipping indentation for these rows and keeping original values.")
+
+    # Negative levels get no indent, matching "    " * level
+    int_levels = np.zeros(len(levels), dtype=np.int64)
+    int_levels[valid] = np.clip(levels[valid], 0, None)
+    return int_levels, valid
+
+def _apply_space_indents(numbering_series, indent_series, heading_column, output):
+    """
+    Prepends four spaces per indent level to every value of a column.
+
+    The padding is built once per distinct level and concatenated for the whole column at once.
+
+    Args:
+        numbering_series (pd.Series): The indent level of each row.
+        indent_series (pd.Series): The values to be indented.
+        heading_column (str or int): The name or index of the level column, used in warnings.
+        output (list): The message list warnings are appended to.
+
+    Returns:
+        np.ndarray: The indented values. Rows with an invalid level keep their original value.
+    """
+    levels, valid = _coerce_indent_levels(numbering_series, heading_column, output)
+
+    indented_values = indent_series.to_numpy(dtype=object).copy()
+    if valid.any():
+        # Padding is built only for the levels present, so one very deep row costs one long string, not one per level below it
+        present_levels, level_positions = np.unique(levels[valid], return_inverse=True)
+        padding_by_level = np.array(["    " * level for level in present_levels.tolist()], dtype=object) # Using 4 spaces for an indent
+        indented_values[valid] = padding_by_level[level_positions.ravel()] + indent_series[valid].astype(str).to_numpy(dtype=object)
+
+    return indented_values
+
+def _apply_alignment_indents(worksheet, column_index, levels, valid, first_row=2):
+    """
+    Indents the cells of a worksheet column with Excel's own cell indent instead of padding
+    their values. Values and all other formatting are left untouched.
+
+    One Alignment is built and registered per indent level (and per existing alignment style) and
+    its style id is reused for every cell at that level. Cells whose alignment is 'general' or 'center' are switched to
+    'left', since Excel only shows an indent on left, right or distributed cells.
+
+    Args:
+        worksheet (openpyxl.worksheet.worksheet.Worksheet): The sheet to update.
+        column_index (int): The 1-based index of the column to indent.
+        levels (np.ndarray): The integer indent level of each data row.
+        valid (np.ndarray): A boolean mask of the rows to indent.
+        first_row (int, optional): The sheet row of the first data row. Defaults to 2 (below the header).
+    """
+    alignments = worksheet.parent._alignments
+    alignment_id_cache = {}
+    for offset in np.flatnonzero(valid):
+        level = min(int(levels[offset]), 255) # Excel's maximum indent
+        cell = worksheet.cell(row=first_row + int(offset), column=column_index)
+        if not cell.has_style:
+            cell._style = StyleArray()
+        key = (cell._style.alignmentId, level)
+        alignment_id = alignment_id_cache.get(key)
+        if alignment_id is None:
+            alignment = copy.copy(cell.alignment)
+            alignment.indent = level
+            if alignment.horizontal not in ('left', 'right', 'distributed'):
+                alignment.horizontal = 'left'
+            # Register the style once; every other cell at this level just reuses its id
+            alignment_id = alignments.add(alignment)
+            alignment_id_cache[key] = alignment_id
+        cell._style.alignmentId = alignment_id
+
+def _apply_row_outline(worksheet, outline_levels, first_row=2):
+    """
+    Groups the data rows of a worksheet by their outline level (see OutlineIndex.outline_levels), with each
+    group's summary row above its details, so every heading collapses the rows under it.
+
+    Args:
+        worksheet (openpyxl.worksheet.worksheet.Worksheet): The sheet to update.
+        outline_levels (np.ndarray): The outline level of each data row.
+        first_row (int, optional): The sheet row of the first data row. Defaults to 2 (below the header).
+    """
+    for offset in np.flatnonzero(outline_levels):
+        worksheet.row_dimensions[first_row + int(offset)].outline_level = int(outline_levels[offset])
+    worksheet.sheet_properties.outlinePr.summaryBelow = False
+    # openpyxl fills in outlineLevelCol itself but not outlineLevelRow, which sizes Excel's outline buttons
+    worksheet.sheet_format.outlineLevelRow = int(outline_levels.max()) if len(outline_levels) else 0
+
+def _derive_file_name(excel_file, suffix):
+    """
+    Builds '<name><suffix><ext>' in the same directory as the given file.
+    """
+    base_name, ext = os.path.splitext(excel_file)
+    return os.path.join(os.path.dirname(excel_file), f"{os.path.basename(base_name)}{suffix}{ext}")
+
+def _module_available(module_name):
+    return importlib.util.find_spec(module_name) is not None
+
+def resolve_reader(reader='auto'):
+    """
+    Picks the pandas engine used to read workbooks.
+
+    Args:
+        reader (str, optional): One of READERS. 'auto' uses 'calamine' (the Rust python-calamine reader, several
+                                times faster) when it is installed and pandas supports it, and 'openpyxl' otherwise.
+                                Defaults to 'auto'.
+
+    Returns:
+        str: 'calamine' or 'openpyxl'.
+
+    Raises:
+        ValueError: If the reader is unknown or not installed.
+    """
+    if reader not in READERS:
+        raise ValueError(f"Unknown reader '{reader}'. Expected one of: {', '.join(READERS)}.")
+    calamine_available = _module_available('python_calamine') and tuple(int(part) for part in re.findall(r'\d+', pd.__version__)[:2]) >= (2, 2)
+    if reader == 'auto':
+        return 'calamine' if calamine_available else 'openpyxl'
+    if reader == 'calamine' and not calamine_available:
+        raise ValueError("The 'calamine' reader needs the python-calamine package and pandas 2.2 or later.")
+    return reader
+
+def resolve_writer(writer='auto'):
+    """
+    Picks the library used to write new workbooks.
+
+    Args:
+        writer (str, optional): One of WRITERS. 'auto' uses 'xlsxwriter' (in constant_memory mode, so rows are
+                                flushed as they are written) when it is installed, and 'openpyxl' otherwise.
+                                'patch' does not build a new workbook but rewrites the changed cells of a copy
+                                of the source .xlsx (see _patch_sheets). Defaults to 'auto'.
+
+    Returns:
+        str: 'xlsxwriter', 'openpyxl' or 'patch'.
+
+    Raises:
+        ValueError: If the writer is unknown or not installed.
+    """
+    if writer not in WRITERS:
+        raise ValueError(f"Unknown writer '{writer}'. Expected one of: {', '.join(WRITERS)}.")
+    if writer == 'auto':
+        return 'xlsxwriter' if _module_available('xlsxwriter') else 'openpyxl'
+    if writer == 'xlsxwriter' and not _module_available('xlsxwriter'):
+        raise ValueError("The 'xlsxwriter' writer needs the XlsxWriter package.")
+    return writer
+
+def _xlsxwriter_column(series):
+    """
+    Converts a column to the values DataFrame.to_excel writes: None (an empty cell) for missing values,
+    'inf'/'-inf' for infinities and plain Python scalars otherwise.
+    """
+    values = series.astype(object).where(series.notna(), None)
+    if series.dtype.kind == 'f':
+        values = values.where(~np.isposinf(series), 'inf').where(~np.isneginf(series), '-inf')
+    return values.tolist()
+
+def _write_sheets_xlsxwriter(destination, sheets, mode, group_rows=False):
+    """
+    Writes the sheets row by row with xlsxwriter in constant_memory mode, matching what DataFrame.to_excel
+    writes with openpyxl: the same values, a bold bordered header and the same date formats. A stream
+    destination is assembled in memory instead, since constant_memory mode spools every sheet to temporary files.
+    """
+    import xlsxwriter
+
+    # Like openpyxl, strings starting with '=' are written as formulas but URLs stay plain strings
+    memory_option = 'constant_memory' if isinstance(destination, (str, os.PathLike)) else 'in_memory'
+    workbook = xlsxwriter.Workbook(destination, {memory_option: True, 'strings_to_urls': False})
+    try:
+        header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        date_formats = [
+            (datetime.datetime, workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})),
+            (datetime.date, workbook.add_format({'num_format': 'yyyy-mm-dd'})),
+            (datetime.time, workbook.add_format({'num_format': 'h:mm:ss'})),
+        ]
+        indent_formats = {}
+        for sheet_name, df, heading_column in sheets:
+            worksheet = workbook.add_worksheet(sheet_name)
+            worksheet.write_row(0, 0, list(df.columns), header_format)
+
+            columns = [_xlsxwriter_column(df.iloc[:, position]) for position in range(df.shape[1])]
+            # Only datetime and object columns can hold dates, which need a number format to show as dates
+            date_positions = [position for position, column in enumerate(columns) if df.iloc[:, position].dtype.kind in 'MO'
+                              and any(isinstance(value, (datetime.date, datetime.time)) for value in column)]
+            heading_position = df.columns.get_loc(heading_column) if mode == 'alignment' and heading_column is not None else None
+            if heading_position is not None:
+                levels = np.minimum(df[CALCULATED_INDENTS_COLUMN].to_numpy(dtype=np.int64), 255) # Excel's maximum indent
+            outline_levels = None
+            if group_rows and heading_column is not None:
+                outline_levels = build_outline_index(df[CALCULATED_INDENTS_COLUMN]).outline_levels().tolist()
+                worksheet.outline_settings(True, False, True, False) # Summary rows above their details
+
+            for row_number, row in enumerate(zip(*columns), start=1):
+                # In constant_memory mode a row's options must be set before its cells are written
+                if outline_levels is not None and outline_levels[row_number - 1]:
+                    worksheet.set_row(row_number, None, None, {'level': outline_levels[row_number - 1]})
+                worksheet.write_row(row_number, 0, row)
+                for position in date_positions:
+                    value = row[position]
+                    for date_type, date_format in date_formats:
+                        if isinstance(value, date_type):
+                            worksheet.write_datetime(row_number, position, value, date_format)
+                            break
+                if heading_position is not None:
+                    level = int(levels[row_number - 1])
+                    if level not in indent_formats:
+                        indent_formats[level] = workbook.add_format({'indent': level, 'align': 'left'})
+                    worksheet.write(row_number, heading_position, row[heading_position], indent_formats[level])
+    finally:
+        workbook.close()
+
+def _write_sheets(destination, sheets, writer, mode='spaces', group_rows=False):
+    """
+    Writes DataFrames to a new workbook, one sheet per (sheet_name, df, heading_column) entry. In alignment
+    mode, the heading column of the entries that have one is given Excel's cell indent from the sheet's
+    'Calculated Indents' column. With group_rows, their rows are also grouped by the outline that column
+    describes, so each heading can be collapsed in Excel.
+
+    Args:
+        destination (str or file-like): Where to write the workbook.
+        sheets (list): The (sheet_name, df, heading_column or None) entries, in sheet order.
+        writer (str): A resolved writer, 'xlsxwriter' or 'openpyxl'.
+        mode (str, optional): 'spaces' or 'alignment'. Defaults to 'spaces'.
+        group_rows (bool, optional): Group the rows of the entries that have a heading column. Defaults to False.
+    """
+    if writer == 'xlsxwriter':
+        _write_sheets_xlsxwriter(destination, sheets, mode, group_rows)
+        return
+
+    with pd.ExcelWriter(destination, engine='openpyxl') as excel_writer:
+        for sheet_name, df, heading_column in sheets:
+            df.to_excel(excel_writer, sheet_name=sheet_name, index=False)
+            if mode == 'alignment' and heading_column is not None:
+                levels = df[CALCULATED_INDENTS_COLUMN].to_numpy()
+                _apply_alignment_indents(excel_writer.sheets[sheet_name], df.columns.get_loc(heading_column) + 1, levels, np.ones(len(levels), dtype=bool))
+            if group_rows and heading_column is not None:
+                _apply_row_outline(excel_writer.sheets[sheet_name], build_outline_index(df[CALCULATED_INDENTS_COLUMN]).outline_levels())
+
+def _patch_sheets(source, destination, sheets, mode='spaces', group_rows=False):
+    """
+    The 'patch' writer. Instead of building a new workbook from the DataFrames, it copies the source
+    workbook and rewrites only the cells that change (see Excel_Indent_Patch.patch_sheets), so the source's
+    formatting, column widths, filters and formulas survive and the time taken follows the number of
+    changed cells rather than the size of the sheet.
+
+    The DataFrames must have been read from the source by pandas, so that their rows and columns map
+    onto the sheet from cell A1. The 'Calculated Indents' column is written where it already is or appended,
+    with its header formatted like the heading column's header.
+
+    Args:
+        source (str): The .xlsx file the sheets were read from.
+        destination (str): Where to write the patched copy.
+        sheets (list): (sheet_name, df, heading_column, original_headings) entries for the sheets to patch. df holds the
+                       indented headings and the 'Calculated Indents' column, original_headings the heading values as read.
+        mode (str, optional): 'spaces' rewrites the heading cells whose value changed, 'alignment' sets Excel's cell
+                              indent of every heading cell, and None leaves the heading cells alone. Defaults to 'spaces'.
+        group_rows (bool, optional): Also group the rows by their outline, as _write_sheets does. Defaults to False.
+    """
+    patches = {}
+    for sheet_name, df, heading_column, original_headings in sheets:
+        heading_position = df.columns.get_loc(heading_column) + 1
+        levels_position = df.columns.get_loc(CALCULATED_INDENTS_COLUMN) + 1
+        levels = df[CALCULATED_INDENTS_COLUMN].to_numpy()
+        values = {(1, levels_position): CALCULATED_INDENTS_COLUMN}
+        values.update(((row + 2, levels_position), _excel_value(level)) for row, level in enumerate(levels))
+        indents = None
+        if mode == 'spaces':
+            headings = df[heading_column].to_numpy(dtype=object)
+            for row in np.flatnonzero(headings != original_headings.to_numpy(dtype=object)):
+                values[(int(row) + 2, heading_position)] = _excel_value(headings[row])
+        elif mode == 'alignment':
+            indents = {(row + 2, heading_position): min(int(level), 255) for row, level in enumerate(levels)} # Excel's maximum indent
+        outline_levels = None
+        if group_rows:
+            outline_levels = {row + 2: int(level) for row, level in enumerate(build_outline_index(levels).outline_levels())}
+        patches[sheet_name] = (values, indents, {(1, levels_position): heading_position}, outline_levels, None)
+    patch_sheets(source, destination, patches)
+
+def _patch_writer_applies(source, destination):
+    """
+    Whether the 'patch' writer can be picked for 'auto': an .xlsx source file and an .xlsx destination path (or none).
+    """
+    def is_xlsx_path(path):
+        return isinstance(path, (str, os.PathLike)) and os.path.splitext(os.fspath(path))[1].lower() in ('.xlsx', '.xlsm')
+    return is_xlsx_path(source) and (destination is None or is_xlsx_path(destination))
+
+def _check_patch_writer(source, destination, input_format='excel', output_format='excel'):
+    """
+    Raises ValueError unless the 'patch' writer can be used: it needs an .xlsx source file and an .xlsx destination path.
+    """
+    if not isinstance(source, (str, os.PathLike)) or input_format != 'excel' or output_format != 'excel' \
+            or not (destination is None or isinstance(destination, (str, os.PathLike))):
+        raise ValueError("The 'patch' writer needs an Excel source file and an Excel destination file path.")
+
+def detect_format(path_or_stream, file_format=None):
+    """
+    Picks the table format of an input or output.
+
+    Args:
+        path_or_stream (str or file-like): The file path or stream.
+        file_format (str, optional): One of TABLE_FORMATS to use regardless of the extension.
+
+    Returns:
+        str: file_format if given, otherwise the format of the path's extension ('excel' for streams
+             and unknown extensions).
+
+    Raises:
+        ValueError: If file_format is not one of TABLE_FORMATS.
+    """
+    if file_format is not None:
+        if file_format not in TABLE_FORMATS:
+            raise ValueError(f"Unknown file format '{file_format}'. Expected one of: {', '.join(TABLE_FORMATS)}.")
+        return file_format
+    if isinstance(path_or_stream, (str, os.PathLike)):
+        return FORMAT_EXTENSIONS.get(os.path.splitext(os.fspath(path_or_stream))[1].lower(), 'excel')
+    return 'excel'
+
+def _read_table(source, file_format, reader, heading_column=None):
+    """
+    Reads the first sheet of a workbook, or a whole CSV, Parquet or Arrow IPC file, into a DataFrame.
+    CSV headings are read as text, so a prefix such as '1.10' keeps its dots.
+    """
+    if file_format == 'csv':
+        return pd.read_csv(source, dtype={heading_column: str} if heading_column is not None else None)
+    if file_format == 'parquet':
+        return pd.read_parquet(source)
+    if file_format == 'arrow':
+        return pd.read_feather(source) # Feather V2 is the Arrow IPC file format
+    return pd.read_excel(source, engine=reader)
+
+def _write_table(destination, df, file_format, writer, heading_column=None, mode='spaces', group_rows=False):
+    """
+    Writes a DataFrame as a one-sheet workbook (see _write_sheets) or as a CSV, Parquet or Arrow IPC file.
+    Alignment indents and row groups only exist in workbooks, so pipelines reject them for the other formats.
+    """
+    if file_format == 'csv':
+        df.to_csv(destination, index=False)
+    elif file_format == 'parquet':
+        df.to_parquet(destination, index=False)
+    elif file_format == 'arrow':
+        df.reset_index(drop=True).to_feather(destination)
+    else:
+        _write_sheets(destination, [('Sheet1', df, heading_column)], writer, mode, group_rows)
+
+def _default_destination(source, input_format='excel', output_format='excel'):
+    """
+    Returns where an indented copy is written by default: '<name>_indented' next to a source path (with the
+    output format's extension when it differs from the input's), or a new io.BytesIO for other sources.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        return io.BytesIO()
+    destination = _derive_file_name(os.fspath(source), "_indented")
+    if output_format != input_format:
+        destination = os.path.splitext(destination)[0] + FORMAT_DEFAULT_EXTENSIONS[output_format]
+    return destination
+
+def indent_function(excel_file, heading_column, indent_column, mode='spaces', reader='auto', writer='auto'):
     """
     Reads an Excel file, applies indentation to a specified column
     based on values in another column, and saves the modified DataFrame
     to a new Excel file with an '_indented' suffix in the same directory.
+    CSV, Parquet and Arrow IPC files (by extension) are read and written in their own format.
 
     Args:
         excel_file (str): The full path to the Excel file to manipulate.
@@ -17,6 +761,12 @@ def indent_function(excel_file, heading_column, indent_column):
                                       containing the numerical indent information.
         indent_column (str or int): The name or index of the column
                                      whose values are to be indented.
+        mode (str, optional): 'spaces' prepends four spaces per level to the values. 'alignment' keeps the
+                              values and the workbook's formatting and sets Excel's cell indent instead.
+                              Defaults to 'spaces'.
+        reader (str, optional): The workbook reader, one of READERS. Defaults to 'auto' (see resolve_reader).
+        writer (str, optional): The workbook writer, one of WRITERS. Not used in alignment mode, which always patches
+                                a copy of the original workbook. Defaults to 'auto' (see resolve_writer).
 
     Returns:
         tuple: A tuple containing:
@@ -26,9 +776,19 @@ def indent_function(excel_file, heading_column, indent_column):
     output = []
     excel_file2 = "" # Initialize excel_file2 for error return
 
+    if mode not in INDENT_MODES:
+        output.append(f"Error: Unknown indent mode '{mode}'. Expected one of: {', '.join(INDENT_MODES)}.")
+        return "", output
+    try:
+        reader, writer = resolve_reader(reader), resolve_writer(writer)
+    except ValueError as e:
+        output.append(f"Error: {e}")
+        return "", output
+
     try:
         # Create a dataframe from the excel file
-        df = pd.read_excel(excel_file)
+        file_format = detect_format(excel_file)
+        df = _read_table(excel_file, file_format, reader)
         output.append(f"Successfully read file.")
     except FileNotFoundError:
         output.append(f"Error: File '{excel_file}' not found.")
@@ -76,17 +836,39 @@ def indent_function(excel_file, heading_column, indent_column):
         output.append("Error: 'indent_column' must be a string (column name) or an integer (column index).")
         return "", output
 
-    indented_values = []
-    for i in range(len(df)):
+    # Ensure the new file is saved in the same directory as the original
+    excel_file2 = _derive_file_name(excel_file, "_indented")
+
+    if mode == 'alignment':
+        if file_format != 'excel':
+            output.append("Error: Alignment mode needs an Excel file; use spaces mode for CSV, Parquet and Arrow files.")
+            return "", output
+        # Patch the cell alignment of a copy of the original workbook so its values and formatting are kept
+        levels, valid = _coerce_indent_levels(numbering_series, heading_column, output)
+        indent_column_index = (indent_column if isinstance(indent_column, int) else df.columns.get_loc(indent_column)) + 1 # Excel is 1-based
+
+        try:
+            patch_workbook(excel_file, excel_file2, indents={(int(row) + 2, indent_column_index): min(int(levels[row]), 255) for row in np.flatnonzero(valid)})
+            output.append(f"File '{excel_file2}' updated successfully.")
+            return excel_file2, output
+        except Exception as e:
+            output.append(f"Error saving Excel file '{excel_file2}': {e}")
+            return "", output
+
+    indented_values = _apply_space_indents(numbering_series, indent_series, heading_column, output)
+
+    if writer == 'patch':
+        # Rewrite only the cells whose value changed in a copy of the original workbook
+        indent_column_index = (indent_column if isinstance(indent_column, int) else df.columns.get_loc(indent_column)) + 1
+        changed_rows = np.flatnonzero(indented_values != indent_series.to_numpy(dtype=object))
         try:
-            # Ensure the value is converted to a string before attempting int conversion, just in case
-            indent_level = int(str(numbering_series.iloc[i]))
-            indent_str = "    " * indent_level # Using 4 spaces for an indent
-            indented_value = f"{indent_str}{indent_series.iloc[i]}"
-            indented_values.append(indented_value)
-        except (ValueError, TypeError):
-            output.append(f"Warning: Row {i+1}: Invalid or missing numeric value in heading column ('{heading_column}'). Skipping indentation for this row and keeping original value.")
-            indented_values.append(indent_series.iloc[i])
+            _check_patch_writer(excel_file, excel_file2, file_format)
+            patch_workbook(excel_file, excel_file2, {(int(row) + 2, indent_column_index): _excel_value(indented_values[row]) for row in changed_rows})
+            output.append(f"File '{excel_file2}' updated successfully.")
+            return excel_file2, output
+        except Exception as e:
+            output.append(f"Error saving Excel file '{excel_file2}': {e}")
+            return "", output
 
     # Update the dataframe
     if isinstance(indent_column, int):
@@ -95,24 +877,21 @@ def indent_function(excel_file, heading_column, indent_column):
         df[indent_column] = indented_values
 
     # Save the changes
-    suffix = "_indented"
-    base_name, ext = os.path.splitext(excel_file)
-    # Ensure the new file is saved in the same directory as the original
-    excel_file2 = os.path.join(os.path.dirname(excel_file), f"{os.path.basename(base_name)}{suffix}{ext}")
-
     try:
-        df.to_excel(excel_file2, index=False)
+        _write_table(excel_file2, df, file_format, writer)
         output.append(f"File '{excel_file2}' updated successfully.")
         return excel_file2, output # Return the full path of the new file
     except Exception as e:
         output.append(f"Error saving Excel file '{excel_file2}': {e}")
         return "", output
 
-def calculate_indents_and_save_new_excel(excel_file_name: str, heading_column: str = 'Heading') -> tuple:
+def calculate_indents_and_save_new_excel(excel_file_name: str, heading_column: str = 'Heading', engine: str = 'vectorized', reader: str = 'auto', writer: str = 'auto',
+                                         numbering=None) -> tuple:
     """
     Reads an Excel file, calculates the number of indents for each entry in a specified heading column,
     appends these indents as a new column to the DataFrame, and then saves
     the modified DataFrame to a new Excel file with a '_new' suffix in the same directory as the input file.
+    CSV, Parquet and Arrow IPC files (by extension) are read and written in their own format.
 
     The indent calculation logic is as follows:
     - For numbered headings (e.g., '1. Title', '1.1 Subtitle', '1.1.1 Sub-Subtitle'):
@@ -123,11 +902,19 @@ def calculate_indents_and_save_new_excel(excel_file_name: str, heading_column: s
         '1.1.1 Sub-Subtitle' -> 2 indents
     - For non-numbered text (e.g., 'Requirement Text'):
       The indent is one more than the indent of the last encountered numbered heading.
+    - Other numbering schemes, such as 'A.1', 'IV.2' or 'SYS-REQ-3.1.4', count the same way once their
+      grammars are given in numbering.
 
     Args:
         excel_file_name (str): The full path to the Excel file (e.g., 'C:/Users/User/Documents/my_data.xlsx').
         heading_column (str, optional): The name of the column in the Excel file
                                         that contains the headings. Defaults to 'Heading'.
+        engine (str, optional): The indent calculation engine, 'vectorized' or the original row-by-row 'loop'.
+                                Both give identical results. Defaults to 'vectorized'.
+        reader (str, optional): The workbook reader, one of READERS. Defaults to 'auto' (see resolve_reader).
+        writer (str, optional): The workbook writer, one of WRITERS. Defaults to 'auto' (see resolve_writer).
+        numbering (HeadingNumbering, optional): The heading numbering grammars to recognise (see HeadingNumbering).
+                                                Defaults to the decimal '1.2.3' numbering.
 
     Returns:
         tuple: A tuple containing:
@@ -141,9 +928,15 @@ def calculate_indents_and_save_new_excel(excel_file_name: str, heading_column: s
     output_excel_file_name = ""
     new_column_index = -1
     heading_column_index = -1
+    try:
+        reader, writer = resolve_reader(reader), resolve_writer(writer)
+    except ValueError as e:
+        output.append(f"Error: {e}")
+        return "", new_column_index, heading_column_index, output
 
     try:
-        df = pd.read_excel(excel_file_name)
+        file_format = detect_format(excel_file_name)
+        df = _read_table(excel_file_name, file_format, reader, heading_column)
         output.append(f"Successfully read file.")
     except FileNotFoundError:
         output.append(f"Error: File '{excel_file_name}' not found.")
@@ -156,42 +949,1274 @@ def calculate_indents_and_save_new_excel(excel_file_name: str, heading_column: s
         output.append(f"Error: '{heading_column}' column not found in the Excel file.")
         return "", new_column_index, heading_column_index, output # Corrected return order
 
-    calculated_indents = []
-    last_numbered_heading_indent = -1
-
-    full_numeric_prefix_pattern = re.compile(r'^(\d+(\.\d+)*)')
-
-    for index, row in df.iterrows():
-        heading = str(row[heading_column]).strip()
-        full_numeric_prefix_match = full_numeric_prefix_pattern.match(heading)
-
-        if full_numeric_prefix_match:
-            prefix = full_numeric_prefix_match.group(1)
-            current_indent = prefix.count('.')
-            last_numbered_heading_indent = current_indent
-            calculated_indents.append(current_indent)
-        else:
-            if last_numbered_heading_indent == -1:
-                calculated_indents.append(0)
-            else:
-                calculated_indents.append(last_numbered_heading_indent + 1)
-
-    df['Calculated Indents'] = calculated_indents
+    try:
+        df[CALCULATED_INDENTS_COLUMN] = _calculate_indent_levels(df[heading_column], engine, numbering)
+    except ValueError as e:
+        output.append(f"Error: {e}")
+        return "", new_column_index, heading_column_index, output
 
     try:
-        new_column_index = df.columns.get_loc('Calculated Indents')
+        new_column_index = df.columns.get_loc(CALCULATED_INDENTS_COLUMN)
         heading_column_index = df.columns.get_loc(heading_column)
     except KeyError as e:
         output.append(f"Error getting column index: {e}. This should not happen after successful column creation/check.")
 
     # Construct the output file name to be in the same directory as the input
-    base_name, ext = os.path.splitext(excel_file_name)
-    output_excel_file_name = os.path.join(os.path.dirname(excel_file_name), f"{os.path.basename(base_name)}_new{ext}")
+    output_excel_file_name = _derive_file_name(excel_file_name, "_new")
 
     try:
-        df.to_excel(output_excel_file_name, index=False)
+        if writer == 'patch':
+            _check_patch_writer(excel_file_name, output_excel_file_name, file_format)
+            _patch_sheets(excel_file_name, output_excel_file_name, [(0, df, heading_column, None)], mode=None)
+        else:
+            _write_table(output_excel_file_name, df, file_format, writer)
         output.append(f"Successfully saved results to: '{output_excel_file_name}'.")
         return output_excel_file_name, new_column_index, heading_column_index, output
     except Exception as e:
         output.append(f"Error saving Excel file '{output_excel_file_name}': {e}")
-        return "", new_column_index, heading_column_index, output # Corrected return order
\ No newline at end of file
+        return "", new_column_index, heading_column_index, output # Corrected return order
+
+def _run_with_cache(cache, source, destination, parameters, reporter, instrumentation, run, default_destination):
+    """
+    Runs run(destination) unless the cache already holds the result for the same source content and
+    parameters, in which case the stored workbook is copied to the destination instead. A fresh result
+    is added to the cache. DataFrame sources, and sources that cannot be read, always run.
+    default_destination() gives the destination when none was passed.
+
+    Returns:
+        tuple: (output_file, output), as returned by run.
+    """
+    if cache is None or isinstance(source, pd.DataFrame):
+        return run(destination)
+
+    instrumentation.begin('cache lookup')
+    try:
+        if destination is None:
+            destination = default_destination()
+        destination_extension = os.path.splitext(os.fspath(destination))[1].lower() if isinstance(destination, (str, os.PathLike)) else None
+        key = cache.make_key(source, version=TOOL_VERSION, destination_extension=destination_extension, **parameters)
+    except (OSError, ValueError):
+        return run(destination) # Let the pipeline report the missing file or invalid option
+
+    output = (reporter or ProgressReporter()).message_log()
+    try:
+        hit = cache.fetch(key, destination)
+    except OSError as e:
+        output.append(f"Error saving Excel file '{destination}': {e}")
+        return "", output
+    if hit:
+        instrumentation.cache_status = 'hit'
+        output.append(f"Cache hit: reused the stored result for identical content ({key[:12]}).")
+        if isinstance(destination, (str, os.PathLike)):
+            output.append(f"File '{destination}' updated successfully.")
+        else:
+            output.append("Indented workbook written to stream successfully.")
+        return destination, output
+
+    instrumentation.cache_status = 'miss'
+    output_file, output = run(destination)
+    if output_file and (isinstance(output_file, (str, os.PathLike)) or hasattr(output_file, 'getvalue')):
+        instrumentation.begin('cache store')
+        try:
+            cache.store(key, output_file)
+            output.append(f"Cache miss: result stored for next time ({key[:12]}).")
+        except OSError as e:
+            output.append(f"Warning: Could not store the result in the cache: {e}")
+    return output_file, output
+
+def outline_index(source, heading_column: str = 'Heading', engine: str = 'vectorized', reader: str = 'auto', input_format=None, numbering=None) -> OutlineIndex:
+    """
+    Reads a heading column and returns its outline tree: the parent, sibling order, depth, section end and
+    path key of every row, in NumPy arrays (see build_outline_index).
+
+    Args:
+        source (str, file-like or pd.DataFrame): The file path, an open binary stream of a file, or an already loaded DataFrame.
+        heading_column (str, optional): The name of the column that contains the headings. Defaults to 'Heading'.
+        engine (str, optional): The indent calculation engine, 'vectorized' or 'loop'. Defaults to 'vectorized'.
+        reader (str, optional): The workbook reader, one of READERS. Defaults to 'auto' (see resolve_reader).
+        input_format (str, optional): One of TABLE_FORMATS. Defaults to the source's extension ('excel' for streams).
+        numbering (HeadingNumbering, optional): The heading numbering grammars to recognise (see HeadingNumbering).
+                                                Defaults to the decimal '1.2.3' numbering.
+
+    Returns:
+        OutlineIndex: The tree, with row 0 being the first row below the header.
+
+    Raises:
+        ValueError: If the heading column is missing, or the engine, reader or format is unknown.
+    """
+    if isinstance(source, pd.DataFrame):
+        df = source
+    else:
+        df = _read_table(source, detect_format(source, input_format), resolve_reader(reader), heading_column)
+    if heading_column not in df.columns:
+        raise ValueError(f"'{heading_column}' column not found in the Excel file.")
+    return build_outline_index(_calculate_indent_levels(df[heading_column], engine, numbering))
+
+def indent_excel(source, heading_column: str = 'Heading', destination=None, intermediate_file=None, engine: str = 'vectorized', mode: str = 'spaces', reporter=None, trace_memory: bool = False, profile=False, cache=None, reader: str = 'auto', writer: str = 'auto',
+                 input_format=None, output_format=None, group_rows: bool = False, numbering=None) -> ProcessingResult:
+    """
+    Calculates the indent level of every heading and indents the heading column in a single pass,
+    writing only the final '_indented' file. This replaces running
+    calculate_indents_and_save_new_excel followed by indent_function, which writes the
+    intermediate '_new' file to disk and then parses it all over again.
+
+    The output has the same content as the two-step pipeline: the original columns, with the
+    heading column indented, followed by the 'Calculated Indents' column.
+
+    Besides Excel workbooks, CSV, Parquet and Arrow IPC files can be read and written directly,
+    chosen by file extension or by input_format/output_format, so columnar exports are indented
+    without a round trip through .xlsx.
+
+    Args:
+        source (str, file-like or pd.DataFrame): The file path, an open binary stream of a file,
+                                                  or an already loaded DataFrame.
+        heading_column (str, optional): The name of the column that contains the headings. Defaults to 'Heading'.
+        destination (str or file-like, optional): Where to write the indented workbook. Defaults to
+                                                  '<name>_indented.<ext>' next to a source path, or a new
+                                                  in-memory io.BytesIO for stream and DataFrame sources.
+        intermediate_file (str or bool, optional): Also write the intermediate file with the
+                                                   'Calculated Indents' column to this path. True derives
+                                                   '<name>_new.xlsx' from the source path. Not written by default.
+        engine (str, optional): The indent calculation engine, 'vectorized' or 'loop'. Defaults to 'vectorized'.
+        mode (str, optional): 'spaces' pads the heading values with four spaces per level. 'alignment' keeps
+                              the values and sets Excel's cell indent instead. Defaults to 'spaces'.
+        reporter (ProgressReporter, optional): Receives messages and per-phase progress as they happen and
+                                               can cancel the run between phases.
+        trace_memory (bool, optional): Measure each phase's peak Python memory with tracemalloc. This slows
+                                       the run down considerably. Defaults to False.
+        profile (bool or str, optional): Profile the run with cProfile. The top of the report is kept in
+                                         ProcessingResult.profile_stats; a file path also dumps the full stats there.
+                                         Defaults to False.
+        cache (ResultCache, optional): Reuse the stored result when the same file content was already indented with
+                                       the same heading column and mode, and store new results. Not used when an
+                                       intermediate file is requested. Defaults to None (always process).
+        reader (str, optional): The workbook reader, one of READERS. Defaults to 'auto' (see resolve_reader).
+        writer (str, optional): The workbook writer, one of WRITERS. Defaults to 'auto': 'patch' in alignment mode with an
+                                .xlsx source file and destination path, so the source's formatting is kept, otherwise as
+                                resolve_writer picks.
+        input_format (str, optional): One of TABLE_FORMATS. Defaults to the source's extension ('excel' for streams).
+        output_format (str, optional): One of TABLE_FORMATS. Defaults to the destination's extension, or the
+                                       input format when there is no destination path. Alignment mode needs 'excel'.
+        group_rows (bool, optional): Group the rows with Excel's row outline, following the heading tree (see
+                                     build_outline_index), so each heading's section can be collapsed. The
+                                     intermediate file is not grouped. Needs an Excel output. Defaults to False.
+        numbering (HeadingNumbering, optional): The heading numbering grammars to recognise (see HeadingNumbering).
+                                                Defaults to the decimal '1.2.3' numbering.
+
+    Returns:
+        ProcessingResult: The destination the indented workbook was written to (or an empty string if an error
+                          occurred), the output messages and the read/compute/write timings. It unpacks as
+                          (output_file, output) like a tuple.
+    """
+    parameters = {'pipeline': 'indent_excel', 'heading_column': heading_column, 'mode': mode, 'writer': writer, 'input_format': input_format, 'output_format': output_format,
+                  'group_rows': group_rows, 'numbering': (numbering or DEFAULT_NUMBERING).config}
+    with _Instrumentation(trace_memory, profile) as instrumentation:
+        output_file, output = _run_with_cache(None if intermediate_file else cache, source, destination, parameters, reporter, instrumentation,
+                                              lambda destination: _indent_excel(source, heading_column, destination, intermediate_file, engine, mode, reporter, instrumentation,
+                                                                                reader, writer, input_format, output_format, group_rows, numbering),
+                                              lambda: _default_destination(source, detect_format(source, input_format), detect_format(source, output_format or input_format)))
+    return instrumentation.result(output_file, output)
+
+def _indent_excel(source, heading_column, destination, intermediate_file, engine, mode, reporter, instrumentation, reader='auto', writer='auto',
+                  input_format=None, output_format=None, group_rows=False, numbering=None):
+    """
+    The body of indent_excel, recording its phases on the given _Instrumentation.
+    """
+    reporter = reporter or ProgressReporter()
+    output = reporter.message_log()
+    source_is_path = isinstance(source, (str, os.PathLike))
+
+    if mode not in INDENT_MODES:
+        output.append(f"Error: Unknown indent mode '{mode}'. Expected one of: {', '.join(INDENT_MODES)}.")
+        return "", output
+    if writer == 'auto' and mode == 'alignment' and input_format in (None, 'excel') and output_format in (None, 'excel') \
+            and _patch_writer_applies(source, destination):
+        # Alignment mode keeps the values, so it keeps the rest of the source's formatting too
+        writer = 'patch'
+    try:
+        reader, writer = resolve_reader(reader), resolve_writer(writer)
+        input_format = 'excel' if isinstance(source, pd.DataFrame) else detect_format(source, input_format)
+        if output_format is None and not isinstance(destination, (str, os.PathLike)):
+            output_format = input_format # Streams and default destinations keep the input's format
+        else:
+            output_format = detect_format(destination, output_format)
+        if writer == 'patch':
+            _check_patch_writer(None if isinstance(source, pd.DataFrame) else source, destination, input_format, output_format)
+    except ValueError as e:
+        output.append(f"Error: {e}")
+        return "", output
+    if mode == 'alignment' and output_format != 'excel':
+        output.append("Error: Alignment mode needs an Excel output; use spaces mode for CSV, Parquet and Arrow files.")
+        return "", output
+    if group_rows and output_format != 'excel':
+        output.append("Error: Row grouping needs an Excel output.")
+        return "", output
+
+    instrumentation.begin('read')
+    reporter.progress('read')
+    if isinstance(source, pd.DataFrame):
+        df = source.copy()
+    else:
+        try:
+            df = _read_table(source, input_format, reader, heading_column)
+            output.append(f"Successfully read file.")
+        except FileNotFoundError:
+            output.append(f"Error: File '{source}' not found.")
+            return "", output
+        except Exception as e:
+            output.append(f"Error reading Excel file '{source}': {e}")
+            return "", output
+
+    instrumentation.set_rows(len(df))
+
+    if heading_column not in df.columns:
+        output.append(f"Error: '{heading_column}' column not found in the Excel file.")
+        return "", output
+
+    instrumentation.begin('compute', len(df))
+    reporter.progress('compute', 0, len(df))
+    if reporter.cancelled(output):
+        return "", output
+
+    try:
+        df[CALCULATED_INDENTS_COLUMN] = _calculate_indent_levels(df[heading_column], engine, numbering)
+    except ValueError as e:
+        output.append(f"Error: {e}")
+        return "", output
+
+    reporter.progress('compute', len(df), len(df))
+    if reporter.cancelled(output):
+        return "", output
+
+    if intermediate_file is True:
+        if not source_is_path:
+            output.append("Error: An intermediate file name can only be derived from a source file path.")
+            return "", output
+        intermediate_file = _derive_file_name(os.fspath(source), "_new")
+    if intermediate_file:
+        instrumentation.begin('write intermediate', len(df))
+        try:
+            if writer == 'patch' and detect_format(intermediate_file) == 'excel':
+                _patch_sheets(source, intermediate_file, [(0, df, heading_column, None)], mode=None)
+            else:
+                _write_table(intermediate_file, df, detect_format(intermediate_file), writer)
+            output.append(f"Successfully saved results to: '{intermediate_file}'.")
+        except Exception as e:
+            output.append(f"Error saving Excel file '{intermediate_file}': {e}")
+            return "", output
+
+    original_headings = df[heading_column].copy() if writer == 'patch' else None
+    if mode == 'spaces':
+        instrumentation.begin('compute', len(df))
+        df[heading_column] = _apply_space_indents(df[CALCULATED_INDENTS_COLUMN], df[heading_column], CALCULATED_INDENTS_COLUMN, output)
+
+    if destination is None:
+        destination = _default_destination(source, input_format, output_format)
+
+    instrumentation.begin('write', len(df))
+    reporter.progress('write', 0, len(df))
+    if reporter.cancelled(output):
+        return "", output
+
+    try:
+        if writer == 'patch':
+            _patch_sheets(source, destination, [(0, df, heading_column, original_headings)], mode, group_rows)
+        else:
+            _write_table(destination, df, output_format, writer, heading_column, mode, group_rows)
+        reporter.progress('write', len(df), len(df))
+        if isinstance(destination, (str, os.PathLike)):
+            output.append(f"File '{destination}' updated successfully.")
+        else:
+            output.append("Indented workbook written to stream successfully.")
+        return destination, output
+    except Exception as e:
+        output.append(f"Error saving Excel file '{destination}': {e}")
+        return "", output
+
+def stream_indent_excel(source, heading_column: str = 'Heading', destination=None, mode: str = 'spaces', reporter=None, trace_memory: bool = False, profile=False, cache=None,
+                        numbering=None) -> ProcessingResult:
+    """
+    Indents the first sheet of a workbook while streaming it row by row, for workbooks too large to
+    hold in memory. Rows are read with an openpyxl read-only workbook, the indent level is carried
+    forward from row to row, and each row is written straight out through a write-only workbook,
+    so memory use stays flat however many rows the sheet has.
+
+    The output matches indent_excel: the original columns with the heading column indented, followed
+    by the 'Calculated Indents' column. Empty heading cells are left empty rather than written as 'nan',
+    and formulas are copied as formulas rather than their cached values. Streaming is slower per row
+    than indent_excel, so use it when memory rather than time is the limit.
+
+    Args:
+        source (str or file-like): The Excel file path or an open binary stream of an Excel file.
+        heading_column (str, optional): The name of the column that contains the headings. Defaults to 'Heading'.
+        destination (str or file-like, optional): Where to write the indented workbook. Defaults to
+                                                  '<name>_indented.xlsx' next to a source path, or a new
+                                                  in-memory io.BytesIO for stream sources.
+        mode (str, optional): 'spaces' or 'alignment', as for indent_excel. Defaults to 'spaces'.
+        reporter (ProgressReporter, optional): Receives messages and row progress while streaming and can
+                                               cancel the run before anything is saved.
+        trace_memory (bool, optional): Measure each phase's peak Python memory with tracemalloc. Defaults to False.
+        profile (bool or str, optional): Profile the run with cProfile, as for indent_excel. Defaults to False.
+        cache (ResultCache, optional): Reuse and store results, as for indent_excel. Defaults to None.
+        numbering (HeadingNumbering, optional): The heading numbering grammars, as for indent_excel. Defaults to decimal.
+
+    Returns:
+        ProcessingResult: As for indent_excel. The streamed row loop is reported as the 'compute' phase.
+    """
+    parameters = {'pipeline': 'stream_indent_excel', 'heading_column': heading_column, 'mode': mode, 'numbering': (numbering or DEFAULT_NUMBERING).config}
+    with _Instrumentation(trace_memory, profile) as instrumentation:
+        output_file, output = _run_with_cache(cache, source, destination, parameters, reporter, instrumentation,
+                                              lambda destination: _stream_indent_excel(source, heading_column, destination, mode, reporter, instrumentation, numbering),
+                                              lambda: _default_destination(source))
+    return instrumentation.result(output_file, output)
+
+def _stream_indent_excel(source, heading_column, destination, mode, reporter, instrumentation, numbering=None):
+    """
+    The body of stream_indent_excel, recording its phases on the given _Instrumentation.
+    """
+    reporter = reporter or ProgressReporter()
+    output = reporter.message_log()
+    source_is_path = isinstance(source, (str, os.PathLike))
+
+    if mode not in INDENT_MODES:
+        output.append(f"Error: Unknown indent mode '{mode}'. Expected one of: {', '.join(INDENT_MODES)}.")
+        return "", output
+
+    instrumentation.begin('read')
+    reporter.progress('read')
+    try:
+        book = load_workbook(source, read_only=True)
+    except FileNotFoundError:
+        output.append(f"Error: File '{source}' not found.")
+        return "", output
+    except Exception as e:
+        output.append(f"Error reading Excel file '{source}': {e}")
+        return "", output
+
+    new_sheet = None
+    finished_rows = False
+    try:
+        rows = book.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None or heading_column not in header:
+            output.append(f"Error: '{heading_column}' column not found in the Excel file.")
+            return "", output
+        heading_column_index = header.index(heading_column)
+        output.append("Successfully opened file for streaming.")
+        total_rows = max((book.worksheets[0].max_row or 1) - 1, 0) # The sheet's declared size, 0 if unknown
+
+        if destination is None:
+            destination = _derive_file_name(os.fspath(source), "_indented") if source_is_path else io.BytesIO()
+
+        instrumentation.begin('compute')
+        new_book = Workbook(write_only=True)
+        new_sheet = new_book.create_sheet()
+        new_sheet.append(list(header) + [CALCULATED_INDENTS_COLUMN])
+
+        # In alignment mode every heading cell at a level shares one style
+        style_by_level = {}
+        def _style_for_level(level):
+            if level not in style_by_level:
+                template = WriteOnlyCell(new_sheet)
+                template.alignment = Alignment(horizontal='left', indent=min(level, 255))
+                style_by_level[level] = template._style
+            return style_by_level[level]
+
+        row_count = 0
+        last_numbered_heading_indent = -1
+        for values in rows:
+            values = list(values)
+            if len(values) <= heading_column_index:
+                values.extend([None] * (heading_column_index + 1 - len(values)))
+            heading = values[heading_column_index]
+            level, last_numbered_heading_indent = _next_indent_level(heading, last_numbered_heading_indent, numbering)
+
+            if mode == 'alignment':
+                cell = WriteOnlyCell(new_sheet, value=heading)
+                cell._style = _style_for_level(level)
+                values[heading_column_index] = cell
+            elif heading is not None:
+                values[heading_column_index] = f"{'    ' * level}{heading}" # Using 4 spaces for an indent
+
+            new_sheet.append(values + [level])
+            row_count += 1
+            if row_count % STREAM_PROGRESS_INTERVAL == 0:
+                reporter.progress('compute', row_count, total_rows)
+                if reporter.cancelled(output):
+                    return "", output
+        finished_rows = True
+        instrumentation.set_rows(row_count)
+    except Exception as e:
+        output.append(f"Error reading Excel file '{source}': {e}")
+        return "", output
+    finally:
+        book.close()
+        if new_sheet is not None and not finished_rows:
+            new_sheet.close() # Finish the partly written sheet so it is discarded cleanly
+
+    instrumentation.begin('write', row_count)
+    reporter.progress('write', row_count, row_count)
+    if reporter.cancelled(output):
+        return "", output
+
+    try:
+        new_book.save(destination)
+        output.append(f"Streamed {row_count} rows.")
+        if isinstance(destination, (str, os.PathLike)):
+            output.append(f"File '{destination}' updated successfully.")
+        else:
+            output.append("Indented workbook written to stream successfully.")
+        return destination, output
+    except Exception as e:
+        output.append(f"Error saving Excel file '{destination}': {e}")
+        return "", output
+
+def _load_incremental_index(index_file):
+    """
+    Reads a sidecar index written by _save_incremental_index.
+
+    Returns:
+        tuple or None: (meta, row_hashes, levels, numbered), or None if there is no usable index.
+    """
+    try:
+        with np.load(index_file, allow_pickle=False) as index:
+            meta = json.loads(str(index['meta']))
+            return meta, index['row_hashes'], index['levels'].astype(np.int64), index['numbered'].copy()
+    except Exception:
+        return None
+
+def _save_incremental_index(index_file, meta, row_hashes, levels, numbered):
+    """
+    Writes the sidecar index: one hash, level and numbered flag per data row plus the run's settings.
+    """
+    np.savez_compressed(index_file, meta=np.array(json.dumps(meta)), row_hashes=row_hashes,
+                        levels=levels.astype(np.int16), numbered=numbered)
+
+def _recompute_dirty_levels(headings, dirty, levels, numbered, numbering=None):
+    """
+    Recomputes the indent levels affected by the dirty rows, updating levels and numbered in place.
+
+    A numbered heading's level depends only on its own prefix, so a change can only spread to the
+    unnumbered rows below it that inherit its level. Each segment therefore stops at the next
+    unchanged numbered heading, or at the first unchanged row whose level comes out the same.
+
+    Returns:
+        np.ndarray: A boolean mask of the rows whose level was recomputed.
+    """
+    recomputed = np.zeros(len(levels), dtype=bool)
+    segment_end = 0
+    for row in np.flatnonzero(dirty):
+        if row < segment_end:
+            continue # Already covered by the previous segment
+        if row == 0:
+            last_numbered_heading_indent = -1
+        else:
+            # Unnumbered rows sit one level below the last numbered heading (or at 0 before the first one)
+            last_numbered_heading_indent = levels[row - 1] if numbered[row - 1] else levels[row - 1] - 1
+
+        segment_end = row
+        while segment_end < len(levels) and (dirty[segment_end] or not numbered[segment_end]):
+            value = headings[segment_end]
+            level, last_numbered_heading_indent = _next_indent_level(value, last_numbered_heading_indent, numbering)
+            if not dirty[segment_end] and level == levels[segment_end]:
+                break # The rest of this unnumbered run is unchanged too
+            levels[segment_end] = level
+            numbered[segment_end] = (numbering or DEFAULT_NUMBERING).match_level(str(value).strip()) is not None
+            recomputed[segment_end] = True
+            segment_end += 1
+    return recomputed
+
+def _increasing_subsequence(values):
+    """
+    Returns the positions of a longest strictly increasing subsequence of values, in order.
+    """
+    values = values.tolist()
+    tails = [] # tails[k]: the smallest last value of an increasing run of length k + 1
+    tail_positions = []
+    previous = [-1] * len(values)
+    for position, value in enumerate(values):
+        k = bisect.bisect_left(tails, value)
+        if k == len(tails):
+            tails.append(value)
+            tail_positions.append(position)
+        else:
+            tails[k] = value
+            tail_positions[k] = position
+        previous[position] = tail_positions[k - 1] if k else -1
+    positions = []
+    position = tail_positions[-1] if tail_positions else -1
+    while position != -1:
+        positions.append(position)
+        position = previous[position]
+    return np.array(positions[::-1], dtype=np.int64)
+
+def _align_rows(old_hashes, new_hashes):
+    """
+    Matches the rows of a new input to the rows indexed by the previous run, so that rows which were only
+    shifted by inserted or deleted rows are recognised.
+
+    Like a patience diff: the common leading and trailing rows are matched first, then the rows whose hash
+    occurs once on each side, keeping the longest run of them that is in the same order on both sides, and
+    finally the unmatched neighbours of matched rows that are equal (e.g. repeated blank rows).
+
+    Returns:
+        np.ndarray: For each new row, the old row it matches, or -1 for a new or changed row. The matched old rows are increasing.
+    """
+    old_count, new_count = len(old_hashes), len(new_hashes)
+    matches = np.full(new_count, -1, dtype=np.int64)
+    shortest = min(old_count, new_count)
+    differs = old_hashes[:shortest] != new_hashes[:shortest]
+    prefix = int(np.argmax(differs)) if differs.any() else shortest
+    differs = old_hashes[prefix:][::-1][:shortest - prefix] != new_hashes[prefix:][::-1][:shortest - prefix]
+    suffix = int(np.argmax(differs)) if differs.any() else shortest - prefix
+    matches[:prefix] = np.arange(prefix)
+    matches[new_count - suffix:] = np.arange(old_count - suffix, old_count)
+
+    old_middle, new_middle = old_hashes[prefix:old_count - suffix], new_hashes[prefix:new_count - suffix]
+    if len(old_middle) and len(new_middle):
+        old_values, old_first, old_counts = np.unique(old_middle, return_index=True, return_counts=True)
+        new_values, new_first, new_counts = np.unique(new_middle, return_index=True, return_counts=True)
+        _, old_at, new_at = np.intersect1d(old_values[old_counts == 1], new_values[new_counts == 1], assume_unique=True, return_indices=True)
+        old_positions, new_positions = old_first[old_counts == 1][old_at], new_first[new_counts == 1][new_at]
+        order = np.argsort(new_positions)
+        old_positions, new_positions = old_positions[order], new_positions[order]
+        if len(old_positions) > 1 and not (np.diff(old_positions) > 0).all():
+            # Some rows moved; keep the largest set of anchors that is in order on both sides
+            keep = _increasing_subsequence(old_positions)
+            old_positions, new_positions = old_positions[keep], new_positions[keep]
+        matches[prefix + new_positions] = prefix + old_positions
+
+        old_matched = np.zeros(old_count, dtype=bool)
+        old_matched[matches[matches >= 0]] = True
+        unmatched = np.flatnonzero(matches < 0).tolist()
+        for row in unmatched: # Extend the matches downwards into equal rows...
+            if row > 0 and matches[row - 1] >= 0:
+                old_row = matches[row - 1] + 1
+                if old_row < old_count and not old_matched[old_row] and old_hashes[old_row] == new_hashes[row]:
+                    matches[row] = old_row
+                    old_matched[old_row] = True
+        for row in reversed(unmatched): # ...and upwards
+            if matches[row] < 0 and row + 1 < new_count and matches[row + 1] > 0:
+                old_row = matches[row + 1] - 1
+                if not old_matched[old_row] and old_hashes[old_row] == new_hashes[row]:
+                    matches[row] = old_row
+                    old_matched[old_row] = True
+    return matches
+
+def _excel_value(value):
+    """
+    Converts a DataFrame value to what openpyxl writes for it, matching DataFrame.to_excel: empty for
+    missing values and plain Python scalars for NumPy ones.
+    """
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def incremental_indent_excel(source, heading_column: str = 'Heading', destination=None, mode: str = 'spaces', index_file=None, reporter=None, trace_memory: bool = False, profile=False,
+                             reader: str = 'auto', writer: str = 'auto', input_format: str = None, numbering=None) -> ProcessingResult:
+    """
+    Indents a workbook like indent_excel, but when the previous output and its sidecar index are
+    available, only the rows that changed since that run are recomputed and rewritten.
+
+    The index ('<destination>.index.npz') holds a hash, the indent level and a numbered-heading flag
+    for every data row. On the next run the rows are hashed again and aligned with the indexed rows
+    (see _align_rows), so rows that were inserted or deleted do not make the rows after them count as
+    changed. Levels are recomputed only for the new or changed rows, the rows after a deletion and the
+    unnumbered rows that inherit from them. In the previous output, only the rows whose content, position
+    or level changed are patched, and rows left over at the end are removed. An insertion or deletion
+    therefore still rewrites every row below it, as each of those rows moves.
+
+    A full run (which also writes a fresh index) is done instead when there is no usable index, when
+    the heading column, mode, numbering or columns changed, when the previous output was modified
+    since it was written, or when more than INCREMENTAL_MAX_PATCHED_FRACTION of the rows would have to
+    be patched, since a new workbook is then written faster.
+
+    The source can be any of TABLE_FORMATS, but the output is always an Excel workbook, since only
+    workbooks are patched in place.
+
+    Args:
+        source (str): The source file path.
+        heading_column (str, optional): The name of the column that contains the headings. Defaults to 'Heading'.
+        destination (str, optional): The indented workbook to create or patch. Defaults to '<name>_indented.xlsx'.
+        mode (str, optional): 'spaces' or 'alignment', as for indent_excel. Defaults to 'spaces'.
+        index_file (str, optional): The sidecar index path. Defaults to '<destination>.index.npz'.
+        reporter (ProgressReporter, optional): Receives messages and per-phase progress and can cancel the run
+                                               before anything is written.
+        trace_memory (bool, optional): Measure each phase's peak Python memory with tracemalloc. Defaults to False.
+        profile (bool or str, optional): Profile the run with cProfile, as for indent_excel. Defaults to False.
+        reader (str, optional): The workbook reader, one of READERS. Defaults to 'auto' (see resolve_reader).
+        writer (str, optional): The workbook writer for full runs, one of WRITERS. Defaults to 'auto' (see resolve_writer).
+        input_format (str, optional): The source's format, one of TABLE_FORMATS. Defaults to detecting it from the extension.
+        numbering (HeadingNumbering, optional): The heading numbering grammars, as for indent_excel. Defaults to decimal.
+
+    Returns:
+        ProcessingResult: As for indent_excel. On an incremental run the 'compute' and 'write' phases count the
+                          changed rows only.
+    """
+    with _Instrumentation(trace_memory, profile) as instrumentation:
+        output_file, output = _incremental_indent_excel(source, heading_column, destination, mode, index_file, reporter, instrumentation,
+                                                              reader, writer, input_format, numbering)
+    return instrumentation.result(output_file, output)
+
+def _incremental_indent_excel(source, heading_column, destination, mode, index_file, reporter, instrumentation, reader, writer, input_format, numbering=None):
+    """
+    The body of incremental_indent_excel, recording its phases on the given _Instrumentation.
+    """
+    reporter = reporter or ProgressReporter()
+    output = reporter.message_log()
+
+    if mode not in INDENT_MODES:
+        output.append(f"Error: Unknown indent mode '{mode}'. Expected one of: {', '.join(INDENT_MODES)}.")
+        return "", output
+    if not isinstance(source, (str, os.PathLike)):
+        output.append("Error: Incremental indenting needs a source file path.")
+        return "", output
+    try:
+        input_format = detect_format(source, input_format)
+        destination = destination or _default_destination(source, input_format, 'excel')
+        if writer == 'auto' and mode == 'alignment' and input_format == 'excel' and _patch_writer_applies(source, destination):
+            writer = 'patch' # As in indent_excel, so full runs keep the source's formatting
+        reader, writer = resolve_reader(reader), resolve_writer(writer)
+        if detect_format(destination) != 'excel':
+            raise ValueError("Incremental indenting patches an Excel workbook; the destination must be .xlsx.")
+    except ValueError as e:
+        output.append(f"Error: {e}")
+        return "", output
+
+    index_file = index_file or f"{os.fspath(destination)}{INCREMENTAL_INDEX_SUFFIX}"
+
+    instrumentation.begin('read')
+    reporter.progress('read')
+    try:
+        df = _read_table(source, input_format, reader, heading_column)
+        output.append("Successfully read file.")
+    except FileNotFoundError:
+        output.append(f"Error: File '{source}' not found.")
+        return "", output
+    except Exception as e:
+        output.append(f"Error reading Excel file '{source}': {e}")
+        return "", output
+
+    instrumentation.set_rows(len(df))
+
+    if heading_column not in df.columns:
+        output.append(f"Error: '{heading_column}' column not found in the Excel file.")
+        return "", output
+
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+    meta = {
+        'version': INCREMENTAL_INDEX_VERSION,
+        'tool_version': TOOL_VERSION,
+        'heading_column': heading_column,
+        'mode': mode,
+        'numbering': (numbering or DEFAULT_NUMBERING).config,
+        'columns': [str(column) for column in df.columns],
+    }
+
+    # Decide whether the previous output can be patched
+    reason = None
+    index = _load_incremental_index(index_file)
+    if index is None:
+        reason = "no previous index"
+    elif any(index[0].get(key) != value for key, value in meta.items()):
+        reason = "the settings or columns changed"
+    else:
+        try:
+            stat = os.stat(destination)
+            if (stat.st_size, stat.st_mtime_ns) != (index[0].get('output_size'), index[0].get('output_mtime_ns')):
+                reason = "the previous output was modified"
+        except OSError:
+            reason = "the previous output is missing"
+    if reason is None:
+        _, old_hashes, old_levels, old_numbered = index
+        matches = _align_rows(old_hashes, row_hashes)
+        # Rows that are new, changed or no longer at their old position are rewritten in full
+        rewritten = matches != np.arange(len(df))
+        if rewritten.sum() > INCREMENTAL_MAX_PATCHED_FRACTION * len(df):
+            reason = f"{int(rewritten.sum())} of {len(df)} rows were added, changed or moved"
+
+    if reason is not None:
+        output.append(f"Incremental: full run ({reason}).")
+        # The patch writer copies the source workbook, so it is given the file rather than the DataFrame
+        full_source = source if writer == 'patch' else df
+        output_file, full_output = _indent_excel(full_source, heading_column, destination, None, 'vectorized', mode, reporter, instrumentation, reader, writer, input_format,
+                                                 numbering=numbering)
+        output.extend(full_output)
+        if not output_file:
+            return "", output
+        instrumentation.begin('index', len(df))
+        levels = _calculate_indent_levels(df[heading_column], numbering=numbering)
+        numbered = ~np.isnan((numbering or DEFAULT_NUMBERING).match_levels(df[heading_column]))
+        stat = os.stat(destination)
+        _save_incremental_index(index_file, {**meta, 'output_size': stat.st_size, 'output_mtime_ns': stat.st_mtime_ns}, row_hashes, levels, numbered)
+        return output_file, output
+
+    if not rewritten.any() and len(old_hashes) == len(df):
+        output.append(f"Incremental: no rows changed; '{destination}' is up to date.")
+        return destination, output
+
+    # Matched rows carry their level over; new or changed rows get theirs computed
+    matched = matches >= 0
+    dirty = ~matched
+    levels = np.zeros(len(df), dtype=np.int64)
+    numbered = np.zeros(len(df), dtype=bool)
+    levels[matched] = old_levels[matches[matched]]
+    numbered[matched] = old_numbered[matches[matched]]
+    # A row right after deleted rows may have inherited its level from one of them, so it is recomputed too
+    previous_matches = np.concatenate(([-1], matches[:-1]))
+    after_deletion = matched & (matches != previous_matches + 1) & np.concatenate(([True], matched[:-1]))
+
+    instrumentation.begin('compute', int(dirty.sum()))
+    reporter.progress('compute', 0, len(df))
+    carried_levels = levels.copy()
+    recomputed = _recompute_dirty_levels(df[heading_column].to_numpy(dtype=object), dirty | after_deletion, levels, numbered, numbering)
+    relevelled = recomputed & ~rewritten & (levels != carried_levels)
+    patched_rows = np.flatnonzero(rewritten | relevelled)
+    reporter.progress('compute', len(df), len(df))
+    if reporter.cancelled(output):
+        return "", output
+
+    instrumentation.begin('write', len(patched_rows))
+    reporter.progress('write', 0, len(patched_rows))
+    output_columns = list(df.columns) + ([] if CALCULATED_INDENTS_COLUMN in df.columns else [CALCULATED_INDENTS_COLUMN])
+    heading_column_index = output_columns.index(heading_column) + 1
+    levels_column_index = output_columns.index(CALCULATED_INDENTS_COLUMN) + 1
+
+    # Changed and moved rows are rewritten in full; rows that only moved to another level get their heading and level
+    values = {}
+    for row in np.flatnonzero(rewritten):
+        for column_position in range(len(df.columns)):
+            values[(int(row) + 2, column_position + 1)] = _excel_value(df.iat[row, column_position])
+    headings = df[heading_column].iloc[patched_rows]
+    if mode == 'alignment':
+        heading_values = [_excel_value(value) for value in headings]
+        indents = {(int(row) + 2, heading_column_index): int(levels[row]) for row in patched_rows}
+    else:
+        heading_values = _apply_space_indents(pd.Series(levels[patched_rows]), headings, CALCULATED_INDENTS_COLUMN, output)
+        indents = None
+    for row, value in zip(patched_rows, heading_values):
+        values[(int(row) + 2, heading_column_index)] = value
+        values[(int(row) + 2, levels_column_index)] = int(levels[row])
+
+    try:
+        # Rows past the end of the new table were left over by deleted rows
+        patch_workbook(destination, destination, values, indents, last_row=len(df) + 1 if len(old_hashes) > len(df) else None)
+    except Exception as e:
+        output.append(f"Error saving Excel file '{destination}': {e}")
+        return "", output
+    reporter.progress('write', len(patched_rows), len(patched_rows))
+
+    stat = os.stat(destination)
+    _save_incremental_index(index_file, {**meta, 'output_size': stat.st_size, 'output_mtime_ns': stat.st_mtime_ns}, row_hashes, levels, numbered)
+    moved = int((rewritten & matched).sum())
+    removed = max(0, len(old_hashes) - int(matched.sum()) - int(dirty.sum())) # Old rows that were not changed into a new one
+    output.append(f"Incremental: {int(dirty.sum())} new or changed row(s), {removed} removed row(s), {moved} moved row(s) "
+                  f"and {int(relevelled.sum())} re-levelled row(s) patched in '{destination}'.")
+    return destination, output
+
+def _read_arrow_table(source, file_format):
+    """
+    Reads a CSV, Parquet or Arrow IPC file into a pyarrow Table, whose columns stay in Arrow buffers
+    instead of becoming Python objects. CSV columns are all read as text, so their values are written back
+    as they were (pyarrow quotes every text field).
+    """
+    import pyarrow as pa
+    if file_format == 'csv':
+        from pyarrow import csv as pa_csv
+        with open(source, newline='', encoding='utf-8-sig') as csv_file:
+            names = next(csv.reader(csv_file), [])
+        return pa_csv.read_csv(source, convert_options=pa_csv.ConvertOptions(column_types={name: pa.string() for name in names}, strings_can_be_null=True))
+    if file_format == 'parquet':
+        from pyarrow import parquet
+        return parquet.read_table(source)
+    from pyarrow import feather
+    return feather.read_table(source)
+
+def _write_arrow_table(destination, table, file_format):
+    """
+    Writes a pyarrow Table read by _read_arrow_table back out in the same format.
+    """
+    if file_format == 'csv':
+        from pyarrow import csv as pa_csv
+        pa_csv.write_csv(table, destination, pa_csv.WriteOptions(quoting_style='needed'))
+    elif file_format == 'parquet':
+        from pyarrow import parquet
+        parquet.write_table(table, destination)
+    else:
+        from pyarrow import feather
+        feather.write_feather(table, destination)
+
+def projected_indent_excel(source, heading_column: str = 'Heading', destination=None, mode: str = 'spaces', reporter=None, trace_memory: bool = False, profile=False, cache=None,
+                           reader: str = 'auto', writer: str = 'auto', input_format: str = None, numbering=None) -> ProcessingResult:
+    """
+    Indents a file like indent_excel, but only the heading column is parsed. The indent levels need nothing
+    else, so on wide exports this skips most of the parsing and memory of a full read.
+
+    The other columns are carried through to the output as they are stored, never as Python objects:
+    for a workbook only the heading cells and the new 'Calculated Indents' column are patched into a copy
+    of the source (see Excel_Indent_Patch), which also keeps its formatting, column widths and formulas;
+    CSV, Parquet and Arrow files go through pyarrow, with the two columns replaced in the Arrow table.
+
+    The output matches indent_excel's, except that the other columns keep their stored values exactly:
+    text such as 'n/a' is not read as a missing value and CSV numbers keep their original digits.
+
+    The output has the input's format. A full read (indent_excel) is done instead when the source is not
+    a file path, the destination is not a file path or has another format, the workbook is not an .xlsx
+    package, pyarrow is not installed, or the heading column cannot be read on its own.
+
+    Args:
+        source (str): The source file path.
+        heading_column (str, optional): The name of the column that contains the headings. Defaults to 'Heading'.
+        destination (str, optional): Where to write the output. Defaults to '<name>_indented.<ext>' next to the source.
+        mode (str, optional): 'spaces' or 'alignment', as for indent_excel. Alignment mode needs a workbook. Defaults to 'spaces'.
+        reporter (ProgressReporter, optional): Receives messages and per-phase progress and can cancel the run
+                                               before anything is written.
+        trace_memory (bool, optional): Measure each phase's peak Python memory with tracemalloc. Defaults to False.
+        profile (bool or str, optional): Profile the run with cProfile, as for indent_excel. Defaults to False.
+        cache (ResultCache, optional): Reuse and store results, as for indent_excel. Defaults to None.
+        reader (str, optional): The workbook reader for a full read, one of READERS. Defaults to 'auto'.
+        writer (str, optional): The workbook writer for a full read, one of WRITERS. Defaults to 'auto'.
+        input_format (str, optional): The source's format, one of TABLE_FORMATS. Defaults to detecting it from the extension.
+        numbering (HeadingNumbering, optional): The heading numbering grammars, as for indent_excel. Defaults to decimal.
+
+    Returns:
+        ProcessingResult: As for indent_excel.
+    """
+    parameters = {'pipeline': 'projected_indent_excel', 'heading_column': heading_column, 'mode': mode, 'input_format': input_format,
+                  'numbering': (numbering or DEFAULT_NUMBERING).config}
+    with _Instrumentation(trace_memory, profile) as instrumentation:
+        output_file, output = _run_with_cache(cache, source, destination, parameters, reporter, instrumentation,
+                                              lambda destination: _projected_indent_excel(source, heading_column, destination, mode, reporter, instrumentation,
+                                                                                          reader, writer, input_format, numbering),
+                                              lambda: _default_destination(source, detect_format(source, input_format), detect_format(source, input_format)))
+    return instrumentation.result(output_file, output)
+
+def _projected_indent_excel(source, heading_column, destination, mode, reporter, instrumentation, reader, writer, input_format, numbering=None):
+    """
+    The body of projected_indent_excel, recording its phases on the given _Instrumentation.
+    """
+    reporter = reporter or ProgressReporter()
+    output = reporter.message_log()
+
+    if mode not in INDENT_MODES:
+        output.append(f"Error: Unknown indent mode '{mode}'. Expected one of: {', '.join(INDENT_MODES)}.")
+        return "", output
+    try:
+        if isinstance(source, (str, os.PathLike)):
+            input_format = detect_format(source, input_format)
+            destination = destination or _default_destination(source, input_format, input_format)
+    except ValueError as e:
+        output.append(f"Error: {e}")
+        return "", output
+
+    # Decide whether the columns can be carried through
+    reason = None
+    if not isinstance(source, (str, os.PathLike)):
+        reason = "the source is not a file path"
+    elif not isinstance(destination, (str, os.PathLike)):
+        reason = "the destination is not a file path"
+    elif detect_format(destination) != input_format:
+        reason = "the output format differs from the input's"
+    elif input_format == 'excel' and os.path.exists(source) and not zipfile.is_zipfile(source):
+        reason = "the workbook is not an .xlsx package"
+    elif input_format != 'excel' and not _module_available('pyarrow'):
+        reason = "pyarrow is not installed"
+
+    def full_read(reason):
+        output.append(f"Projected: full read ({reason}).")
+        output_file, full_output = _indent_excel(source, heading_column, destination, None, 'vectorized', mode, reporter, instrumentation, reader, writer, input_format,
+                                                 numbering=numbering)
+        output.extend(full_output)
+        return output_file, output
+
+    if reason is not None:
+        return full_read(reason)
+    if mode == 'alignment' and input_format != 'excel':
+        output.append("Error: Alignment mode needs an Excel output; use spaces mode for CSV, Parquet and Arrow files.")
+        return "", output
+
+    instrumentation.begin('read')
+    reporter.progress('read')
+    try:
+        if input_format == 'excel':
+            column = read_sheet_column(source, heading_column)
+            values = column.values
+        else:
+            table = _read_arrow_table(source, input_format)
+            column_names = table.column_names
+            if heading_column not in column_names:
+                raise KeyError(heading_column)
+            values = table.column(column_names.index(heading_column))
+        output.append(f"Successfully read the '{heading_column}' column.")
+    except FileNotFoundError:
+        output.append(f"Error: File '{source}' not found.")
+        return "", output
+    except KeyError:
+        output.append(f"Error: '{heading_column}' column not found in the Excel file.")
+        return "", output
+    except Exception as e:
+        # The column is read with plain patterns, so a file that a full reader accepts may still fail here
+        return full_read(f"the '{heading_column}' column could not be read on its own: {str(e).rstrip('.')}")
+
+    # The headings are converted the way pandas reads them, so the levels and values match indent_excel
+    if input_format in ('parquet', 'arrow'):
+        headings = values.to_pandas()
+    else:
+        headings = pd.Series([np.nan if value is None else value for value in (values if input_format == 'excel' else values.to_pylist())], dtype=object)
+    instrumentation.set_rows(len(headings))
+
+    instrumentation.begin('compute', len(headings))
+    reporter.progress('compute', 0, len(headings))
+    if reporter.cancelled(output):
+        return "", output
+    levels = _calculate_indent_levels(headings, numbering=numbering)
+    if mode == 'spaces':
+        indented = _apply_space_indents(pd.Series(levels), headings, CALCULATED_INDENTS_COLUMN, output)
+    reporter.progress('compute', len(headings), len(headings))
+    if reporter.cancelled(output):
+        return "", output
+
+    instrumentation.begin('write', len(headings))
+    reporter.progress('write', 0, len(headings))
+    try:
+        if input_format == 'excel':
+            first_row = column.header_row + 1
+            levels_column = column.headers.get(CALCULATED_INDENTS_COLUMN, column.last_column + 1)
+            values = {(column.header_row, levels_column): CALCULATED_INDENTS_COLUMN}
+            values.update(((first_row + offset, levels_column), int(level)) for offset, level in enumerate(levels))
+            indents = None
+            if mode == 'spaces':
+                # Headings at level 0 keep their cell unless the value itself changes (e.g. a number becoming text)
+                for offset in np.flatnonzero(indented != headings.to_numpy(dtype=object)):
+                    values[(first_row + int(offset), column.column)] = indented[offset]
+            else:
+                indents = {(first_row + offset, column.column): min(int(level), 255) for offset, level in enumerate(levels)} # Excel's maximum indent
+            patch_workbook(source, destination, values, indents, styles={(column.header_row, levels_column): column.column})
+        else:
+            import pyarrow as pa
+            table = table.set_column(column_names.index(heading_column), heading_column, pa.array(indented, type=pa.string()))
+            levels_array = pa.array(levels, type=pa.int64())
+            if CALCULATED_INDENTS_COLUMN in column_names:
+                table = table.set_column(column_names.index(CALCULATED_INDENTS_COLUMN), CALCULATED_INDENTS_COLUMN, levels_array)
+            else:
+                table = table.append_column(CALCULATED_INDENTS_COLUMN, levels_array)
+            _write_arrow_table(destination, table, input_format)
+    except Exception as e:
+        output.append(f"Error saving Excel file '{destination}': {e}")
+        return "", output
+    reporter.progress('write', len(headings), len(headings))
+    output.append(f"File '{destination}' updated successfully.")
+    return destination, output
+
+def find_excel_files(path_or_pattern, file_format=None):
+    """
+    Lists the workbooks a batch run should process.
+
+    Args:
+        path_or_pattern (str): A directory (every .xlsx file directly inside it), a glob pattern
+                               (e.g. 'exports/**/*.xlsx') or a single file.
+        file_format (str, optional): For a directory, list the files of this format (one of TABLE_FORMATS,
+                                     with any of its extensions) instead of .xlsx files.
+
+    Returns:
+        list: The sorted workbook paths. Excel lock files ('~$...') and this tool's own outputs are skipped so
+              re-running a batch does not indent its results again. A file only counts as an output when its
+              '<name>_new' or '<name>_indented' source is still next to it, so an input that merely ends in
+              '_new' (e.g. 'release_new.xlsx') is processed.
+    """
+    if os.path.isdir(path_or_pattern):
+        extensions = ['.xlsx'] if file_format is None else [extension for extension, extension_format in FORMAT_EXTENSIONS.items() if extension_format == file_format]
+        candidates = [candidate for extension in extensions for candidate in glob.glob(os.path.join(glob.escape(path_or_pattern), f'*{extension}'))]
+    elif glob.has_magic(path_or_pattern):
+        candidates = glob.glob(path_or_pattern, recursive=True)
+    else:
+        candidates = [path_or_pattern]
+
+    excel_files = []
+    for candidate in candidates:
+        name, _ = os.path.splitext(os.path.basename(candidate))
+        if name.startswith('~$') or _is_tool_output(candidate):
+            continue
+        excel_files.append(candidate)
+    return sorted(excel_files)
+
+def _is_tool_output(path):
+    """
+    Whether a file is an '_new' or '_indented' output of this tool, i.e. its source (in any input format) is beside it.
+    """
+    name, _ = os.path.splitext(os.path.basename(path))
+    for suffix in ('_indented', '_new'):
+        if name.endswith(suffix):
+            source_name = os.path.join(os.path.dirname(path), name[:-len(suffix)])
+            if any(os.path.isfile(source_name + extension) for extension in FORMAT_EXTENSIONS):
+                return True
+    return False
+
+def _indent_excel_batch_item(excel_file, heading_column, mode, streaming, cache, reader, writer, input_format, output_format, group_rows=False, numbering=None):
+    """
+    Indents one workbook of a batch in a worker process and returns its report entry.
+    """
+    start = time.perf_counter()
+    if streaming:
+        result = stream_indent_excel(excel_file, heading_column, mode=mode, cache=cache, numbering=numbering)
+    else:
+        result = indent_excel(excel_file, heading_column, mode=mode, cache=cache, reader=reader, writer=writer,
+                              input_format=input_format, output_format=output_format, group_rows=group_rows, numbering=numbering)
+    return {
+        'file': excel_file,
+        'status': 'success' if result.success else 'failed',
+        'output_file': result.output_file,
+        'seconds': time.perf_counter() - start,
+        'messages': list(result.messages),
+        'phases': [phase.to_dict() for phase in result.phases],
+        'cache_status': result.cache_status,
+    }
+
+def batch_indent_excel(path_or_pattern, heading_column: str = 'Heading', mode: str = 'spaces', max_workers=None, streaming: bool = False, reporter=None, cache=None,
+                       reader: str = 'auto', writer: str = 'auto', input_format: str = None, output_format: str = None, group_rows: bool = False,
+                       numbering=None) -> tuple:
+    """
+    Indents many workbooks in parallel, one worker process per core by default.
+
+    Each workbook is processed independently with indent_excel (or stream_indent_excel) and written
+    next to its source as '<name>_indented.xlsx' (or with the extension of output_format). A file that
+    fails does not stop the others.
+
+    Args:
+        path_or_pattern (str): A directory, glob pattern or single file, as accepted by find_excel_files.
+        heading_column (str, optional): The name of the column that contains the headings. Defaults to 'Heading'.
+        mode (str, optional): 'spaces' or 'alignment', as for indent_excel. Defaults to 'spaces'.
+        max_workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        streaming (bool, optional): Use the low-memory streaming engine for each file. Defaults to False.
+        reporter (ProgressReporter, optional): Receives messages and per-file progress and can cancel
+                                               the files that have not started yet.
+        cache (ResultCache, optional): A cache shared by the workers, so unchanged workbooks are copied from
+                                       earlier results instead of being processed again. Defaults to None.
+        reader (str, optional): The workbook reader, one of READERS. Not used when streaming. Defaults to 'auto'.
+        writer (str, optional): The workbook writer, one of WRITERS. Not used when streaming. Defaults to 'auto'.
+        input_format (str, optional): The format of the inputs, one of TABLE_FORMATS. For a directory this also picks
+                                      the files to process. Not used when streaming. Defaults to detecting each file's format.
+        output_format (str, optional): The format of the outputs, one of TABLE_FORMATS. Not used when streaming.
+                                       Defaults to each input's format.
+        group_rows (bool, optional): Group the rows of each output by its outline, as for indent_excel. Not used when
+                                     streaming. Defaults to False.
+        numbering (HeadingNumbering, optional): The heading numbering grammars, compiled once and shared with the workers.
+                                                Defaults to decimal.
+
+    Returns:
+        tuple: A tuple containing:
+            - list: One dict per workbook with 'file', 'status' ('success', 'failed' or 'cancelled'),
+                    'output_file', 'seconds', 'messages', 'phases' (PhaseMetrics.to_dict() per phase) and
+                    'cache_status' ('hit', 'miss' or None), in the order the files were found.
+            - list: A list of strings containing all output messages from the function.
+    """
+    reporter = reporter or ProgressReporter()
+    output = reporter.message_log()
+    start = time.perf_counter()
+
+    excel_files = find_excel_files(path_or_pattern, input_format)
+    if not excel_files:
+        output.append(f"Error: No {'.xlsx' if input_format is None else input_format} files found for '{path_or_pattern}'.")
+        return [], output
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(excel_files)))
+    output.append(f"Processing {len(excel_files)} file(s) with {max_workers} worker(s).")
+
+    results = {}
+    cancelling = False
+    reporter.progress('batch', 0, len(excel_files))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_indent_excel_batch_item, excel_file, heading_column, mode, streaming, cache, reader, writer,
+                                   input_format, output_format, group_rows, numbering): excel_file for excel_file in excel_files}
+        for future in concurrent.futures.as_completed(futures):
+            excel_file = futures[future]
+            if future.cancelled():
+                continue
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'file': excel_file, 'status': 'failed', 'output_file': "", 'seconds': 0.0, 'messages': [f"Error: Worker process failed: {e}"], 'phases': [], 'cache_status': None}
+            results[excel_file] = result
+            output.append(f"{result['status'].upper()}: '{excel_file}' in {result['seconds']:.2f}s" + (f" (cache {result['cache_status']})" if result['cache_status'] else ""))
+            errors = [message for message in result['messages'] if message.startswith("Error")]
+            if result['status'] == 'failed' and errors:
+                output.append(f"    {errors[-1]}")
+            reporter.progress('batch', len(results), len(excel_files))
+            if not cancelling and reporter.cancelled(output):
+                # Files already running finish; the rest are never started
+                cancelling = True
+                for pending in futures:
+                    pending.cancel()
+
+    report = []
+    for excel_file in excel_files:
+        report.append(results.get(excel_file, {'file': excel_file, 'status': 'cancelled', 'output_file': "", 'seconds': 0.0, 'messages': [], 'phases': [], 'cache_status': None}))
+
+    succeeded = sum(1 for result in report if result['status'] == 'success')
+    cache_hits = sum(1 for result in report if result['cache_status'] == 'hit')
+    output.append(f"Batch finished in {time.perf_counter() - start:.2f}s: {succeeded} succeeded{f' ({cache_hits} from cache)' if cache_hits else ''}, "
+                  f"{len(report) - succeeded} failed or cancelled.")
+    return report, output
+
+def _indent_heading_column(heading_series, engine, mode, numbering=None):
+    """
+    Calculates and applies the indents of one sheet's heading column for a multi-sheet run. Only the heading
+    column is passed in, so that sending it to a worker process costs little.
+
+    Returns:
+        tuple: A tuple containing:
+            - np.ndarray: The indent level of each row.
+            - np.ndarray or None: The indented headings in 'spaces' mode, otherwise None.
+            - list: The sheet's output messages.
+    """
+    output = []
+    levels = _calculate_indent_levels(heading_series, engine, numbering)
+    headings = None
+    if mode == 'spaces':
+        headings = _apply_space_indents(pd.Series(levels), heading_series, CALCULATED_INDENTS_COLUMN, output)
+    output.append(f"Indented {len(levels)} rows.")
+    return levels, headings, output
+
+def indent_excel_sheets(source, heading_column: str = 'Heading', destination=None, sheets=None, engine: str = 'vectorized', mode: str = 'spaces', max_workers=None, reporter=None,
+                        reader: str = 'auto', writer: str = 'auto', group_rows: bool = False, numbering=None) -> tuple:
+    """
+    Indents every sheet of a workbook, instead of only the first one like indent_excel.
+
+    The workbook is read once and all sheets are written back, in their original order, with a single
+    save. The heading columns are indented one sheet at a time, since the work holds the GIL; only when
+    the selected sheets together reach SHEET_PROCESS_ROWS rows are they sent to a process pool instead.
+
+    When some sheets are not indented (they have no heading column or are not listed in 'sheets') and the
+    source and destination are .xlsx paths, the 'auto' writer is the 'patch' writer, which copies those sheets
+    through byte for byte. The other writers rebuild every sheet from its values, which loses their formatting
+    and formulas; a warning names the sheets that were not indented but rebuilt.
+
+    Args:
+        source (str or file-like): The Excel file path or an open binary stream of an Excel file.
+        heading_column (str, optional): The name of the column that contains the headings. Defaults to 'Heading'.
+        destination (str or file-like, optional): Where to write the indented workbook, as for indent_excel.
+        sheets (list, optional): The names of the sheets to indent. Defaults to every sheet.
+        engine (str, optional): The indent calculation engine, 'vectorized' or 'loop'. Defaults to 'vectorized'.
+        mode (str, optional): 'spaces' or 'alignment', as for indent_excel. Defaults to 'spaces'.
+        max_workers (int, optional): The number of worker processes for large workbooks. Defaults to one per sheet, up to the number of CPUs.
+        reporter (ProgressReporter, optional): Receives messages and progress and can cancel the run before it is saved.
+        reader (str, optional): The workbook reader, one of READERS. Defaults to 'auto' (see resolve_reader).
+        writer (str, optional): The workbook writer, one of WRITERS. Defaults to 'auto': 'patch' when sheets pass through
+                                and it can be used (see above), otherwise as resolve_writer picks.
+        group_rows (bool, optional): Group the rows of each indented sheet by its outline, as for indent_excel. Defaults to False.
+        numbering (HeadingNumbering, optional): The heading numbering grammars, as for indent_excel. Defaults to decimal.
+
+    Returns:
+        tuple: A tuple containing:
+            - str or file-like: The destination the indented workbook was written to, or an empty string if an error occurred.
+            - list: A list of strings containing all output messages from the function.
+    """
+    reporter = reporter or ProgressReporter()
+    output = reporter.message_log()
+    source_is_path = isinstance(source, (str, os.PathLike))
+
+    if mode not in INDENT_MODES:
+        output.append(f"Error: Unknown indent mode '{mode}'. Expected one of: {', '.join(INDENT_MODES)}.")
+        return "", output
+    if engine not in INDENT_ENGINES:
+        output.append(f"Error: Unknown indent engine '{engine}'. Expected one of: {', '.join(INDENT_ENGINES)}.")
+        return "", output
+    # Only the patch writer copies the sheets that are not indented without losing anything
+    can_patch = writer == 'auto' and _patch_writer_applies(source, destination)
+    try:
+        reader, writer = resolve_reader(reader), resolve_writer(writer)
+        if writer == 'patch':
+            _check_patch_writer(source, destination)
+    except ValueError as e:
+        output.append(f"Error: {e}")
+        return "", output
+
+    reporter.progress('read')
+    try:
+        frames = pd.read_excel(source, sheet_name=None, engine=reader)
+        output.append(f"Successfully read {len(frames)} sheet(s).")
+    except FileNotFoundError:
+        output.append(f"Error: File '{source}' not found.")
+        return "", output
+    except Exception as e:
+        output.append(f"Error reading Excel file '{source}': {e}")
+        return "", output
+
+    if sheets is not None:
+        missing_sheets = [sheet for sheet in sheets if sheet not in frames]
+        if missing_sheets:
+            output.append(f"Error: Sheet(s) not found in the Excel file: {', '.join(map(str, missing_sheets))}.")
+            return "", output
+    selected_sheets = [sheet for sheet in frames if sheets is None or sheet in sheets]
+    for sheet in selected_sheets:
+        if heading_column not in frames[sheet].columns:
+            output.append(f"Sheet '{sheet}': No '{heading_column}' column; not indented.")
+    heading_sheets = [sheet for sheet in selected_sheets if heading_column in frames[sheet].columns]
+    if not heading_sheets:
+        output.append(f"Error: '{heading_column}' column not found in any sheet of the Excel file.")
+        return "", output
+    if can_patch and len(heading_sheets) < len(frames):
+        # Rewriting every row in place is slower than building a new workbook, so it is only used when some sheet has to pass through
+        writer = 'patch'
+
+    total_rows = sum(len(frames[sheet]) for sheet in heading_sheets)
+    reporter.progress('compute', 0, total_rows)
+    if reporter.cancelled(output):
+        return "", output
+
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(heading_sheets)))
+    executor = None
+    if max_workers > 1 and total_rows >= SHEET_PROCESS_ROWS:
+        # The indenting holds the GIL, so only processes run sheets side by side; below the threshold starting them costs more than it saves
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+    indented_frames = {}
+    try:
+        results = {sheet: executor.submit(_indent_heading_column, frames[sheet][heading_column], engine, mode, numbering) if executor else None
+                   for sheet in heading_sheets}
+        rows_done = 0
+        for sheet in heading_sheets:
+            df = frames[sheet]
+            levels, headings, sheet_output = results[sheet].result() if executor else _indent_heading_column(df[heading_column], engine, mode, numbering)
+            for message in sheet_output:
+                output.append(f"Sheet '{sheet}': {message}")
+            df = df.copy()
+            df[CALCULATED_INDENTS_COLUMN] = levels
+            if headings is not None:
+                df[heading_column] = headings
+            indented_frames[sheet] = df
+            rows_done += len(df)
+            reporter.progress('compute', rows_done, total_rows)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if destination is None:
+        destination = _derive_file_name(os.fspath(source), "_indented") if source_is_path else io.BytesIO()
+
+    reporter.progress('write', 0, total_rows)
+    if reporter.cancelled(output):
+        return "", output
+
+    try:
+        other_sheets = [str(sheet) for sheet in frames if sheet not in indented_frames]
+        if writer == 'patch':
+            # Sheets without changes are left exactly as they are
+            _patch_sheets(source, destination, [(sheet, indented_df, heading_column, frames[sheet][heading_column]) for sheet, indented_df in indented_frames.items()], mode, group_rows)
+            if other_sheets:
+                output.append(f"Sheet(s) copied unchanged: {', '.join(other_sheets)}.")
+        else:
+            _write_sheets(destination, [(sheet, indented_frames.get(sheet, df), heading_column if sheet in indented_frames else None) for sheet, df in frames.items()],
+                          writer, mode, group_rows)
+            if other_sheets:
+                output.append(f"Warning: Sheet(s) {', '.join(other_sheets)} were not indented but rebuilt from their values by the '{writer}' writer, "
+                              f"so their formatting and formulas were not kept. The 'patch' writer copies them unchanged.")
+        reporter.progress('write', total_rows, total_rows)
+        if isinstance(destination, (str, os.PathLike)):
+            output.append(f"File '{destination}' updated successfully.")
+        else:
+            output.append("Indented workbook written to stream successfully.")
+        return destination, output
+    except Exception as e:
+        output.append(f"Error saving Excel file '{destination}': {e}")
+        return "", output
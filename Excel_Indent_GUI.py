@@ -2,10 +2,65 @@
 
 import sys
 import os
-from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QPushButton, QLineEdit, QFileDialog, QLabel, QTextEdit, QHBoxLayout)
-from PyQt6.QtCore import Qt
+import multiprocessing
+from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QPushButton, QLineEdit, QFileDialog, QLabel, QTextEdit, QHBoxLayout, QCheckBox, QProgressBar, QSpinBox, QComboBox)
+from PyQt6.QtCore import Qt, QObject, QThread, pyqtSignal
 from PyQt6.QtGui import QIcon, QScreen
-from Excel_Indent_Functions import indent_function, calculate_indents_and_save_new_excel
+from Excel_Indent_Cache import DEFAULT_CACHE_MAX_BYTES, ResultCache, default_cache_dir
+from Excel_Indent_Numbering import HeadingNumbering
+from Excel_Indent_Functions import READERS, WRITERS, ProcessingResult, ProgressReporter, batch_indent_excel, incremental_indent_excel, indent_excel, stream_indent_excel
+
+class ProcessingWorker(QObject):
+    #
+    # Runs the indenting pipeline on a background QThread so the window stays responsive.
+    # Messages and progress are sent back to the GUI thread through signals.
+    #
+    message = pyqtSignal(str) # An output message, as soon as it is produced
+    progress = pyqtSignal(str, int, int) # Phase ('read', 'compute', 'write' or 'batch'), rows (or files) processed, total (0 if unknown)
+    finished = pyqtSignal(object) # The ProcessingResult; its output_file is empty on failure or cancel
+
+    def __init__(self, file_path, heading_column_name, mode, streaming, batch=False, max_workers=None, use_cache=False, incremental=False, reader='auto', writer='auto',
+                 group_rows=False, numbering=None):
+        super().__init__()
+        self.file_path = file_path
+        self.heading_column_name = heading_column_name
+        self.mode = mode
+        self.streaming = streaming
+        self.batch = batch
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+        self.incremental = incremental
+        self.reader = reader
+        self.writer = writer
+        self.group_rows = group_rows
+        self.numbering = numbering
+        self.cancel_requested = False
+
+    def cancel(self):
+        # Called from the GUI thread; the pipeline checks this between phases and every few thousand rows
+        self.cancel_requested = True
+
+    def run(self):
+        reporter = ProgressReporter(on_message=self.message.emit, on_progress=self.progress.emit, is_cancelled=lambda: self.cancel_requested)
+        try:
+            cache = ResultCache() if self.use_cache else None
+            if self.batch:
+                report, output = batch_indent_excel(self.file_path, self.heading_column_name, mode=self.mode, max_workers=self.max_workers, streaming=self.streaming, reporter=reporter, cache=cache,
+                                                    reader=self.reader, writer=self.writer, group_rows=self.group_rows, numbering=self.numbering)
+                all_succeeded = report and all(result['status'] == 'success' for result in report)
+                result = ProcessingResult(self.file_path if all_succeeded else "", output)
+            elif self.incremental:
+                result = incremental_indent_excel(self.file_path, self.heading_column_name, mode=self.mode, reporter=reporter, reader=self.reader, writer=self.writer,
+                                                  numbering=self.numbering)
+            elif self.streaming:
+                result = stream_indent_excel(self.file_path, self.heading_column_name, mode=self.mode, reporter=reporter, cache=cache, numbering=self.numbering)
+            else:
+                result = indent_excel(self.file_path, self.heading_column_name, mode=self.mode, reporter=reporter, cache=cache, reader=self.reader, writer=self.writer,
+                                      group_rows=self.group_rows, numbering=self.numbering)
+        except Exception as e:
+            self.message.emit(f"Error: Unexpected failure while processing: {e}")
+            result = ProcessingResult("", [])
+        self.finished.emit(result)
 
 class ExcelProcessorGUI(QWidget):
     def __init__(self):
@@ -27,9 +82,14 @@ class ExcelProcessorGUI(QWidget):
         self.setWindowIcon(QIcon(icon_path)) # Add the icon to the app's header bar
 
         # Initialize user input variables
-        self.file_path = "" # The file to be indented
+        self.file_path = "" # The file to be indented, or the folder of files in batch mode
+        self.batch_mode = False # True when a folder was selected
         self.heading_column_name = "" # The column to base the indenting on
 
+        # Background processing state
+        self.worker = None
+        self.worker_thread = None
+
         self.init_ui()
 
     def init_ui(self):
@@ -41,6 +101,10 @@ class ExcelProcessorGUI(QWidget):
         self.select_file_button.clicked.connect(self.select_excel_file)
         file_selection_layout.addWidget(self.select_file_button)
         self.select_file_button.setStyleSheet("background-color: #0052CC; color: white;") # Set the button color
+        self.select_folder_button = QPushButton("Select Folder")
+        self.select_folder_button.clicked.connect(self.select_excel_folder)
+        file_selection_layout.addWidget(self.select_folder_button)
+        self.select_folder_button.setStyleSheet("background-color: #0052CC; color: white;") # Set the button color
         self.file_path_label = QLabel("No file selected")
         file_selection_layout.addWidget(self.file_path_label)
         main_layout.addLayout(file_selection_layout)
@@ -55,6 +119,57 @@ class ExcelProcessorGUI(QWidget):
         heading_layout.addWidget(self.heading_column_input)
         main_layout.addLayout(heading_layout)
 
+        # Heading Numbering Grammars
+        numbering_layout = QHBoxLayout()
+        numbering_layout.addWidget(QLabel("Heading Numbering:"))
+        self.numbering_input = QLineEdit()
+        self.numbering_input.setPlaceholderText("decimal (or e.g. 'decimal,alpha,roman,prefixed', or a .json file)")
+        numbering_layout.addWidget(self.numbering_input)
+        main_layout.addLayout(numbering_layout)
+
+        # Indent Mode Option
+        self.alignment_mode_checkbox = QCheckBox("Use Excel cell indent (keep heading values unchanged)")
+        main_layout.addWidget(self.alignment_mode_checkbox)
+
+        # Row Grouping Option
+        self.group_rows_checkbox = QCheckBox("Group rows by outline so sections can be collapsed (not in low memory or incremental mode)")
+        main_layout.addWidget(self.group_rows_checkbox)
+
+        # Streaming Option
+        self.streaming_checkbox = QCheckBox("Low memory mode (stream rows, for very large files)")
+        main_layout.addWidget(self.streaming_checkbox)
+
+        # Cache Option (off by default: it keeps a copy of every indented file)
+        self.cache_checkbox = QCheckBox(f"Reuse results for unchanged files (keeps copies, up to {DEFAULT_CACHE_MAX_BYTES // (1024 * 1024)} MB, in {default_cache_dir()})")
+        main_layout.addWidget(self.cache_checkbox)
+
+        # Incremental Option (single files only)
+        self.incremental_checkbox = QCheckBox("Only update rows changed since the last run (single files)")
+        main_layout.addWidget(self.incremental_checkbox)
+
+        # Batch Worker Count (only used when a folder is selected)
+        workers_layout = QHBoxLayout()
+        workers_layout.addWidget(QLabel("Parallel Workers (folders):"))
+        self.workers_input = QSpinBox()
+        self.workers_input.setRange(1, max(os.cpu_count() or 1, 1) * 2)
+        self.workers_input.setValue(os.cpu_count() or 1)
+        workers_layout.addWidget(self.workers_input)
+        workers_layout.addStretch()
+        main_layout.addLayout(workers_layout)
+
+        # Excel Reader/Writer Engines ('auto' picks the fastest installed one)
+        io_engine_layout = QHBoxLayout()
+        io_engine_layout.addWidget(QLabel("Reader:"))
+        self.reader_combo = QComboBox()
+        self.reader_combo.addItems(READERS)
+        io_engine_layout.addWidget(self.reader_combo)
+        io_engine_layout.addWidget(QLabel("Writer:"))
+        self.writer_combo = QComboBox()
+        self.writer_combo.addItems(WRITERS)
+        io_engine_layout.addWidget(self.writer_combo)
+        io_engine_layout.addStretch()
+        main_layout.addLayout(io_engine_layout)
+
         # Run Button
         self.run_button = QPushButton("Run Processing")
         self.run_button.clicked.connect(self.run_processing)
@@ -62,6 +177,18 @@ class ExcelProcessorGUI(QWidget):
         self.run_button.setStyleSheet("background-color: #53575A; color: white;") # Set the button color
         main_layout.addWidget(self.run_button)
 
+        # Progress Bar & Cancel Button (initially hidden)
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False) # Hide initially
+        progress_layout.addWidget(self.progress_bar)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_processing)
+        self.cancel_button.setVisible(False) # Hide initially
+        self.cancel_button.setStyleSheet("background-color: #53575A; color: white;") # Set the button color
+        progress_layout.addWidget(self.cancel_button)
+        main_layout.addLayout(progress_layout)
+
         # Output Console (initially hidden)
         self.output_console = QTextEdit()
         self.output_console.setReadOnly(True)
@@ -75,15 +202,33 @@ class ExcelProcessorGUI(QWidget):
         # This function does the following:
         #   Open file explorer.
         #   Collect user's file name & path.
-        #   Only allow user to select .xlsx files
+        #   Only allow user to select .xlsx files (or CSV, Parquet and Arrow tables)
         #   Check if all inputs have been collected.
         #
         file_dialog = QFileDialog()
-        file_path, _ = file_dialog.getOpenFileName(self, "Select Excel File", "", "Excel Files (*.xlsx)")
+        file_path, _ = file_dialog.getOpenFileName(self, "Select Excel File", "", "Excel Files (*.xlsx);;Tables (*.xlsx *.csv *.parquet *.arrow *.feather)")
         if file_path:
             self.file_path = file_path
+            self.batch_mode = False
             self.file_path_label.setText(f"Selected: {self.file_path}")
             self.select_file_button.setStyleSheet("background-color: #53575A; color: white;") # Set the button color
+            self.select_folder_button.setStyleSheet("background-color: #53575A; color: white;") # Set the button color
+            self.check_enable_run_button()
+
+    def select_excel_folder(self):
+        #
+        # This function does the following:
+        #   Open file explorer.
+        #   Collect user's folder of .xlsx files to indent in one batch.
+        #   Check if all inputs have been collected.
+        #
+        folder_path = QFileDialog.getExistingDirectory(self, "Select Folder of Excel Files")
+        if folder_path:
+            self.file_path = folder_path
+            self.batch_mode = True
+            self.file_path_label.setText(f"Selected folder: {self.file_path}")
+            self.select_file_button.setStyleSheet("background-color: #53575A; color: white;") # Set the button color
+            self.select_folder_button.setStyleSheet("background-color: #53575A; color: white;") # Set the button color
             self.check_enable_run_button()
 
     def update_heading_column_name(self, text):
@@ -99,9 +244,9 @@ class ExcelProcessorGUI(QWidget):
         # 
         # This function does the following:
         #   Checks if both the file and heading column inputs have been provided
-        #   Enables the run button if both are provided
+        #   Enables the run button if both are provided and nothing is already running
         #
-        if self.file_path and self.heading_column_name:
+        if self.file_path and self.heading_column_name and self.worker is None:
             self.run_button.setEnabled(True)
             self.run_button.setStyleSheet("background-color: #0052CC; color: white;") # Set the button color
         else:
@@ -111,32 +256,105 @@ class ExcelProcessorGUI(QWidget):
         # 
         # Execute based off of user inputs when the run button is pressed. This includes the following:
         #   Opening a console to show any error messages
-        #   Calling the related functions to execute
+        #   Starting the processing on a background thread, with progress and a cancel button
         #
         self.output_console.clear() # Clear previous output
         self.output_console.setVisible(True) # Show the console
         self.output_console.append("--- Starting Processing ---") # Processing start message
-        
-        # Call Indent Calulator - it now returns the full path of the _new file
-        new_file_path, numbering_column, heading_column, output1 = calculate_indents_and_save_new_excel(self.file_path, self.heading_column_name)
-        self.output_console.append(f"Function 1 Output:\n{output1}") # Indent Calculator Output Messages
-        
-        # Check if new_file_path is valid before proceeding to indent_function
-        if new_file_path:
-            output2 = indent_function(new_file_path, numbering_column, heading_column) # Call Indenting Function
-            self.output_console.append(f"\nFunction 2 Output:\n{output2}") # Indenting Function Output Messages
-            self.output_console.append("")
+
+        # The numbering grammars are compiled once here and shared by the whole run
+        numbering = None
+        if self.numbering_input.text().strip():
+            try:
+                numbering = HeadingNumbering.from_config(self.numbering_input.text().strip())
+            except (OSError, ValueError) as e:
+                self.output_console.append(f"Error: Invalid heading numbering: {e}")
+                self.adjustSize()
+                return
+
+        self.run_button.setEnabled(False)
+        self.run_button.setStyleSheet("background-color: #53575A; color: white;") # Set the button color
+        self.progress_bar.setRange(0, 0) # Busy until the first progress report
+        self.progress_bar.setVisible(True)
+        self.cancel_button.setEnabled(True)
+        self.cancel_button.setVisible(True)
+        self.adjustSize() # Adjust window size to show console
+
+        # Calculate the indents and indent the heading column in one pass, writing only the _indented file
+        mode = 'alignment' if self.alignment_mode_checkbox.isChecked() else 'spaces'
+        self.worker = ProcessingWorker(self.file_path, self.heading_column_name, mode, self.streaming_checkbox.isChecked(), self.batch_mode, self.workers_input.value(), self.cache_checkbox.isChecked(),
+                                        self.incremental_checkbox.isChecked(), self.reader_combo.currentText(), self.writer_combo.currentText(),
+                                        self.group_rows_checkbox.isChecked(), numbering)
+        self.worker_thread = QThread()
+        self.worker.moveToThread(self.worker_thread)
+        self.worker_thread.started.connect(self.worker.run)
+        self.worker.message.connect(self.output_console.append) # Indenting Output Messages
+        self.worker.progress.connect(self.update_progress)
+        self.worker.finished.connect(self.processing_finished)
+        self.worker.finished.connect(self.worker_thread.quit)
+        self.worker_thread.finished.connect(self.release_worker)
+        self.worker_thread.start()
+
+    def update_progress(self, phase, rows, total):
+        #
+        # Show the current phase and row count, as a percentage when the total is known
+        #
+        if total:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(min(rows, total))
+        else:
+            self.progress_bar.setRange(0, 0) # Busy indicator
+        unit = "files" if phase == 'batch' else "rows"
+        self.progress_bar.setFormat(f"{phase.capitalize()}: {rows:,} {unit}")
+
+    def cancel_processing(self):
+        #
+        # Ask the worker to stop; it finishes at its next check without writing a file
+        #
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_button.setEnabled(False)
+            self.output_console.append("Cancelling...")
+
+    def processing_finished(self, result):
+        #
+        # Report the final status and reset the controls once the worker is done
+        #
+        self.output_console.append("")
+        if result.success:
             self.output_console.append("Final Status: SUCCESS") # Success Message
+        elif self.worker.cancel_requested:
+            self.output_console.append("Final Status: CANCELLED") # Cancelled Message
         else:
-            self.output_console.append("\nError: Could not create the intermediate '_new' Excel file. Indentation function not executed.")
-            self.output_console.append("")
             self.output_console.append("Final Status: FAILURE") # Failure Message
-    
         self.output_console.append("--- Processing Finished ---") # Processing end message
-        self.adjustSize() # Adjust window size to show console
+
+        self.progress_bar.setVisible(False)
+        self.cancel_button.setVisible(False)
+
+    def release_worker(self):
+        #
+        # Drop the worker and its thread only once the thread has fully stopped
+        #
+        self.worker.deleteLater()
+        self.worker_thread.deleteLater()
+        self.worker = None
+        self.worker_thread = None
+        self.check_enable_run_button()
+
+    def closeEvent(self, event):
+        #
+        # Stop any running processing before the window closes
+        #
+        if self.worker_thread is not None:
+            self.worker.cancel()
+            self.worker_thread.quit()
+            self.worker_thread.wait() # Returns once the worker reaches its next cancel check
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     # Run the app when running this file
+    multiprocessing.freeze_support() # Lets the packaged .exe start batch worker processes
     app = QApplication(sys.argv)
     window = ExcelProcessorGUI()
     window.show()
@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('jama_logo_icon.png', '.')],
-    hiddenimports=[],
+    hiddenimports=['python_calamine'], # Loaded by pandas by name for the calamine reader
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
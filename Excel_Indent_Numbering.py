@@ -0,0 +1,169 @@
+# Excel Indent Numbering
+
+import dataclasses
+import json
+import re
+import numpy as np
+
+# The kinds of numbering segment a grammar can be built from
+NUMBERING_SEGMENTS = {
+    'decimal': r'\d+',
+    'roman': r'(?=[MDCLXVI])M{0,3}(?:C[MD]|D?C{0,3})(?:X[CL]|L?X{0,3})(?:I[XV]|V?I{0,3})',
+    'lower-roman': r'(?=[mdclxvi])m{0,3}(?:c[md]|d?c{0,3})(?:x[cl]|l?x{0,3})(?:i[xv]|v?i{0,3})',
+    'alpha': r'[A-Z]',
+    'lower-alpha': r'[a-z]',
+}
+
+@dataclasses.dataclass(frozen=True)
+class NumberingGrammar:
+    """
+    One heading numbering scheme: an optional prefix, then segments joined by a separator, e.g. 'A.1.2'
+    (first='alpha') or 'SYS-REQ-3.1.4' (prefix='SYS-REQ-'). A heading's level is its number of separators.
+
+    Attributes:
+        name (str): The grammar's name, used in messages and configuration.
+        prefix (str): A regular expression for the text before the numbering, without capturing groups. Defaults to none.
+        first (str): The kind of the first segment, one of NUMBERING_SEGMENTS. Defaults to 'decimal'.
+        rest (str): The kind of every later segment, one of NUMBERING_SEGMENTS. Defaults to 'decimal'.
+        separator (str): The text between segments. Defaults to '.'.
+        min_segments (int): The fewest segments a numbering needs. Letters and roman numerals are also
+                            ordinary words ('A', 'I'), so their built-in grammars need two. Defaults to 1.
+
+    A numbering that uses letters must also not run straight into a word, so 'illegal' is not read as 'i'.
+    """
+    name: str
+    prefix: str = ''
+    first: str = 'decimal'
+    rest: str = 'decimal'
+    separator: str = '.'
+    min_segments: int = 1
+
+    def __post_init__(self):
+        for field in dataclasses.fields(self):
+            value = getattr(self, field.name)
+            if not isinstance(value, field.type) or isinstance(value, bool):
+                raise ValueError(f"The {field.name} of numbering grammar '{self.name}' must be of type {field.type.__name__}, not {value!r}.")
+        for kind in (self.first, self.rest):
+            if kind not in NUMBERING_SEGMENTS:
+                raise ValueError(f"Unknown numbering segment '{kind}' in grammar '{self.name}'. Expected one of: {', '.join(NUMBERING_SEGMENTS)}.")
+        if not self.separator:
+            raise ValueError(f"The numbering grammar '{self.name}' needs a separator.")
+        if self.min_segments < 1:
+            raise ValueError(f"The numbering grammar '{self.name}' needs min_segments of at least 1.")
+        try:
+            prefix_groups = re.compile(self.prefix).groups
+        except re.error as e:
+            raise ValueError(f"Invalid prefix in numbering grammar '{self.name}': {e}") from None
+        if prefix_groups:
+            raise ValueError(f"The prefix of numbering grammar '{self.name}' may only use non-capturing groups, e.g. '(?:...)'.")
+
+    @property
+    def numbering_pattern(self):
+        """
+        The regular expression of the numbering itself, after the prefix.
+        """
+        rest = f"{re.escape(self.separator)}{NUMBERING_SEGMENTS[self.rest]}"
+        pattern = f"{NUMBERING_SEGMENTS[self.first]}(?:{rest}){{{self.min_segments - 1},}}"
+        if self.first != 'decimal' or self.rest != 'decimal':
+            pattern += "(?![A-Za-z])"
+        return pattern
+
+BUILTIN_GRAMMARS = {
+    'decimal': NumberingGrammar('decimal'),
+    'alpha': NumberingGrammar('alpha', first='alpha', min_segments=2),
+    'roman': NumberingGrammar('roman', first='roman', min_segments=2),
+    'prefixed': NumberingGrammar('prefixed', prefix=r'[A-Z][A-Z0-9]*(?:-[A-Z][A-Z0-9]*)*-'),
+}
+
+class HeadingNumbering:
+    """
+    The numbering grammars recognised in a heading column, compiled once into a single pattern.
+
+    Each grammar is one alternative of the pattern, capturing its numbering in its own group, so a heading
+    is matched once however many grammars there are; the group that matched says which separator to count.
+    Grammars are tried in the order given and the first one that matches a heading wins.
+
+    Args:
+        grammars (iterable, optional): NumberingGrammar objects, names of BUILTIN_GRAMMARS, or dicts of
+                                       NumberingGrammar fields (a dict with just a known 'name' is that built-in).
+                                       Defaults to ('decimal',), the '1.2.3' numbering the tool has always used.
+
+    Raises:
+        ValueError: If a grammar is unknown or invalid, or no grammar is given.
+    """
+    def __init__(self, grammars=('decimal',)):
+        self.grammars = tuple(_resolve_grammar(grammar) for grammar in grammars)
+        if not self.grammars:
+            raise ValueError("At least one numbering grammar is needed.")
+        # Leading whitespace is skipped by the pattern instead of stripping every heading first
+        alternatives = '|'.join(f"{grammar.prefix}({grammar.numbering_pattern})" for grammar in self.grammars)
+        try:
+            self.pattern = re.compile(f"^\\s*(?:{alternatives})")
+        except re.error as e: # e.g. a min_segments beyond the pattern's repetition limit
+            raise ValueError(f"Invalid numbering grammars: {e}") from None
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Builds the numbering from a configuration: a JSON file path, a comma-separated list of built-in
+        grammar names (e.g. 'decimal,alpha'), or a list as accepted by the constructor. A JSON file holds
+        such a list, e.g. ["decimal", {"name": "requirements", "prefix": "SYS-REQ-"}].
+        """
+        if isinstance(config, str):
+            if config.lower().endswith('.json'):
+                with open(config, encoding='utf-8') as config_file:
+                    config = json.load(config_file)
+            else:
+                config = [name.strip() for name in config.split(',') if name.strip()]
+        return cls(config)
+
+    @property
+    def config(self):
+        """
+        The grammars as a list of dicts, which from_config accepts and which goes into cache keys and indexes.
+        """
+        return [dataclasses.asdict(grammar) for grammar in self.grammars]
+
+    def match_level(self, heading):
+        """
+        Returns the level of a single heading string, or None if no grammar matches it.
+        """
+        match = self.pattern.match(heading)
+        if match is None:
+            return None
+        return match.group(match.lastindex).count(self.grammars[match.lastindex - 1].separator)
+
+    def match_levels(self, heading_series):
+        """
+        Returns the level of every heading in a column as floats, NaN where no grammar matches.
+
+        Args:
+            heading_series (pd.Series): The heading column.
+
+        Returns:
+            np.ndarray: The level of each row, in order.
+        """
+        # Series.str.extract also matches row by row in Python, and with one group per grammar its DataFrame
+        # of groups costs more than the matching; one match per row here keeps the cost flat as grammars are added
+        match = self.pattern.match
+        separators = [None] + [grammar.separator for grammar in self.grammars] # Indexed by group number
+        nan = float('nan')
+        return np.array([numbering.group(numbering.lastindex).count(separators[numbering.lastindex]) if (numbering := match(heading)) else nan
+                         for heading in heading_series.astype(str).tolist()], dtype=float)
+
+def _resolve_grammar(grammar):
+    if isinstance(grammar, NumberingGrammar):
+        return grammar
+    if isinstance(grammar, dict) and set(grammar) != {'name'}:
+        try:
+            return NumberingGrammar(**grammar)
+        except TypeError as e:
+            raise ValueError(f"Invalid numbering grammar {grammar}: {e}") from None
+    name = grammar['name'] if isinstance(grammar, dict) else grammar
+    if not isinstance(name, str):
+        raise ValueError(f"Invalid numbering grammar {grammar!r}. Expected a grammar name, a dict of NumberingGrammar fields or a NumberingGrammar.")
+    if name not in BUILTIN_GRAMMARS:
+        raise ValueError(f"Unknown numbering grammar '{name}'. Expected one of: {', '.join(BUILTIN_GRAMMARS)}.")
+    return BUILTIN_GRAMMARS[name]
+
+DEFAULT_NUMBERING = HeadingNumbering()
@@ -0,0 +1,112 @@
+# Excel Indent Outline
+
+import dataclasses
+import numpy as np
+
+MAX_OUTLINE_LEVEL = 7 # Excel's deepest row grouping
+
+@dataclasses.dataclass(eq=False) # Array fields do not compare to a single bool
+class OutlineIndex:
+    """
+    The outline tree of a heading column, held as one NumPy array per field with an entry per row.
+
+    Each row's parent is the nearest row above it with a lower indent level, so a heading that skips
+    a level (e.g. '1.2.3' straight under '1') still hangs from the closest heading above it.
+
+    Attributes:
+        parent (np.ndarray): The 0-based row of each row's parent, or -1 for top-level rows.
+        order (np.ndarray): The 0-based position of each row among its parent's children.
+        depth (np.ndarray): The number of ancestors of each row (0 for top-level rows).
+        level (np.ndarray): The indent level each row was built from.
+        end (np.ndarray): The row just past each row's section, i.e. after its last descendant, so
+                          rows[row:end[row]] is the row and everything under it.
+        path (np.ndarray): The path key of each row: the 1-based sibling positions from the top down,
+                           joined with dots (e.g. '2.1.3'). Unlike the numbering in the headings, every
+                           row has one and they are unique.
+    """
+    parent: np.ndarray
+    order: np.ndarray
+    depth: np.ndarray
+    level: np.ndarray
+    end: np.ndarray
+    path: np.ndarray
+
+    def __len__(self):
+        return len(self.parent)
+
+    def children(self, row):
+        """
+        Returns the rows of the direct children of a row (-1 for the top-level rows), in order.
+        """
+        return np.flatnonzero(self.parent == row)
+
+    def outline_levels(self):
+        """
+        Returns Excel's row outline level for each row: its depth, capped at the 7 levels Excel supports.
+        With the summary rows above their details, each heading then collapses the rows under it.
+        """
+        return np.minimum(self.depth, MAX_OUTLINE_LEVEL)
+
+    def save(self, index_file):
+        """
+        Writes the arrays to a NumPy .npz file, which load() reads back.
+        """
+        np.savez_compressed(index_file, **{field.name: getattr(self, field.name) for field in dataclasses.fields(self)})
+
+    @classmethod
+    def load(cls, index_file):
+        with np.load(index_file) as arrays:
+            return cls(**{field.name: arrays[field.name] for field in dataclasses.fields(cls)})
+
+def build_outline_index(levels):
+    """
+    Builds the outline tree from the indent level of every row in one pass over the rows.
+
+    The headings that are still open are kept on a stack. Each row first closes the headings at its own
+    level or deeper, ending their sections, and the heading left on top of the stack is its parent.
+    Every row is pushed and popped once, so the pass is linear in the number of rows.
+
+    Args:
+        levels (array-like): The integer indent level of each row, e.g. from _calculate_indent_levels.
+
+    Returns:
+        OutlineIndex: The tree, in row order.
+    """
+    levels = np.asarray(levels, dtype=np.int64)
+    row_count = len(levels)
+    # Plain lists are filled in the loop; indexing NumPy arrays one element at a time is much slower
+    parents = [-1] * row_count
+    orders = [0] * row_count
+    depths = [0] * row_count
+    ends = [row_count] * row_count
+    paths = [''] * row_count
+    child_counts = [0] * row_count
+    top_level_count = 0
+
+    stack = []
+    level_list = levels.tolist()
+    for row, level in enumerate(level_list):
+        while stack and level_list[stack[-1]] >= level:
+            ends[stack.pop()] = row
+        if stack:
+            parent = stack[-1]
+            order = child_counts[parent]
+            child_counts[parent] = order + 1
+            parents[row] = parent
+            depths[row] = len(stack)
+            paths[row] = f"{paths[parent]}.{order + 1}"
+        else:
+            order = top_level_count
+            top_level_count += 1
+            paths[row] = str(order + 1)
+        orders[row] = order
+        stack.append(row)
+
+    return OutlineIndex(
+        parent=np.array(parents, dtype=np.int64),
+        order=np.array(orders, dtype=np.int64),
+        depth=np.array(depths, dtype=np.int64),
+        level=levels,
+        end=np.array(ends, dtype=np.int64),
+        path=np.array(paths, dtype=str),
+    )
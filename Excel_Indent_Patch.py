@@ -0,0 +1,650 @@
+# Excel Indent Patch
+
+import dataclasses
+import datetime
+import html
+import os
+import posixpath
+import re
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import column_index_from_string, get_column_letter
+from openpyxl.utils.cell import range_boundaries
+from openpyxl.utils.datetime import to_excel
+
+MAX_EXCEL_INDENT = 255
+
+# The parts of a worksheet touched by a patch are located with these patterns and rewritten as text,
+# so the rest of the XML (and every namespace declaration it relies on) is copied byte for byte
+_ROW_PATTERN = re.compile(rb'<row\b[^>]*?\br="(\d+)"[^>]*?(?:/>|>.*?</row>)', re.S)
+_CELL_PATTERN = re.compile(rb'<c\b[^>]*?\br="([A-Z]+)(\d+)"[^>]*?(?:/>|>.*?</c>)', re.S)
+_OPEN_TAG_PATTERN = re.compile(rb'<(\w+)\b([^>]*?)(/?)>')
+_ATTRIBUTE_PATTERN = re.compile(rb'([\w:]+)="([^"]*)"')
+_XF_PATTERN = re.compile(rb'<xf\b[^>]*?(?:/>|>.*?</xf>)', re.S)
+_ALIGNMENT_PATTERN = re.compile(rb'<alignment\b([^>]*?)(?:/>|>\s*</alignment>)', re.S)
+_RELATIONSHIP_PATTERN = re.compile(rb'<Relationship\b[^>]*?/>')
+_SHARED_STRING_PATTERN = re.compile(rb'<si\b[^>]*?(?:/>|>(.*?)</si>)', re.S)
+_TEXT_PATTERN = re.compile(rb'<t\b[^>]*?(?:/>|>(.*?)</t>)', re.S)
+_PHONETIC_PATTERN = re.compile(rb'<rPh\b.*?</rPh>', re.S)
+_DIMENSION_PATTERN = re.compile(rb'<dimension\b[^>]*?\bref="[A-Z]+\d+:([A-Z]+)\d+"')
+_RANGE_PATTERN = re.compile(rb'(<(dimension|autoFilter)\b[^>]*?\bref=")([A-Z]+\d+(?::[A-Z]+\d+)?)"')
+_SHEET_PROPERTIES_PATTERN = re.compile(rb'<sheetPr\b[^>]*?(/?)>')
+_OUTLINE_PROPERTIES_PATTERN = re.compile(rb'<outlinePr\b([^>]*?)(/?)>')
+_TAB_COLOR_PATTERN = re.compile(rb'<tabColor\b[^>]*?(?:/>|>.*?</tabColor>)', re.S)
+_SHEET_FORMAT_PATTERN = re.compile(rb'<sheetFormatPr\b([^>]*?)/>')
+_ROOT_TAG_PATTERN = re.compile(rb'<(?![?!])([^\s/>]+)([^>]*)>')
+_MAIN_NAMESPACE = b'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+
+_UNCHANGED = object()
+
+def _attributes(tag_attributes):
+    """
+    Parses the attributes of an XML open tag into an ordered {name: value} dict of bytes.
+    """
+    return dict(_ATTRIBUTE_PATTERN.findall(tag_attributes))
+
+def _open_tag(name, attributes, self_closing=False):
+    text = b"<" + name + b"".join(b' ' + key + b'="' + value + b'"' for key, value in attributes.items())
+    return text + (b"/>" if self_closing else b">")
+
+def _unprefixed(xml):
+    """
+    Rewrites a part whose SpreadsheetML elements carry a namespace prefix (<x:sheetData>, as some
+    generators write them) to the default namespace that the patterns expect. The prefix stays declared,
+    so anything else that uses it keeps its meaning. Other parts are returned as they are.
+    """
+    root = _ROOT_TAG_PATTERN.search(xml) if xml else None
+    if root is None or b':' not in root.group(1):
+        return xml
+    prefix = root.group(1).split(b':')[0]
+    attributes = _attributes(root.group(2))
+    if attributes.get(b'xmlns:' + prefix) != _MAIN_NAMESPACE or b'xmlns' in attributes:
+        return xml
+    xml = re.sub(rb'<(/?)' + re.escape(prefix) + rb':', rb'<\1', xml)
+    at = root.start() + 1 + len(root.group(1)) - len(prefix) - 1
+    return xml[:at] + b' xmlns="' + _MAIN_NAMESPACE + b'"' + xml[at:]
+
+def _workbook_part(archive, relationship_type, index=0):
+    """
+    Resolves the zip path of the index-th workbook part of a relationship type ('worksheet', 'styles', ...).
+    Worksheets are numbered in workbook order rather than relationship order, and can also be looked up by name.
+    """
+    relationships = {}
+    for relationship in _RELATIONSHIP_PATTERN.findall(archive.read('xl/_rels/workbook.xml.rels')):
+        attributes = _attributes(relationship)
+        if attributes.get(b'Type', b'').endswith(b'/' + relationship_type):
+            target = attributes[b'Target'].decode('utf-8')
+            relationships[attributes[b'Id']] = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+
+    if relationship_type == b'worksheet':
+        sheets = [_attributes(sheet) for sheet in re.findall(rb'<sheet\b([^>]*)>', _unprefixed(archive.read('xl/workbook.xml')))]
+        if isinstance(index, str):
+            sheet_ids = [sheet.get(b'r:id') for sheet in sheets if html.unescape(sheet.get(b'name', b'').decode('utf-8')) == index]
+            if not sheet_ids or sheet_ids[0] not in relationships:
+                raise ValueError(f"The workbook has no worksheet '{index}'.")
+            return relationships[sheet_ids[0]]
+        if index >= len(sheets) or sheets[index].get(b'r:id') not in relationships:
+            raise ValueError(f"The workbook has no sheet {index + 1}.")
+        return relationships[sheets[index][b'r:id']]
+    if not relationships:
+        return None
+    return list(relationships.values())[index]
+
+class _CellFormats:
+    """
+    The <cellXfs> of styles.xml, extended with the indented copies of existing formats that a patch needs.
+    """
+    def __init__(self, styles_xml):
+        self.styles_xml = styles_xml
+        self.block = re.search(rb'<cellXfs\b[^>]*?(?:/>|>(.*?)</cellXfs>)', styles_xml, re.S)
+        if self.block is None:
+            raise ValueError("The workbook has no cell formats.")
+        self.formats = _XF_PATTERN.findall(self.block.group(1) or b'') or [b'<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>']
+        self.format_ids = {}
+        for format_id, cell_format in enumerate(self.formats):
+            self.format_ids.setdefault(cell_format, format_id)
+        self.initial_count = len(self.formats)
+        self._indented_ids = {}
+
+    def indented(self, style_id, level):
+        """
+        Returns the id of a format identical to style_id except for an indent of level, reusing an existing
+        format where there is one. As in the openpyxl writer, 'general' and 'center' cells become 'left' aligned.
+        """
+        key = (style_id, level)
+        if key in self._indented_ids:
+            return self._indented_ids[key]
+
+        base = self.formats[style_id] if style_id < len(self.formats) else self.formats[0]
+        tag = _OPEN_TAG_PATTERN.match(base)
+        attributes = _attributes(tag.group(2))
+        body = b'' if tag.group(3) else base[tag.end():-len(b'</xf>')]
+
+        alignment = _ALIGNMENT_PATTERN.search(body)
+        alignment_attributes = _attributes(alignment.group(1)) if alignment else {}
+        if alignment:
+            body = body[:alignment.start()] + body[alignment.end():]
+        if alignment_attributes.get(b'horizontal') not in (b'left', b'right', b'distributed'):
+            alignment_attributes[b'horizontal'] = b'left'
+        alignment_attributes[b'indent'] = str(min(level, MAX_EXCEL_INDENT)).encode()
+        attributes[b'applyAlignment'] = b'1'
+
+        # <alignment> comes first inside <xf>, before <protection>
+        cell_format = _open_tag(b'xf', attributes) + _open_tag(b'alignment', alignment_attributes, self_closing=True) + body + b'</xf>'
+        format_id = self.format_ids.get(cell_format)
+        if format_id is None:
+            format_id = len(self.formats)
+            self.formats.append(cell_format)
+            self.format_ids[cell_format] = format_id
+        self._indented_ids[key] = format_id
+        return format_id
+
+    def serialize(self):
+        block = b'<cellXfs count="' + str(len(self.formats)).encode() + b'">' + b''.join(self.formats) + b'</cellXfs>'
+        return self.styles_xml[:self.block.start()] + block + self.styles_xml[self.block.end():]
+
+@dataclasses.dataclass
+class SheetColumn:
+    """
+    One column of a worksheet as read by read_sheet_column.
+
+    Attributes:
+        values (list): The value of every data row, from the row below the header to the last used row.
+                       Empty cells are None.
+        column (int): The 1-based column number.
+        header_row (int): The 1-based row number of the header row.
+        headers (dict): {header text: column number} for every non-empty cell of the header row.
+        last_column (int): The last used column of the sheet, for appending new columns.
+    """
+    values: list
+    column: int
+    header_row: int
+    headers: dict
+    last_column: int
+
+def _text(content):
+    """
+    Returns the text of a shared or inline string, joining rich text runs and skipping phonetic hints.
+    """
+    if b'<rPh' in content:
+        content = _PHONETIC_PATTERN.sub(b'', content)
+    return html.unescape(b''.join(text or b'' for text in _TEXT_PATTERN.findall(content)).decode('utf-8'))
+
+class _SharedStrings:
+    """
+    The shared string table, split into items up front and decoded only when an item is looked up.
+    """
+    def __init__(self, shared_strings_xml):
+        shared_strings_xml = shared_strings_xml or b''
+        if b'<si/>' in shared_strings_xml:
+            self.items = _SHARED_STRING_PATTERN.findall(shared_strings_xml)
+        else:
+            self.items = shared_strings_xml.split(b'</si>')[:-1] # Much faster than a pattern on large tables
+        self.decoded = {}
+
+    def __getitem__(self, index):
+        text = self.decoded.get(index)
+        if text is None:
+            text = self.decoded[index] = _text(self.items[index] or b'')
+        return text
+
+def _cell_value(cell_xml, shared_strings):
+    """
+    Converts the XML of one <c> element to its value (str, int, float, bool or None). Like pandas, whole
+    numbers are returned as int; dates are returned as their serial numbers, since styles are not read.
+    """
+    tag = _OPEN_TAG_PATTERN.match(cell_xml)
+    if tag.group(3):
+        return None
+    content = cell_xml[tag.end():-len(b'</c>')]
+    cell_type = _attributes(tag.group(2)).get(b't', b'n')
+    if cell_type == b'inlineStr':
+        return _text(content)
+    value = re.search(rb'<v\b[^>]*>(.*?)</v>', content, re.S)
+    if value is None:
+        return None
+    value = value.group(1)
+    if cell_type == b's':
+        return shared_strings[int(value)]
+    if cell_type in (b'str', b'e'):
+        return html.unescape(value.decode('utf-8'))
+    if cell_type == b'b':
+        return value.strip() == b'1'
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+def read_sheet_column(source, header, sheet_index=0):
+    """
+    Reads one column of an .xlsx sheet, found by its header, without parsing any of the other cells.
+    Only the cells of that column are matched in the worksheet XML and only the shared strings they use
+    are decoded, so the cost barely grows with the number of other columns.
+
+    The header row is the first row with a value (blank rows above it are skipped), and as with pandas
+    the data rows run from the row below it to the last row with a value in any column.
+
+    Args:
+        source (str or file-like): The .xlsx workbook.
+        header (str): The header of the column to read.
+        sheet_index (int, optional): The 0-based position of the sheet. Defaults to 0.
+
+    Returns:
+        SheetColumn: The column's values and position.
+
+    Raises:
+        KeyError: If no header cell holds header.
+        ValueError: If the workbook has no such sheet.
+    """
+    with zipfile.ZipFile(source) as archive:
+        sheet_xml = _unprefixed(archive.read(_workbook_part(archive, b'worksheet', sheet_index)))
+        shared_strings_part = _workbook_part(archive, b'sharedStrings')
+        shared_strings = _SharedStrings(_unprefixed(archive.read(shared_strings_part)) if shared_strings_part else None)
+
+    start = sheet_xml.find(b'<sheetData')
+    end = sheet_xml.find(b'</sheetData>', start)
+    first_value = sheet_xml.find(b'</c>', start, end) if start != -1 and end != -1 else -1
+    if first_value == -1:
+        raise KeyError(header) # An empty sheet has no header row
+
+    # The header row is the row around the first cell with content
+    header_row_xml = _ROW_PATTERN.match(sheet_xml, sheet_xml.rfind(b'<row', start, first_value))
+    header_row = int(header_row_xml.group(1))
+    headers = {}
+    for cell in _CELL_PATTERN.finditer(header_row_xml.group(0)):
+        value = _cell_value(cell.group(0), shared_strings)
+        if value is not None:
+            headers.setdefault(str(value), column_index_from_string(cell.group(1).decode()))
+    if header not in headers:
+        raise KeyError(header)
+    column = headers[header]
+
+    last_value = sheet_xml.rfind(b'</c>', start, end)
+    last_row = int(_ROW_PATTERN.match(sheet_xml, sheet_xml.rfind(b'<row', start, last_value)).group(1))
+    dimension = _DIMENSION_PATTERN.search(sheet_xml, 0, start)
+    last_column = max([*headers.values(), column_index_from_string(dimension.group(1).decode()) if dimension else 0])
+
+    # The column's references are found by a literal search, then each cell is matched from its '<c'
+    values = [None] * (last_row - header_row)
+    reference_pattern = re.compile(rb' r="' + get_column_letter(column).encode() + rb'(\d+)"')
+    for reference in reference_pattern.finditer(sheet_xml, header_row_xml.end(), end):
+        offset = int(reference.group(1)) - header_row - 1
+        if 0 <= offset < len(values):
+            cell = _CELL_PATTERN.match(sheet_xml, sheet_xml.rfind(b'<c', 0, reference.start()))
+            if cell is not None:
+                values[offset] = _cell_value(cell.group(0), shared_strings)
+    return SheetColumn(values, column, header_row, headers, last_column)
+
+def _value_xml(value):
+    """
+    Returns the type attribute and the content of a <c> element holding value.
+    """
+    if value is None:
+        return None, b''
+    if isinstance(value, bool):
+        return b'b', b'<v>' + (b'1' if value else b'0') + b'</v>'
+    if isinstance(value, (int, float)):
+        if value != value or value in (float('inf'), float('-inf')):
+            return None, b'' # NaN and infinity are written as empty cells
+        return None, b'<v>' + repr(value).encode() + b'</v>'
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time, datetime.timedelta)):
+        # Dates are stored as serial numbers; the cell keeps its existing number format
+        return None, b'<v>' + repr(to_excel(value)).encode() + b'</v>'
+    text = ILLEGAL_CHARACTERS_RE.sub('', str(value))
+    return b'inlineStr', b'<is><t xml:space="preserve">' + escape(text).encode('utf-8') + b'</t></is>'
+
+def _patch_cell(reference, cell_xml, value, indent, style, cell_formats):
+    """
+    Builds the new XML of one cell. An unchanged value keeps the cell's content (formula included) and
+    only its style is replaced. style, if not None, is the cell format id (bytes) to give the cell.
+
+    Returns:
+        tuple: (cell XML, True if a formula was removed).
+    """
+    attributes = {}
+    content = b''
+    if cell_xml is not None:
+        tag = _OPEN_TAG_PATTERN.match(cell_xml)
+        attributes = _attributes(tag.group(2))
+        content = b'' if tag.group(3) else cell_xml[tag.end():-len(b'</c>')]
+    attributes[b'r'] = reference
+    if style is not None:
+        attributes[b's'] = style
+
+    if indent is not None:
+        attributes[b's'] = str(cell_formats.indented(int(attributes.get(b's', b'0')), indent)).encode()
+
+    removed_formula = False
+    if value is not _UNCHANGED:
+        formula = re.search(rb'<f\b([^>]*)', content)
+        if formula:
+            formula_attributes = _attributes(formula.group(1))
+            if formula_attributes.get(b't') == b'shared' and b'ref' in formula_attributes:
+                raise ValueError(f"Cell {reference.decode()} holds a shared formula used by other cells.")
+            removed_formula = True
+        cell_type, content = _value_xml(value)
+        attributes = {key: attribute for key, attribute in attributes.items() if key in (b'r', b's')}
+        if cell_type is not None:
+            attributes[b't'] = cell_type
+
+    if not content:
+        return _open_tag(b'c', attributes, self_closing=True), removed_formula
+    return _open_tag(b'c', attributes) + content + b'</c>', removed_formula
+
+def _find_cell(content, reference):
+    """
+    Returns the match of the cell with the given reference (e.g. b'B12') in a row's content, or None.
+    """
+    at = content.find(b' r="' + reference + b'"')
+    if at == -1:
+        return None
+    cell = _CELL_PATTERN.match(content, content.rfind(b'<c', 0, at))
+    return cell if cell is not None and cell.group(1) + cell.group(2) == reference else None
+
+def _patch_row(row_number, row_xml, cells, cell_formats, outline_level=None):
+    """
+    Patches the cells of one <row> (or builds the row if row_xml is None), and sets its outline level
+    (0 removes it) unless outline_level is None.
+
+    Returns:
+        tuple: (row XML, True if a formula was removed).
+    """
+    if row_xml is None:
+        row_xml = b'<row r="' + str(row_number).encode() + b'"/>'
+    tag = _OPEN_TAG_PATTERN.match(row_xml)
+    row_attributes = _attributes(tag.group(2))
+    content = b'' if tag.group(3) else row_xml[tag.end():-len(b'</row>')]
+
+    pending = sorted(cells.items())
+    pieces = []
+    position = 0
+    removed_formula = False
+    inserted = False
+
+    # Cells that take their format from another cell of the row, e.g. a new header next to existing ones
+    styles = {}
+    for column, (_, _, style_column) in pending:
+        if style_column is not None:
+            style_cell = _find_cell(content, f"{get_column_letter(style_column)}{row_number}".encode())
+            styles[column] = _attributes(_OPEN_TAG_PATTERN.match(style_cell.group(0)).group(2)).get(b's') if style_cell else None
+
+    # Cells to the right of the last one (e.g. an appended column) are found without walking the whole row
+    last_cell = _CELL_PATTERN.match(content, content.rfind(b'<c ')) if b'<c ' in content else None
+    if last_cell is None:
+        for last_cell in _CELL_PATTERN.finditer(content):
+            pass
+    last_column = column_index_from_string(last_cell.group(1).decode()) if last_cell else 0
+    appended = [item for item in pending if item[0] > last_column]
+    pending = pending[:len(pending) - len(appended)]
+
+    # Existing cells are looked up by reference; the row is only walked when a cell has to be inserted
+    located = [_find_cell(content, f"{get_column_letter(column)}{row_number}".encode()) for column, _ in pending]
+    cells_to_patch = located if all(located) else _CELL_PATTERN.finditer(content)
+
+    for cell in cells_to_patch:
+        if not pending:
+            break
+        column = column_index_from_string(cell.group(1).decode())
+        while pending and pending[0][0] < column:
+            # A new cell to the left of this one
+            new_column, (value, indent, _) = pending.pop(0)
+            cell_xml, _ = _patch_cell(f"{get_column_letter(new_column)}{row_number}".encode(), None, value, indent, styles.get(new_column), cell_formats)
+            pieces.append(content[position:cell.start()])
+            pieces.append(cell_xml)
+            position = cell.start()
+            inserted = True
+        if pending and pending[0][0] == column:
+            _, (value, indent, _) = pending.pop(0)
+            cell_xml, removed = _patch_cell(cell.group(1) + cell.group(2), cell.group(0), value, indent, styles.get(column), cell_formats)
+            removed_formula |= removed
+            pieces.append(content[position:cell.start()])
+            pieces.append(cell_xml)
+            position = cell.end()
+
+    # New cells to the right of the last one go before any trailing non-cell content (e.g. <extLst>)
+    last_cell_end = max(position, last_cell.end()) if last_cell else position
+    pieces.append(content[position:last_cell_end])
+    for new_column, (value, indent, _) in appended:
+        cell_xml, _ = _patch_cell(f"{get_column_letter(new_column)}{row_number}".encode(), None, value, indent, styles.get(new_column), cell_formats)
+        pieces.append(cell_xml)
+        inserted = True
+    pieces.append(content[last_cell_end:])
+
+    if inserted:
+        row_attributes.pop(b'spans', None) # Only a loading hint; dropped rather than recalculated
+    if outline_level:
+        row_attributes[b'outlineLevel'] = str(outline_level).encode()
+    elif outline_level is not None:
+        row_attributes.pop(b'outlineLevel', None)
+    return _open_tag(b'row', row_attributes) + b''.join(pieces) + b'</row>', removed_formula
+
+def _rows(body):
+    """
+    Yields (start, end, row number) for each <row> of a <sheetData> body. The rows are located with plain
+    searches, which on large sheets is many times faster than matching each row with a pattern.
+    """
+    start = body.find(b'<row')
+    while start != -1:
+        tag = _OPEN_TAG_PATTERN.match(body, start)
+        end = tag.end() if tag.group(3) else body.index(b'</row>', tag.end()) + len(b'</row>')
+        row_number = _attributes(tag.group(2)).get(b'r')
+        if row_number is None:
+            raise ValueError("The worksheet has rows without row numbers.")
+        yield start, end, int(row_number)
+        start = body.find(b'<row', end)
+
+def _widened_range(match, rows, last_row=None):
+    """
+    Returns the new text of a <dimension> or <autoFilter> element matched by _RANGE_PATTERN. The dimension
+    grows to cover every patched cell. A filter grows to take in new values written on its header row just
+    to the right of it, such as the header of an appended column. Both are cut back to last_row if given.
+    """
+    min_column, min_row, max_column, max_row = range_boundaries(match.group(3).decode())
+    if last_row is not None:
+        max_row = max(min_row, min(max_row, last_row))
+    if match.group(2) == b'dimension':
+        if rows:
+            max_row = max(max_row, max(rows))
+            max_column = max(max_column, max(column for cells in rows.values() for column in cells))
+    else:
+        header = rows.get(min_row, {})
+        while header.get(max_column + 1, (_UNCHANGED,))[0] not in (_UNCHANGED, None):
+            max_column += 1
+    reference = f"{get_column_letter(min_column)}{min_row}:{get_column_letter(max_column)}{max_row}"
+    return match.group(1) + reference.encode() + b'"'
+
+def _with_outline_properties(head, max_level):
+    """
+    Sets the sheet-wide row grouping settings in the part of a worksheet's XML before <sheetData>: the
+    summary rows (headings) sit above their details, and the outline buttons go up to max_level.
+    """
+    # <sheetPr> is the first child of <worksheet>, with <outlinePr> after an optional <tabColor>
+    properties = _SHEET_PROPERTIES_PATTERN.search(head)
+    if properties is None:
+        worksheet = re.search(rb'<worksheet\b[^>]*>', head)
+        head = head[:worksheet.end()] + b'<sheetPr><outlinePr summaryBelow="0"/></sheetPr>' + head[worksheet.end():]
+    elif properties.group(1):
+        head = head[:properties.start()] + properties.group(0)[:-2] + b'><outlinePr summaryBelow="0"/></sheetPr>' + head[properties.end():]
+    else:
+        end = head.index(b'</sheetPr>', properties.end())
+        outline = _OUTLINE_PROPERTIES_PATTERN.search(head, properties.end(), end)
+        if outline is not None:
+            attributes = _attributes(outline.group(1))
+            attributes[b'summaryBelow'] = b'0'
+            head = head[:outline.start()] + _open_tag(b'outlinePr', attributes, bool(outline.group(2))) + head[outline.end():]
+        else:
+            tab_color = _TAB_COLOR_PATTERN.search(head, properties.end(), end)
+            at = tab_color.end() if tab_color is not None else properties.end()
+            head = head[:at] + b'<outlinePr summaryBelow="0"/>' + head[at:]
+
+    # <sheetFormatPr> comes right before <cols> and <sheetData>
+    format_properties = _SHEET_FORMAT_PATTERN.search(head)
+    if format_properties is not None:
+        attributes = _attributes(format_properties.group(1))
+        if max_level:
+            attributes[b'outlineLevelRow'] = str(max_level).encode()
+        else:
+            attributes.pop(b'outlineLevelRow', None)
+        head = head[:format_properties.start()] + _open_tag(b'sheetFormatPr', attributes, True) + head[format_properties.end():]
+    elif max_level:
+        columns = head.find(b'<cols')
+        at = columns if columns != -1 else head.rindex(b'<sheetData')
+        head = head[:at] + b'<sheetFormatPr defaultRowHeight="15" outlineLevelRow="' + str(max_level).encode() + b'"/>' + head[at:]
+    return head
+
+def _truncated_rows(body, last_row):
+    """
+    Returns a <sheetData> body without its rows below last_row. The rows are searched from the end,
+    so the cost follows the number of rows removed.
+    """
+    end = len(body)
+    start = body.rfind(b'<row', 0, end)
+    while start != -1:
+        tag = _OPEN_TAG_PATTERN.match(body, start)
+        if tag.group(1) == b'row' and int(_attributes(tag.group(2)).get(b'r', b'0')) <= last_row:
+            break
+        end = start
+        start = body.rfind(b'<row', 0, end)
+    return body[:end] if start != -1 else b''
+
+def _patch_sheet(sheet_xml, rows, cell_formats, outline_levels=None, last_row=None):
+    """
+    Patches the given {row: {column: (value, indent, style column)}} into a worksheet's XML, sets
+    the outline level of the rows in {row: level} outline_levels, grouping them, and removes the rows
+    below last_row if given.
+
+    Returns:
+        tuple: (sheet XML, True if a formula was removed).
+    """
+    start = sheet_xml.find(b'<sheetData')
+    if start == -1:
+        raise ValueError("The worksheet has no <sheetData> element.")
+    open_end = sheet_xml.index(b'>', start) + 1
+    if sheet_xml[open_end - 2:open_end] == b'/>':
+        head, body, tail = sheet_xml[:start] + b'<sheetData>', b'', b'</sheetData>' + sheet_xml[open_end:]
+    else:
+        end = sheet_xml.index(b'</sheetData>', open_end)
+        head, body, tail = sheet_xml[:open_end], sheet_xml[open_end:end], sheet_xml[end:]
+    if last_row is not None:
+        body = _truncated_rows(body, last_row)
+
+    outline_levels = outline_levels or {}
+    pending = sorted(set(rows) | set(outline_levels))
+    pieces = []
+    position = 0
+    removed_formula = False
+    for row_start, row_end, row_number in _rows(body):
+        if not pending:
+            break
+        while pending and pending[0] < row_number:
+            # A row that had no cells in the source
+            row_xml, _ = _patch_row(pending[0], None, rows.get(pending[0], {}), cell_formats, outline_levels.get(pending[0]))
+            pieces.append(body[position:row_start])
+            pieces.append(row_xml)
+            position = row_start
+            pending.pop(0)
+        if pending and pending[0] == row_number:
+            row_xml, removed = _patch_row(row_number, body[row_start:row_end], rows.get(row_number, {}), cell_formats, outline_levels.get(row_number))
+            removed_formula |= removed
+            pieces.append(body[position:row_start])
+            pieces.append(row_xml)
+            position = row_end
+            pending.pop(0)
+    pieces.append(body[position:])
+    for row_number in pending:
+        pieces.append(_patch_row(row_number, None, rows.get(row_number, {}), cell_formats, outline_levels.get(row_number))[0])
+    if rows or last_row is not None:
+        head = _RANGE_PATTERN.sub(lambda match: _widened_range(match, rows, last_row), head)
+        tail = _RANGE_PATTERN.sub(lambda match: _widened_range(match, rows, last_row), tail)
+    if outline_levels:
+        head = _with_outline_properties(head, max(outline_levels.values()))
+    return head + b''.join(pieces) + tail, removed_formula
+
+def _without_calculation_chain(parts):
+    """
+    Drops xl/calcChain.xml and its references. Excel rebuilds the chain on load, whereas a chain that
+    lists a cell whose formula was overwritten makes it report the file as damaged.
+    """
+    parts.pop('xl/calcChain.xml', None)
+    parts['[Content_Types].xml'] = re.sub(rb'<Override\b[^>]*?PartName="/xl/calcChain.xml"[^>]*?/>', b'', parts['[Content_Types].xml'])
+    parts['xl/_rels/workbook.xml.rels'] = re.sub(rb'<Relationship\b[^>]*?/calcChain"[^>]*?/>', b'', parts['xl/_rels/workbook.xml.rels'])
+
+def patch_workbook(source, destination, values=None, indents=None, sheet_index=0, styles=None, outline_levels=None, last_row=None):
+    """
+    Copies an .xlsx workbook and rewrites only the given cells of one sheet, leaving every other part of
+    the file (other cells, styles, column widths, filters, formulas, other sheets) exactly as it was.
+    The cost grows with the number of patched cells, not with the number of cells in the sheet.
+
+    New values are written as inline strings or numbers. Indents are applied by giving the cell a copy of
+    its cell format with Excel's alignment indent set, so the value and the rest of its formatting stay.
+    The sheet's dimension, and an autofilter whose header row gains a column on its right, are widened
+    to the new cells.
+
+    Args:
+        source (str): The .xlsx file to copy.
+        destination (str): Where to write the patched copy. May be the same path as source; the file is only
+                           replaced once the new copy has been written completely.
+        values (dict, optional): {(row, column): value} with 1-based row and column numbers. None empties the cell.
+        indents (dict, optional): {(row, column): indent level} to set the alignment indent of cells.
+        sheet_index (int or str, optional): The 0-based position or the name of the sheet to patch. Defaults to 0.
+        styles (dict, optional): {(row, column): other column} to give cells the format of the cell in another
+                                 column of the same row, e.g. a new header cell the format of its neighbour.
+        outline_levels (dict, optional): {row: outline level} to group rows (0 ungroups a row). The sheet is
+                                         set to show each group's summary row above its details.
+        last_row (int, optional): Remove the rows below this 1-based row, e.g. after rows were deleted from a table.
+
+    Raises:
+        ValueError: If the workbook cannot be patched in place, e.g. a patched cell holds a shared formula.
+    """
+    patch_sheets(source, destination, {sheet_index: (values, indents, styles, outline_levels, last_row)})
+
+def patch_sheets(source, destination, patches):
+    """
+    Patches several sheets of a workbook in one copy, as patch_workbook does for one.
+
+    Args:
+        source (str): The .xlsx file to copy.
+        destination (str): Where to write the patched copy, as for patch_workbook.
+        patches (dict): {sheet index or name: (values, indents, styles, outline_levels, last_row)}, each as for patch_workbook (or None).
+    """
+    with zipfile.ZipFile(source) as archive:
+        infos = archive.infolist()
+        parts = {info.filename: archive.read(info.filename) for info in infos}
+        sheet_parts = {sheet: _workbook_part(archive, b'worksheet', sheet) for sheet in patches}
+        styles_part = _workbook_part(archive, b'styles')
+    for part in set(sheet_parts.values()) | {styles_part}:
+        parts[part] = _unprefixed(parts[part])
+
+    cell_formats = _CellFormats(parts[styles_part]) if any(patch[1] for patch in patches.values()) else None
+    removed_formula = False
+    for sheet, (values, indents, styles, outline_levels, last_row) in patches.items():
+        rows = {}
+        for (row, column), value in (values or {}).items():
+            rows.setdefault(row, {})[column] = (value, None, None)
+        for (row, column), level in (indents or {}).items():
+            value, _, _ = rows.setdefault(row, {}).get(column, (_UNCHANGED, None, None))
+            rows[row][column] = (value, int(level), None)
+        for (row, column), style_column in (styles or {}).items():
+            value, indent, _ = rows.setdefault(row, {}).get(column, (_UNCHANGED, None, None))
+            rows[row][column] = (value, indent, style_column)
+        parts[sheet_parts[sheet]], removed = _patch_sheet(parts[sheet_parts[sheet]], rows, cell_formats, outline_levels, last_row)
+        removed_formula |= removed
+    if cell_formats is not None and len(cell_formats.formats) != cell_formats.initial_count:
+        parts[styles_part] = cell_formats.serialize()
+    if removed_formula and 'xl/calcChain.xml' in parts:
+        _without_calculation_chain(parts)
+
+    handle, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(destination)), suffix='.xlsx.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as temporary_file, zipfile.ZipFile(temporary_file, 'w', zipfile.ZIP_DEFLATED) as patched:
+            for info in infos:
+                if info.filename in parts:
+                    patched_info = zipfile.ZipInfo(info.filename, info.date_time)
+                    patched_info.compress_type = info.compress_type
+                    patched_info.external_attr = info.external_attr
+                    patched.writestr(patched_info, parts[info.filename])
+        os.replace(temporary_path, destination)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
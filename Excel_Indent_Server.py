@@ -0,0 +1,418 @@
+# Excel Indent Server
+
+import argparse
+import collections
+import concurrent.futures
+import email.parser
+import email.policy
+import functools
+import http.server
+import io
+import json
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures.process import BrokenProcessPool
+import Excel_Indent_Functions as functions
+from Excel_Indent_Numbering import HeadingNumbering
+
+DEFAULT_HOST = '127.0.0.1' # Local only: the server has no authentication
+DEFAULT_PORT = 8765
+DEFAULT_MAX_UPLOAD_MB = 200
+LATENCY_WINDOW = 1000 # The most recent requests the latency percentiles are taken over
+REQUEST_TIMEOUT = 60 # Seconds a connection may stall while sending a request or receiving a response
+
+CONTENT_TYPES = {
+    'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv; charset=utf-8',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+}
+
+def _warm_worker():
+    """
+    Runs once in each pool process as it starts: indents a tiny in-memory workbook so that pandas, openpyxl,
+    the installed reader and writer, and everything they import lazily are loaded before the first request.
+    """
+    import pandas as pd
+    workbook = io.BytesIO()
+    pd.DataFrame({'Heading': ['1 Warm-up', 'Text']}).to_excel(workbook, index=False)
+    functions.indent_excel(io.BytesIO(workbook.getvalue()), 'Heading', destination=io.BytesIO())
+
+def _indent_upload(data, options):
+    """
+    Indents one uploaded file in a pool process, entirely in memory.
+
+    Returns:
+        tuple: (the indented file's bytes, or None on failure, ProcessingResult.to_dict()).
+    """
+    destination = io.BytesIO()
+    result = functions.indent_excel(io.BytesIO(data), destination=destination, **options)
+    return (destination.getvalue() if result.success else None), result.to_dict()
+
+@functools.lru_cache(maxsize=32)
+def _numbering(config):
+    """
+    Builds the numbering of a request: a comma-separated list of built-in grammar names, or the grammars as
+    inline JSON (e.g. '["decimal", {"name": "req", "prefix": "REQ-"}]'). Unlike HeadingNumbering.from_config,
+    it never opens a file and a grammar's prefix is matched as plain text rather than as a regular expression,
+    since the value comes from the client and a crafted pattern could keep a worker busy for hours. Requests
+    that name the same grammars share one compiled HeadingNumbering.
+    """
+    config = config.strip()
+    if config.startswith('['):
+        try:
+            grammars = json.loads(config)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid numbering JSON: {e}") from None
+        if not isinstance(grammars, list):
+            raise ValueError("The numbering must be a JSON list of grammars.")
+    else:
+        grammars = [name.strip() for name in config.split(',') if name.strip()]
+    return HeadingNumbering([{**grammar, 'prefix': re.escape(grammar['prefix'])} if isinstance(grammar, dict) and isinstance(grammar.get('prefix'), str) else grammar
+                             for grammar in grammars])
+
+class ServerStats:
+    """
+    Thread-safe request counters, throughput and latency for the /stats endpoint.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.rows = 0
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._processing = collections.deque(maxlen=LATENCY_WINDOW)
+
+    def start(self, bytes_in):
+        with self._lock:
+            self.in_flight += 1
+            self.bytes_in += bytes_in
+
+    def finish(self, succeeded, seconds, processing_seconds=None, bytes_out=0, rows=0):
+        with self._lock:
+            self.in_flight -= 1
+            if succeeded:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            self.bytes_out += bytes_out
+            self.rows += rows
+            self._latencies.append(seconds)
+            if processing_seconds is not None:
+                self._processing.append(processing_seconds)
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    @staticmethod
+    def _summary(samples):
+        if not samples:
+            return {'count': 0, 'mean': None, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+        ordered = sorted(samples)
+        def percentile(fraction):
+            return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+        return {'count': len(ordered), 'mean': sum(ordered) / len(ordered) * 1000, 'p50': percentile(0.50), 'p95': percentile(0.95),
+                'p99': percentile(0.99), 'max': ordered[-1] * 1000}
+
+    def to_dict(self, **extra):
+        with self._lock:
+            uptime = time.time() - self.started
+            completed = self.succeeded + self.failed
+            return {
+                **extra,
+                'uptime_seconds': uptime,
+                'in_flight': self.in_flight,
+                'requests': {'total': completed + self.rejected + self.in_flight, 'succeeded': self.succeeded, 'failed': self.failed, 'rejected': self.rejected},
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'rows': self.rows,
+                'throughput': {'requests_per_second': completed / uptime if uptime else None, 'rows_per_second': self.rows / uptime if uptime else None},
+                # Latency is the whole request as the server saw it, queueing included; processing is the pipeline run alone
+                'latency_ms': self._summary(self._latencies),
+                'processing_ms': self._summary(self._processing),
+            }
+
+class _RequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # Keep-alive, so clients can send many files over one connection
+    server_version = 'ExcelIndentServer'
+    timeout = REQUEST_TIMEOUT # A client that stops sending mid-upload is dropped instead of holding its thread forever
+
+    def log_message(self, format, *args):
+        if not self.server.indent_server.quiet:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, content_type='application/json', headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message, headers=None, close=False):
+        # A request body that was not read would be parsed as the next request, so the connection is closed
+        self.close_connection = self.close_connection or close
+        self._send(status, {'error': message}, headers=headers)
+
+    def do_GET(self):
+        path = urllib.parse.urlsplit(self.path).path
+        indent_server = self.server.indent_server
+        if path == '/health':
+            self._send(200, {'status': 'ok'})
+        elif path == '/stats':
+            self._send(200, indent_server.stats.to_dict(workers=indent_server.workers, queue_size=indent_server.queue_size))
+        else:
+            self._error(404, "Not found. POST a file to /indent, or GET /stats or /health.")
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != '/indent':
+            self._error(404, "Not found. POST a file to /indent.", close=True)
+            return
+        indent_server = self.server.indent_server
+
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked' or self.headers.get('Content-Length') is None:
+            self._error(411, "A Content-Length is required.", close=True)
+            return
+        try:
+            length = int(self.headers['Content-Length'])
+            if length < 0:
+                raise ValueError(length) # rfile.read(-1) would wait for the client to close the connection
+        except ValueError:
+            self._error(400, "Invalid Content-Length.", close=True)
+            return
+        if length > indent_server.max_upload_bytes:
+            self._error(413, f"Uploads are limited to {indent_server.max_upload_bytes // (1024 * 1024)} MB.", close=True)
+            return
+        try:
+            options, file_name = self._options(urllib.parse.parse_qs(url.query))
+        except (ValueError, TypeError) as e:
+            self._error(400, str(e), close=True)
+            return
+
+        # The body is read before a slot is taken, so a slow or stalled upload never holds one
+        start = time.perf_counter()
+        try:
+            data = self.rfile.read(length)
+        except OSError: # Including the socket timeout
+            data = b''
+        if len(data) < length:
+            self.close_connection = True # The client went away or stalled; there is no one to answer
+            return
+
+        # Backpressure: once every worker is busy and the queue is full, new requests are turned away at once
+        if not indent_server.slots.acquire(blocking=False):
+            indent_server.stats.reject()
+            self._error(503, "The server is busy; retry shortly.", headers={'Retry-After': '1'})
+            return
+        indent_server.stats.start(length)
+        succeeded, processing_seconds, bytes_out, rows = False, None, 0, 0
+        try:
+            data, upload_name = self._upload(data)
+            file_name = file_name or upload_name
+            if file_name and 'input_format' not in options:
+                options['input_format'] = functions.detect_format(file_name)
+            output, result = indent_server.submit(data, options)
+            processing_seconds = result['total_seconds']
+            rows = next((phase['rows'] for phase in result['phases'] if phase['name'] == 'read'), 0)
+            if output is None:
+                self._send(422, {'error': "The file could not be indented.", 'messages': result['messages']})
+                return
+            output_format = options.get('output_format') or options.get('input_format') or 'excel'
+            download_name = functions._derive_file_name(os.path.basename(file_name or 'upload.xlsx'), "_indented")
+            download_name = os.path.splitext(download_name)[0] + functions.FORMAT_DEFAULT_EXTENSIONS[output_format]
+            self._send(200, output, CONTENT_TYPES[output_format], headers={
+                'Content-Disposition': f'attachment; filename="{download_name.replace(chr(34), "")}"',
+                'X-Processing-Seconds': f"{processing_seconds:.4f}",
+                'X-Indent-Messages': json.dumps(result['messages']), # ASCII-only JSON, safe in a header
+            })
+            succeeded, bytes_out = True, len(output)
+        except ValueError as e:
+            self._error(400, str(e))
+        except BrokenProcessPool:
+            self._error(500, "A worker process failed; the pool has been restarted.")
+        except Exception as e:
+            self._error(500, f"Unexpected failure while processing: {e}")
+        finally:
+            indent_server.slots.release()
+            indent_server.stats.finish(succeeded, time.perf_counter() - start, processing_seconds, bytes_out, rows)
+
+    def _options(self, query):
+        """
+        Maps the query string onto indent_excel options, e.g. ?heading_column=Title&mode=alignment&numbering=decimal,alpha.
+        """
+        def single(name, default=None, choices=None):
+            value = query.get(name, [default])[-1]
+            if choices is not None and value is not None and value not in choices:
+                raise ValueError(f"Invalid {name} '{value}'. Expected one of: {', '.join(choices)}.")
+            return value
+
+        options = {
+            'heading_column': single('heading_column', 'Heading'),
+            'mode': single('mode', 'spaces', functions.INDENT_MODES),
+            'engine': single('engine', 'vectorized', tuple(functions.INDENT_ENGINES)),
+            'reader': single('reader', 'auto', functions.READERS),
+            # The patch writer needs the source as a file, which an upload never is
+            'writer': single('writer', 'auto', tuple(writer for writer in functions.WRITERS if writer != 'patch')),
+            'group_rows': single('group_rows', '0', ('0', '1', 'false', 'true')) in ('1', 'true'),
+        }
+        for name in ('input_format', 'output_format'):
+            if single(name) is not None:
+                options[name] = single(name, choices=functions.TABLE_FORMATS)
+        if single('numbering'):
+            options['numbering'] = _numbering(single('numbering'))
+        return options, single('filename')
+
+    def _upload(self, data):
+        """
+        Returns (file bytes, file name or None) from a request body that is either the raw file or a
+        multipart/form-data form (e.g. curl -F file=@export.xlsx) with the file as its first file field.
+        """
+        content_type = self.headers.get('Content-Type', '')
+        if not content_type.lower().startswith('multipart/form-data'):
+            return data, None
+        form = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + data)
+        for part in form.iter_parts():
+            if part.get_filename() is not None:
+                return part.get_payload(decode=True), part.get_filename()
+        raise ValueError("The form has no file field.")
+
+class IndentServer:
+    """
+    A local HTTP service that indents uploaded files with indent_excel, for tools that want indented exports
+    on demand without starting the CLI (and paying for the pandas and openpyxl imports) every time.
+
+    Files are processed by a pool of worker processes that are started and warmed up before the server
+    accepts requests. At most workers + queue_size requests are accepted at a time; beyond that the server
+    answers 503 with Retry-After straight away instead of letting work pile up. Uploads and results stay in
+    memory, so nothing is written to disk.
+
+    Endpoints:
+        POST /indent: The file, as the raw request body or as a multipart/form-data file field. indent_excel
+                      options go in the query string: heading_column, mode, engine, reader, writer, group_rows,
+                      numbering (built-in names or inline JSON with literal prefixes), input_format, output_format and filename. Returns the indented file (200),
+                      or the pipeline's messages as JSON when it fails (422).
+        GET /stats: Request counts, bytes, rows, throughput, and latency and processing-time percentiles in ms.
+        GET /health: {"status": "ok"}.
+
+    Args:
+        host (str, optional): The interface to listen on. Defaults to 127.0.0.1.
+        port (int, optional): The port to listen on; 0 picks a free one (see .port). Defaults to 8765.
+        workers (int, optional): Worker processes. Defaults to the number of CPUs.
+        queue_size (int, optional): Requests that may wait for a worker. Defaults to twice the workers.
+        max_upload_bytes (int, optional): The largest accepted upload. Defaults to 200 MB.
+        quiet (bool, optional): Do not log each request to stderr. Defaults to False.
+    """
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, queue_size=None, max_upload_bytes=DEFAULT_MAX_UPLOAD_MB * 1024 * 1024, quiet=False):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.queue_size = self.workers * 2 if queue_size is None else max(0, queue_size)
+        self.max_upload_bytes = max_upload_bytes
+        self.quiet = quiet
+        self.stats = ServerStats()
+        self.slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._pool_lock = threading.Lock()
+        self._executor = self._start_pool()
+        self._http = http.server.ThreadingHTTPServer((host, port), _RequestHandler)
+        self._http.indent_server = self
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._http.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://{self._http.server_address[0]}:{self.port}"
+
+    def _start_pool(self):
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        # Processes start on demand, so one task per worker starts them all now; each warms up before its task runs
+        for future in [executor.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+        return executor
+
+    def submit(self, data, options):
+        """
+        Runs _indent_upload on the pool and waits for it. A pool broken by a crashed worker is replaced
+        before the error is passed on, so the next request gets a working pool.
+        """
+        executor = self._executor
+        try:
+            return executor.submit(_indent_upload, data, options).result()
+        except BrokenProcessPool:
+            with self._pool_lock:
+                if self._executor is executor:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = self._start_pool()
+            raise
+
+    def serve_forever(self):
+        self._http.serve_forever()
+
+    def start(self):
+        """
+        Serves on a background thread, e.g. for tests; call shutdown() to stop.
+        """
+        self._thread = threading.Thread(target=self._http.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._http.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._http.server_close()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        return False
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="Excel_Indent_Server",
+        description="Serve indent_excel over HTTP on this machine: POST a file to /indent and get the indented file back.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"The interface to listen on (default: {DEFAULT_HOST}; the server has no authentication).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"The port to listen on (default: {DEFAULT_PORT}).")
+    parser.add_argument("-j", "--workers", type=int, help="Worker processes, started and warmed up before serving (default: number of CPUs).")
+    parser.add_argument("--queue-size", type=int, help="Requests that may wait for a free worker before new ones get 503 (default: twice the workers).")
+    parser.add_argument("--max-upload-mb", type=int, default=DEFAULT_MAX_UPLOAD_MB, help=f"The largest accepted upload (default: {DEFAULT_MAX_UPLOAD_MB}).")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Do not log each request.")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    server = IndentServer(args.host, args.port, args.workers, args.queue_size, args.max_upload_mb * 1024 * 1024, args.quiet)
+    print(f"Serving on {server.url} with {server.workers} worker(s) and a queue of {server.queue_size}. "
+          f"POST files to {server.url}/indent; counters at {server.url}/stats. Press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support() # Lets a packaged .exe start the worker processes
+    sys.exit(main())
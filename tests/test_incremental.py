@@ -0,0 +1,63 @@
+# Excel Indent incremental run tests
+
+import openpyxl
+import pandas as pd
+import pytest
+from Excel_Indent_Functions import incremental_indent_excel, indent_excel
+
+ROWS = 400
+
+def _base():
+    headings = ['1 Scope', '1.1 Purpose', 'Text', '1.1.1 Detail', 'Note', '2 Next', '2.1 More', 'Text']
+    return pd.DataFrame({'Heading': [f"{headings[row % len(headings)]} {row}" for row in range(ROWS)], 'Value': range(ROWS)})
+
+def _insert(df, position, headings):
+    rows = pd.DataFrame({'Heading': headings, 'Value': [-1] * len(headings)})
+    return pd.concat([df.iloc[:position], rows, df.iloc[position:]], ignore_index=True)
+
+def _edit(df, position, heading):
+    df = df.copy()
+    df.loc[position, 'Heading'] = heading
+    return df
+
+def _swap(df, first, second):
+    order = list(range(len(df)))
+    order[first], order[second] = second, first
+    return df.iloc[order].reset_index(drop=True)
+
+CHANGES = {
+    'unchanged': lambda df: df,
+    'edit': lambda df: _edit(df, 385, '9.9.9 Edited'),
+    'edit_inherited': lambda df: _edit(df, 384, '3 Renumbered'), # The unnumbered rows after it follow its new level
+    'insert': lambda df: _insert(df, 380, ['3 New', 'Child text']),
+    'delete': lambda df: df.drop(index=[390]).reset_index(drop=True),
+    'delete_numbered': lambda df: df.drop(index=[376]).reset_index(drop=True),
+    'append': lambda df: _insert(df, len(df), ['4 Tail', 'More text']),
+    'truncate': lambda df: df.iloc[:-5],
+    'swap': lambda df: _swap(df, 360, 370),
+}
+
+def _run(df, path, mode):
+    df.to_excel(path / 'source.xlsx', index=False)
+    result = incremental_indent_excel(str(path / 'source.xlsx'), destination=str(path / 'incremental.xlsx'), mode=mode)
+    assert result.success, result.messages
+    return [message for message in result.messages if message.startswith('Incremental')]
+
+@pytest.mark.parametrize('mode', ['spaces', 'alignment'])
+@pytest.mark.parametrize('change', CHANGES)
+def test_matches_full_run(tmp_path, mode, change):
+    assert _run(_base(), tmp_path, mode) == ['Incremental: full run (no previous index).']
+    messages = _run(CHANGES[change](_base()), tmp_path, mode)
+    assert len(messages) == 1 and not messages[0].startswith('Incremental: full run'), messages
+
+    full = indent_excel(str(tmp_path / 'source.xlsx'), destination=str(tmp_path / 'full.xlsx'), mode=mode, writer='openpyxl')
+    assert full.success, full.messages
+    pd.testing.assert_frame_equal(pd.read_excel(tmp_path / 'incremental.xlsx'), pd.read_excel(tmp_path / 'full.xlsx'))
+    incremental_sheet, full_sheet = (openpyxl.load_workbook(tmp_path / name).active for name in ('incremental.xlsx', 'full.xlsx'))
+    assert incremental_sheet.max_row == full_sheet.max_row
+    if mode == 'alignment':
+        assert [cell.alignment.indent for cell in incremental_sheet['A'][1:]] == [cell.alignment.indent for cell in full_sheet['A'][1:]]
+
+def test_large_change_runs_in_full(tmp_path):
+    _run(_base(), tmp_path, 'spaces')
+    assert _run(_insert(_base(), 0, ['0 Top']), tmp_path, 'spaces')[0].startswith('Incremental: full run')
@@ -0,0 +1,69 @@
+# Excel Indent level engine tests
+
+import random
+import re
+import numpy as np
+import pandas as pd
+import pytest
+from Excel_Indent_Functions import INDENT_ENGINES, _calculate_indent_levels
+
+def _baseline_levels(heading_series):
+    # The row loop of the original calculate_indents_and_save_new_excel, kept here as the reference
+    calculated_indents = []
+    last_numbered_heading_indent = -1
+    full_numeric_prefix_pattern = re.compile(r'^(\d+(\.\d+)*)')
+    for value in heading_series:
+        heading = str(value).strip()
+        full_numeric_prefix_match = full_numeric_prefix_pattern.match(heading)
+        if full_numeric_prefix_match:
+            current_indent = full_numeric_prefix_match.group(1).count('.')
+            last_numbered_heading_indent = current_indent
+            calculated_indents.append(current_indent)
+        elif last_numbered_heading_indent == -1:
+            calculated_indents.append(0)
+        else:
+            calculated_indents.append(last_numbered_heading_indent + 1)
+    return calculated_indents
+
+CASES = {
+    'plain': pd.Series(['Intro', '1 Scope', '1.1 Purpose', 'Text', '1.1.1 Detail', '2 Next', 'More text']),
+    'nan': pd.Series([np.nan, '1 A', None, '1.2 B', np.nan, pd.NA], dtype=object),
+    'floats': pd.Series([1.0, 1.1, 2.25, np.nan, 3.0, 10.5]),
+    'bools': pd.Series([True, '1 A', False, '2.1 B', True], dtype=object),
+    'whitespace': pd.Series(['  1 A', '\t1.1 B', ' \n 1.1.1 C', '   text', ' 1.2 D']),
+    'unicode_digits': pd.Series(['١ Arabic', '١.٢ Arabic', '１.２.３ Fullwidth', '² Superscript', 'Text']),
+    'trailing_dots': pd.Series(['1.', '1..2', '1.2.', '.1', '1.a', '1.2.3.4.5.6.7.8.9.10']),
+    'ints': pd.Series([1, 2, 3, 10, 0]),
+    'empty': pd.Series([], dtype=object),
+    'index': pd.Series(['1 A', 'x', '1.1 B', 'y', '2 C'], index=[10, 3, 99, -1, 7]),
+    'string_index': pd.Series(['x', '3.2.1 C', 'y'], index=['a', 'b', 'c']),
+}
+
+@pytest.mark.parametrize('case', CASES)
+def test_engines_match(case):
+    heading_series = CASES[case]
+    levels = {engine: _calculate_indent_levels(heading_series, engine) for engine in INDENT_ENGINES}
+    for engine_levels in levels.values():
+        assert engine_levels.dtype == np.int64
+        assert engine_levels.tolist() == levels['loop'].tolist()
+
+@pytest.mark.parametrize('case', CASES)
+def test_engines_match_baseline(case):
+    heading_series = CASES[case]
+    for engine in INDENT_ENGINES:
+        assert _calculate_indent_levels(heading_series, engine).tolist() == _baseline_levels(heading_series)
+
+def test_engines_match_random_headings():
+    rng = random.Random(20261017)
+    pieces = ['', ' ', '\t', '1', '2', '12', '.', '..', 'a', 'A', 'Title', '٣', '-', '  ']
+    values = [''.join(rng.choice(pieces) for _ in range(rng.randint(0, 6))) for _ in range(3000)]
+    values += [np.nan, None, 1.5, 7, True] * 20
+    rng.shuffle(values)
+    heading_series = pd.Series(values, dtype=object, index=rng.sample(range(10 ** 6), len(values)))
+    expected = _baseline_levels(heading_series)
+    for engine in INDENT_ENGINES:
+        assert _calculate_indent_levels(heading_series, engine).tolist() == expected
+
+def test_unknown_engine():
+    with pytest.raises(ValueError, match='Unknown indent engine'):
+        _calculate_indent_levels(pd.Series(['1 A']), 'turbo')
@@ -0,0 +1,8 @@
+# Excel Indent reader/writer parity tests
+
+from Excel_Indent_Benchmark import check_io_parity
+
+def test_readers_and_writers_match(tmp_path):
+    # Every installed reader and writer, in both modes, against openpyxl/openpyxl
+    lines = []
+    assert check_io_parity(rows=300, workdir=str(tmp_path), log=lines.append), "\n".join(lines)
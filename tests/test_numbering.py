@@ -0,0 +1,74 @@
+# Excel Indent heading numbering tests
+
+import json
+import random
+import numpy as np
+import pandas as pd
+import pytest
+from Excel_Indent_Functions import INDENT_ENGINES, _calculate_indent_levels
+from Excel_Indent_Numbering import BUILTIN_GRAMMARS, DEFAULT_NUMBERING, HeadingNumbering, NumberingGrammar
+
+ALL_GRAMMARS = HeadingNumbering(['decimal', 'alpha', 'roman', 'prefixed'])
+
+@pytest.mark.parametrize('heading, level', [
+    ('1 Scope', 0), ('  2.3.4 Detail', 2),
+    ('A.1 Scope', 1), ('B.2.3 Detail', 2), ('A.1.1.B', 2),
+    ('IV.2 Detail', 1), ('MDCCC.1', 1), ('XIV.3.2 Deep', 2),
+    ('SYS-REQ-3.1.4 Rule', 2), ('REQ-7 Rule', 0),
+])
+def test_grammars(heading, level):
+    assert ALL_GRAMMARS.match_level(heading) == level
+
+@pytest.mark.parametrize('heading', ['Illegal.2', 'I am here', 'A Title', 'IV Summary', 'A.1b', 'Version 2', 'a.1', 'ix.1.2', 'Text'])
+def test_words_are_not_numbering(heading):
+    assert ALL_GRAMMARS.match_level(heading) is None
+
+def test_default_is_decimal():
+    assert DEFAULT_NUMBERING.match_level('1.2 x') == 1
+    assert DEFAULT_NUMBERING.match_level('A.1 x') is None
+    assert DEFAULT_NUMBERING.config == [{'name': 'decimal', 'prefix': '', 'first': 'decimal', 'rest': 'decimal', 'separator': '.', 'min_segments': 1}]
+
+def test_grammar_order():
+    # The first grammar that matches wins, so a decimal '-' grammar ahead of 'prefixed' reads 'REQ-1-2' by its dashes
+    dashed = {'name': 'dashed', 'prefix': 'REQ-', 'separator': '-'}
+    assert HeadingNumbering([dashed, 'prefixed']).match_level('REQ-1-2') == 1
+    assert HeadingNumbering(['prefixed', dashed]).match_level('REQ-1-2') == 0
+
+def test_from_config_names():
+    numbering = HeadingNumbering.from_config(' decimal, alpha ,roman')
+    assert [grammar.name for grammar in numbering.grammars] == ['decimal', 'alpha', 'roman']
+    assert numbering.grammars[1] is BUILTIN_GRAMMARS['alpha']
+
+def test_from_config_json(tmp_path):
+    path = tmp_path / 'numbering.json'
+    path.write_text(json.dumps(['decimal', {'name': 'alpha'}, {'name': 'requirements', 'prefix': 'SYS-REQ-', 'separator': '/'}]), encoding='utf-8')
+    numbering = HeadingNumbering.from_config(str(path))
+    assert numbering.grammars[:2] == (BUILTIN_GRAMMARS['decimal'], BUILTIN_GRAMMARS['alpha'])
+    assert numbering.grammars[2] == NumberingGrammar('requirements', prefix='SYS-REQ-', separator='/')
+    assert numbering.match_level('SYS-REQ-3/1/4 Rule') == 2
+    assert HeadingNumbering.from_config(numbering.config).config == numbering.config
+
+@pytest.mark.parametrize('config', [
+    'decimal,nope', [], [5], [{'name': ['a']}], [{'name': 'x', 'first': 'greek'}], [{'name': 'x', 'separator': ''}],
+    [{'name': 'x', 'separator': 3}], [{'name': 'x', 'min_segments': 0}], [{'name': 'x', 'min_segments': True}],
+    [{'name': 'x', 'prefix': '(REQ)-'}], [{'name': 'x', 'prefix': '[REQ'}], [{'name': 'x', 'colour': 'red'}],
+])
+def test_from_config_invalid(config):
+    with pytest.raises(ValueError):
+        HeadingNumbering.from_config(config)
+
+def test_from_config_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        HeadingNumbering.from_config(str(tmp_path / 'missing.json'))
+
+@pytest.mark.parametrize('grammars', [['decimal'], ['alpha', 'decimal'], ['decimal', 'alpha', 'roman', 'prefixed'],
+                                      [{'name': 'dashed', 'prefix': 'REQ-', 'separator': '-'}, {'name': 'appendix', 'first': 'lower-alpha', 'min_segments': 2}, 'roman']])
+def test_engines_match(grammars):
+    numbering = HeadingNumbering(grammars)
+    pieces = ['1', '1.2', '3.4.5', 'A.1', 'B.2.3', 'IV.2', 'XIV.3.2', 'SYS-REQ-3.1', 'REQ-1-2', 'b.4', 'Illegal.2', 'I am', 'Text', '', ' ']
+    rng = random.Random(19)
+    headings = pd.Series([rng.choice(pieces) + rng.choice(['', ' Title']) for _ in range(2000)] + [np.nan, None, 4.5, 7], dtype=object)
+    levels = [_calculate_indent_levels(headings, engine, numbering) for engine in INDENT_ENGINES]
+    assert len(set(levels[0])) > 2 # The grammars do match, so the parity is not between two columns of zeros
+    for other in levels[1:]:
+        assert np.array_equal(levels[0], other)
@@ -0,0 +1,109 @@
+# Excel Indent patch writer tests
+
+import re
+import zipfile
+import openpyxl
+import pandas as pd
+import pytest
+from openpyxl.styles import Font, PatternFill
+from Excel_Indent_Functions import indent_excel
+from Excel_Indent_Patch import patch_workbook, read_sheet_column
+
+HEADINGS = ['1 Scope', '1.1 Purpose', 'Text', '2 Next', '2.1 Detail']
+MAIN_NAMESPACE = b'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+
+@pytest.fixture
+def source(tmp_path):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(['Heading', 'Value', 'Double'])
+    for row, heading in enumerate(HEADINGS, start=2):
+        sheet.append([heading, row, f'=B{row}*2'])
+    sheet['A1'].font = Font(bold=True)
+    sheet['B3'].fill = PatternFill('solid', fgColor='FFFF00')
+    sheet.column_dimensions['A'].width = 30
+    sheet.auto_filter.ref = 'A1:C6'
+    workbook.create_sheet('Notes').append(['Kept'])
+    path = tmp_path / 'source.xlsx'
+    workbook.save(path)
+    return path
+
+def _values(path, sheet=0):
+    return [[cell.value for cell in row] for row in openpyxl.load_workbook(path).worksheets[sheet].iter_rows()]
+
+def _prefixed(source, destination):
+    # The same workbook with its SpreadsheetML elements written as <x:...>, as some generators do
+    def prefixed(xml):
+        xml = re.sub(rb'<(/?)(?![?!])([A-Za-z]\w*)(?=[\s/>])', rb'<\1x:\2', xml)
+        return xml.replace(b'xmlns="' + MAIN_NAMESPACE + b'"', b'xmlns:x="' + MAIN_NAMESPACE + b'"')
+    with zipfile.ZipFile(source) as archive, zipfile.ZipFile(destination, 'w') as copy:
+        for info in archive.infolist():
+            xml = archive.read(info.filename)
+            copy.writestr(info, prefixed(xml) if MAIN_NAMESPACE in xml and info.filename.startswith('xl/') else xml)
+    return destination
+
+def test_matches_openpyxl(source, tmp_path):
+    values = {(1, 4): 'Levels', (2, 4): 0, (3, 4): 1, (4, 1): 'Other text', (5, 2): None}
+    patch_workbook(source, tmp_path / 'patched.xlsx', values, styles={(1, 4): 1})
+
+    workbook = openpyxl.load_workbook(source)
+    for (row, column), value in values.items():
+        workbook.active.cell(row, column).value = value
+    workbook.save(tmp_path / 'expected.xlsx')
+    assert _values(tmp_path / 'patched.xlsx') == _values(tmp_path / 'expected.xlsx')
+    assert _values(tmp_path / 'patched.xlsx', 1) == [['Kept']]
+
+def test_keeps_formatting(source, tmp_path):
+    patch_workbook(source, tmp_path / 'patched.xlsx', {(1, 4): 'Levels'}, {(3, 1): 2, (2, 1): 0}, styles={(1, 4): 1})
+    sheet = openpyxl.load_workbook(tmp_path / 'patched.xlsx').active
+    assert sheet['C2'].value == '=B2*2'
+    assert sheet['A1'].font.b and sheet['D1'].font.b # The new header takes its neighbour's format
+    assert sheet['B3'].fill.fgColor.rgb == '00FFFF00'
+    assert sheet.column_dimensions['A'].width == 30
+    assert sheet['A3'].alignment.indent == 2 and sheet['A3'].value == '1.1 Purpose'
+    assert sheet['A2'].alignment.indent == 0
+
+def test_widens_dimension_and_filter(source, tmp_path):
+    patch_workbook(source, tmp_path / 'patched.xlsx', {(1, 4): 'Levels', (8, 5): 'Far'})
+    sheet = openpyxl.load_workbook(tmp_path / 'patched.xlsx').active
+    assert sheet.dimensions == 'A1:E8'
+    assert sheet.auto_filter.ref == 'A1:D6' # Only the header cell next to the filter joins it
+
+def test_last_row(source, tmp_path):
+    patch_workbook(source, tmp_path / 'patched.xlsx', {(2, 4): 0}, last_row=4)
+    sheet = openpyxl.load_workbook(tmp_path / 'patched.xlsx').active
+    assert sheet.max_row == 4
+    assert [row[0] for row in _values(tmp_path / 'patched.xlsx')] == ['Heading'] + HEADINGS[:3]
+    assert sheet.dimensions == 'A1:D4' and sheet.auto_filter.ref == 'A1:C4'
+
+def test_shared_formula(source, tmp_path):
+    with zipfile.ZipFile(source) as archive:
+        parts = {info.filename: archive.read(info.filename) for info in archive.infolist()}
+    sheet_xml = parts['xl/worksheets/sheet1.xml']
+    parts['xl/worksheets/sheet1.xml'] = sheet_xml.replace(b'<f>B2*2</f>', b'<f t="shared" ref="C2:C3" si="0">B2*2</f>').replace(b'<f>B3*2</f>', b'<f t="shared" si="0"/>')
+    with zipfile.ZipFile(source, 'w') as archive:
+        for name, xml in parts.items():
+            archive.writestr(name, xml)
+    with pytest.raises(ValueError, match='shared formula'):
+        patch_workbook(source, tmp_path / 'patched.xlsx', {(2, 3): 1})
+
+def test_namespace_prefix(source, tmp_path):
+    prefixed = _prefixed(source, tmp_path / 'prefixed.xlsx')
+    assert read_sheet_column(prefixed, 'Heading').values == HEADINGS
+    patch_workbook(prefixed, tmp_path / 'patched.xlsx', {(1, 4): 'Levels', (2, 4): 0}, {(3, 1): 1}, last_row=4)
+    sheet = openpyxl.load_workbook(tmp_path / 'patched.xlsx').active
+    assert [cell.value for cell in sheet[1]] == ['Heading', 'Value', 'Double', 'Levels']
+    assert sheet['A3'].alignment.indent == 1 and sheet['A1'].font.b and sheet.max_row == 4
+
+@pytest.mark.parametrize('mode', ['spaces', 'alignment'])
+def test_indent_excel_matches_openpyxl(source, tmp_path, mode):
+    outputs = {}
+    for writer in ('patch', 'openpyxl'):
+        result = indent_excel(str(source), 'Heading', str(tmp_path / f'{writer}.xlsx'), mode=mode, writer=writer, group_rows=True)
+        assert result.success, result.messages
+        outputs[writer] = pd.read_excel(result.output_file)
+    pd.testing.assert_frame_equal(outputs['patch'], outputs['openpyxl'])
+    patched, rebuilt = (openpyxl.load_workbook(tmp_path / f'{writer}.xlsx').active for writer in ('patch', 'openpyxl'))
+    for row in range(2, len(HEADINGS) + 2):
+        assert patched.cell(row, 1).alignment.indent == rebuilt.cell(row, 1).alignment.indent
+        assert patched.row_dimensions[row].outline_level == rebuilt.row_dimensions[row].outline_level
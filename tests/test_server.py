@@ -0,0 +1,96 @@
+# Excel Indent server tests
+
+import http.client
+import io
+import json
+import urllib.error
+import urllib.parse
+import urllib.request
+import pandas as pd
+import pytest
+from Excel_Indent_Server import IndentServer
+
+@pytest.fixture(scope='module')
+def server():
+    # One worker and no queue, so a single held slot makes the server busy
+    with IndentServer(port=0, workers=1, queue_size=0, quiet=True) as indent_server:
+        yield indent_server
+
+@pytest.fixture(scope='module')
+def workbook():
+    upload = io.BytesIO()
+    pd.DataFrame({'Heading': ['1 Scope', '1.1 Purpose', 'Text', '2 Next'], 'Value': range(4)}).to_excel(upload, index=False)
+    return upload.getvalue()
+
+def _post(server, query, data, headers=None):
+    request = urllib.request.Request(f"{server.url}/indent{query}", data=data, headers=headers or {}, method='POST')
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+def _stats(server):
+    with urllib.request.urlopen(f"{server.url}/stats") as response:
+        return json.loads(response.read())
+
+def test_indent(server, workbook):
+    status, headers, body = _post(server, '?filename=export.xlsx', workbook)
+    assert status == 200
+    assert headers['Content-Disposition'] == 'attachment; filename="export_indented.xlsx"'
+    df = pd.read_excel(io.BytesIO(body))
+    assert df['Heading'].tolist() == ['1 Scope', '    1.1 Purpose', '        Text', '2 Next']
+    assert df['Calculated Indents'].tolist() == [0, 1, 2, 0]
+
+def test_alignment_with_numbering(server):
+    upload = io.BytesIO()
+    pd.DataFrame({'Heading': ['A.1 Scope', 'SYS-REQ-3.1.4 Rule', '(a+)+$1.2 Literal']}).to_excel(upload, index=False)
+    numbering = urllib.parse.quote(json.dumps(['alpha', {'name': 'requirements', 'prefix': 'SYS-REQ-'}, {'name': 'literal', 'prefix': '(a+)+$'}]))
+    status, _, body = _post(server, f'?mode=alignment&numbering={numbering}', upload.getvalue())
+    assert status == 200
+    assert pd.read_excel(io.BytesIO(body))['Calculated Indents'].tolist() == [1, 2, 1]
+
+@pytest.mark.parametrize('query', ['?mode=sideways', '?writer=patch', '?numbering=nope', '?numbering=[1', '?numbering=[{"name":["a"]}]',
+                                   '?numbering=[{"name":"x","separator":3}]'])
+def test_invalid_options(server, workbook, query):
+    status, _, body = _post(server, query, workbook)
+    assert status == 400
+    assert json.loads(body)['error']
+
+def test_invalid_content_length(server):
+    for length in ('-1', 'ten'):
+        connection = http.client.HTTPConnection('127.0.0.1', server.port, timeout=10)
+        try:
+            connection.putrequest('POST', '/indent')
+            connection.putheader('Content-Length', length)
+            connection.endheaders()
+            response = connection.getresponse()
+            assert response.status == 400
+        finally:
+            connection.close()
+
+def test_unreadable_file(server, workbook):
+    status, _, body = _post(server, '?heading_column=Missing', workbook)
+    assert status == 422
+    assert any("'Missing' column not found" in message for message in json.loads(body)['messages'])
+
+def test_busy(server, workbook):
+    assert server.slots.acquire(blocking=False)
+    try:
+        status, headers, _ = _post(server, '', workbook)
+    finally:
+        server.slots.release()
+    assert status == 503
+    assert headers['Retry-After'] == '1'
+    assert _post(server, '', workbook)[0] == 200
+
+def test_stats(server, workbook):
+    before = _stats(server)
+    _post(server, '', workbook)
+    _post(server, '?heading_column=Missing', workbook)
+    stats = _stats(server)
+    assert stats['workers'] == 1 and stats['queue_size'] == 0 and stats['in_flight'] == 0
+    assert stats['requests']['succeeded'] == before['requests']['succeeded'] + 1
+    assert stats['requests']['failed'] == before['requests']['failed'] + 1
+    assert stats['rows'] == before['rows'] + 8
+    assert stats['latency_ms']['count'] == before['latency_ms']['count'] + 2